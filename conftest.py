@@ -6,9 +6,11 @@ import social_core.strategy
 import svcs
 from django.apps import apps
 from django.conf import settings
+from django.core.cache import cache
 from django.test import override_settings
 from social_django.storage import BaseDjangoStorage
 
+from nominate import site_data
 from nomnom.convention import ConventionConfiguration, ConventionTheme
 
 
@@ -82,6 +84,14 @@ def disable_whitenoise():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    yield
+    cache.clear()
+    # and this process's own copies of what was in it
+    site_data.admin_message.reset()
+
+
 @pytest.fixture
 def social_core_settings():
     return {}
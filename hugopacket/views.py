@@ -11,7 +11,8 @@ from django.core.exceptions import PermissionDenied
 from django.http import Http404, HttpRequest, HttpResponse, HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render, resolve_url
 from django_svcs.apps import svcs_from
-from nominate.models import Election
+from nominate.election_context import election_context
+from nominate.permissions import user_permissions
 
 from hugopacket.apps import S3Client
 from hugopacket.models import ElectionPacket, PacketFile
@@ -77,8 +78,10 @@ def member_can_vote():
     def test_func(request: HttpRequest) -> bool:
         election_id = request.resolver_match.kwargs.get("election_id")
 
-        if not get_object_or_404(Election, slug=election_id).user_can_vote(
-            request.user
+        if (
+            not election_context(request)
+            .election(election_id)
+            .user_can_vote(user_permissions(request.user))
         ):
             raise PermissionDenied()
 
@@ -90,11 +93,13 @@ def member_can_vote():
 @login_required
 @member_can_vote()
 def index(request: HttpRequest, election_id: str) -> HttpResponse:
-    election = get_object_or_404(Election, slug=election_id)
+    election = election_context(request).election(election_id)
     packet = get_object_or_404(ElectionPacket, election=election)
 
     # the packet is allowed for members with voting preview, even if inactive
-    if not packet.enabled and not request.user.has_perm("hugopacket.preview_packet"):
+    if not packet.enabled and not user_permissions(request.user).has_perm(
+        "hugopacket.preview_packet"
+    ):
         raise Http404()
 
     all_prefixes = set()
@@ -138,13 +143,13 @@ def index(request: HttpRequest, election_id: str) -> HttpResponse:
 def download_packet(
     request: HttpRequest, election_id: str, packet_file_id: int
 ) -> HttpResponse:
-    election = get_object_or_404(Election, slug=election_id)
+    election = election_context(request).election(election_id)
     packet_file = get_object_or_404(PacketFile, pk=packet_file_id)
     # ensure that the packet file belongs to the election
     if packet_file.packet.election != election:
         raise Http404()
 
-    if not packet_file.packet.enabled and not request.user.has_perm(
+    if not packet_file.packet.enabled and not user_permissions(request.user).has_perm(
         "hugopacket.preview_packet"
     ):
         raise Http404()
@@ -13,9 +13,12 @@ from django.db.models.fields.related import RelatedField
 from django.forms import ModelChoiceField
 from django.http import HttpRequest, HttpResponse
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.safestring import mark_safe
 
 from . import models
+from .hugo_awards import invalidate_results, rebuild_ballot_tally
+from .report_delivery import record_removals
 
 UserModel = get_user_model()
 
@@ -41,8 +44,9 @@ def validate_nomination(
 
 def set_validation(queryset: QuerySet, valid: bool) -> None:
     # update the ones that have admin data already
+    # (bulk updates don't touch auto_now fields themselves)
     models.NominationAdminData.objects.filter(nomination__in=queryset).update(
-        valid_nomination=valid
+        valid_nomination=valid, updated_at=timezone.now()
     )
 
     # find the ones that don't already have info
@@ -65,8 +69,31 @@ class NominatingMemberFilter(AutocompleteFilter):
     parameter_name = "nominator"
 
 
-class ExtendedNominationAdmin(admin.ModelAdmin):
+class RecordsRemovalsMixin:
+    """Record an admin's deletions from a report, so that no one is sent only its changes."""
+
+    # the report the model's rows are in, and the lookup from the model to its election
+    removals_report_name: str
+    removals_election_lookup: str
+
+    def removals_elections(self, queryset: QuerySet) -> list[int]:
+        return list(queryset.values_list(self.removals_election_lookup, flat=True))
+
+    def delete_model(self, request, obj):
+        election_ids = self.removals_elections(self.model.objects.filter(pk=obj.pk))
+        super().delete_model(request, obj)
+        record_removals(self.removals_report_name, election_ids)
+
+    def delete_queryset(self, request, queryset):
+        election_ids = self.removals_elections(queryset)
+        super().delete_queryset(request, queryset)
+        record_removals(self.removals_report_name, election_ids)
+
+
+class ExtendedNominationAdmin(RecordsRemovalsMixin, admin.ModelAdmin):
     model = models.Nomination
+    removals_report_name = "nominations"
+    removals_election_lookup = "category__election_id"
     inlines = [NominationAdminDataAdmin]
     autocomplete_fields = ["nominator"]
 
@@ -133,8 +160,42 @@ class CategoryAdmin(admin.ModelAdmin):
     )
 
 
-class FinalistAdmin(admin.ModelAdmin):
+class InvalidatesResultsMixin:
+    """Invalidate the cached results, and rebuild the live tally, of every category an admin
+    change touches."""
+
+    # the lookup from the model to the category it's counted in
+    results_category_lookup: str
+
+    def results_categories(self, queryset: QuerySet) -> list[int]:
+        return list(queryset.values_list(self.results_category_lookup, flat=True))
+
+    def ballots_changed(self, category_ids: list[int]) -> None:
+        invalidate_results(category_ids)
+        rebuild_ballot_tally(category_ids)
+
+    def save_model(self, request, obj, form, change):
+        # the object may have moved, so both its old and new categories are affected
+        before = self.results_categories(self.model.objects.filter(pk=obj.pk))
+        super().save_model(request, obj, form, change)
+        self.ballots_changed(
+            before + self.results_categories(self.model.objects.filter(pk=obj.pk))
+        )
+
+    def delete_model(self, request, obj):
+        category_ids = self.results_categories(self.model.objects.filter(pk=obj.pk))
+        super().delete_model(request, obj)
+        self.ballots_changed(category_ids)
+
+    def delete_queryset(self, request, queryset):
+        category_ids = self.results_categories(queryset)
+        super().delete_queryset(request, queryset)
+        self.ballots_changed(category_ids)
+
+
+class FinalistAdmin(InvalidatesResultsMixin, admin.ModelAdmin):
     model = models.Finalist
+    results_category_lookup = "category_id"
 
     list_display = ["name", "election", "category", "ballot_position"]
     list_filter = ["category__election"]
@@ -267,8 +328,11 @@ class CustomUserAdmin(BaseUserAdmin):
             return obj.convention_profile.created_at
 
 
-class RankAdmin(admin.ModelAdmin):
+class RankAdmin(RecordsRemovalsMixin, InvalidatesResultsMixin, admin.ModelAdmin):
     model = models.Rank
+    results_category_lookup = "finalist__category_id"
+    removals_report_name = "ranks"
+    removals_election_lookup = "finalist__category__election_id"
 
     list_display = ["finalist", "category", "membership", "rank_date"]
     list_filter = ["finalist__category__election"]
@@ -290,6 +354,8 @@ admin.site.register(models.Nomination, ExtendedNominationAdmin)
 admin.site.register(models.ReportRecipient, ReportRecipientAdmin)
 admin.site.register(models.Rank, RankAdmin)
 admin.site.register(models.AdminMessage)
+admin.site.register(models.ReportArtifact)
+admin.site.register(models.ReportDelivery)
 
 # Customize the Admin
 admin.site.site_title = "NomNom"
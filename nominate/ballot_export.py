@@ -0,0 +1,132 @@
+"""The election's ballots as dense rank matrices, for offline analysis.
+
+The ranks reports repeat every member and finalist name on every row, which is slow to load
+and slower to do anything with. This export instead writes each category's ballots as a
+member × finalist matrix of positions, with index arrays for the members, categories and
+finalists, all in NumPy's `.npz` format; `numpy.load` reads a whole election in one go.
+
+The format is simple enough that it's written here directly, so the site itself doesn't
+depend on NumPy:
+
+- `member_ids`, `member_numbers`: the matrices' rows, the same in every category
+- `category_ids`, `category_names`: the categories, in ballot order
+- `category_<id>_finalist_ids`, `category_<id>_finalist_names`: that category's columns, in
+  ballot order
+- `category_<id>_ranks`: the positions each member gave each finalist, or 0 if they didn't
+  rank them
+"""
+
+import sys
+import zipfile
+from array import array
+from collections.abc import Sequence
+from typing import BinaryIO
+
+from nominate import models
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+# NumPy aligns the data after the header to this
+NPY_ALIGNMENT = 64
+
+
+def npy_header(descr: str, shape: tuple[int, ...]) -> bytes:
+    header = repr({"descr": descr, "fortran_order": False, "shape": shape}).encode(
+        "latin1"
+    )
+    # the header is padded with spaces and ends in a newline, so that the data is aligned
+    padding = -(len(NPY_MAGIC) + 2 + len(header) + 1) % NPY_ALIGNMENT
+    header += b" " * padding + b"\n"
+    return NPY_MAGIC + len(header).to_bytes(2, "little") + header
+
+
+def npy_int64(values: Sequence[int]) -> bytes:
+    data = array("q", values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return npy_header("<i8", (len(data),)) + data.tobytes()
+
+
+def npy_strings(values: Sequence[str]) -> bytes:
+    width = max((len(value) for value in values), default=1) or 1
+    data = b"".join(value.ljust(width, "\0").encode("utf-32-le") for value in values)
+    return npy_header(f"<U{width}", (len(values),)) + data
+
+
+def npy_uint8_matrix(data: bytearray, rows: int, columns: int) -> bytes:
+    return npy_header("|u1", (rows, columns)) + bytes(data)
+
+
+def write_ballot_matrix(
+    election: models.Election, file: BinaryIO, chunk_size: int = 2000
+) -> None:
+    """Write the election's ballots to `file`, as an `.npz` archive."""
+    categories = list(
+        models.Category.objects.filter(election=election).order_by("ballot_position")
+    )
+    finalists = list(
+        models.Finalist.objects.filter(category__election=election).order_by(
+            "category__ballot_position", "ballot_position"
+        )
+    )
+    members = list(
+        models.NominatingMemberProfile.objects.filter(
+            rank__finalist__category__election=election, rank__position__isnull=False
+        )
+        .order_by("id")
+        .values_list("id", "member_number")
+        .distinct()
+    )
+
+    row_for_member = {member_id: row for row, (member_id, _) in enumerate(members)}
+    columns_by_category = {c.id: [] for c in categories}
+    for finalist in finalists:
+        columns_by_category[finalist.category_id].append(finalist)
+    # each finalist's category and column in it
+    column_for_finalist = {
+        finalist.id: (category_id, column)
+        for category_id, columns in columns_by_category.items()
+        for column, finalist in enumerate(columns)
+    }
+
+    matrices = {
+        category_id: bytearray(len(members) * len(columns))
+        for category_id, columns in columns_by_category.items()
+    }
+    ranks = (
+        models.Rank.objects.filter(
+            finalist__category__election=election, position__isnull=False
+        )
+        .order_by()
+        .values_list("membership_id", "finalist_id", "position")
+        .iterator(chunk_size=chunk_size)
+    )
+    for member_id, finalist_id, position in ranks:
+        category_id, column = column_for_finalist[finalist_id]
+        width = len(columns_by_category[category_id])
+        matrices[category_id][row_for_member[member_id] * width + column] = position
+
+    with zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("member_ids.npy", npy_int64([m for m, _ in members]))
+        archive.writestr(
+            "member_numbers.npy", npy_strings([n or "" for _, n in members])
+        )
+        archive.writestr("category_ids.npy", npy_int64([c.id for c in categories]))
+        archive.writestr(
+            "category_names.npy", npy_strings([c.display_name for c in categories])
+        )
+
+        for category in categories:
+            columns = columns_by_category[category.id]
+            prefix = f"category_{category.id}"
+            archive.writestr(
+                f"{prefix}_finalist_ids.npy", npy_int64([f.id for f in columns])
+            )
+            archive.writestr(
+                f"{prefix}_finalist_names.npy",
+                npy_strings([f.display_name for f in columns]),
+            )
+            archive.writestr(
+                f"{prefix}_ranks.npy",
+                npy_uint8_matrix(matrices[category.id], len(members), len(columns)),
+            )
@@ -0,0 +1,102 @@
+"""A compiled description of an election's ballots, for building the ballot forms.
+
+The nominating and voting forms need the election's categories and finalists, how many ranks
+each category has, and the finalists' names rendered as labels. None of that changes while
+members are voting, so it's compiled once per election and cached, both in Redis and in each
+process, under a version that's replaced whenever a category or finalist changes. Building a
+form from the schema takes no queries at all.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from markdownify.templatetags.markdownify import markdownify
+
+from nominate import models
+from nominate.versioned_cache import CACHE_TIMEOUT, VersionedCache
+
+NOMINATION_FIELDS = ["field_1", "field_2", "field_3"]
+
+
+@dataclass
+class BallotSchema:
+    election_id: int
+    version: str
+    # in ballot order
+    categories: list[models.Category]
+    # in ballot order, each with its category loaded
+    finalists: list[models.Finalist]
+    # the number of finalists, and so of ranks, in each category, by category id
+    finalist_counts: dict[int, int] = field(default_factory=dict)
+    # the finalists' names rendered as form labels, by finalist id
+    finalist_labels: dict[int, str] = field(default_factory=dict)
+    # the label of each nominating field, by category id
+    nomination_fields: dict[int, list[tuple[str, str]]] = field(default_factory=dict)
+
+    def finalists_in(self, category: models.Category) -> list[models.Finalist]:
+        return [f for f in self.finalists if f.category_id == category.id]
+
+
+# The schemas this process has already loaded, by election id
+_loaded: dict[int, BallotSchema] = {}
+
+
+SCHEMAS = VersionedCache("ballot-schema")
+
+
+def ballot_schema_version(election_id: int) -> str:
+    return SCHEMAS.version(election_id)
+
+
+def get_ballot_schema(election: models.Election) -> BallotSchema:
+    version = ballot_schema_version(election.id)
+
+    schema = _loaded.get(election.id)
+    if schema is not None and schema.version == version:
+        return schema
+
+    key = SCHEMAS.key(version, election.id)
+    schema = cache.get(key)
+    if schema is None:
+        schema = compile_ballot_schema(election, version)
+        cache.set(key, schema, timeout=CACHE_TIMEOUT)
+
+    _loaded[election.id] = schema
+    return schema
+
+
+def compile_ballot_schema(election: models.Election, version: str) -> BallotSchema:
+    categories = list(models.Category.objects.filter(election=election))
+    categories_by_id = {c.id: c for c in categories}
+
+    finalists = list(models.Finalist.objects.filter(category__election=election))
+    for finalist in finalists:
+        # share the category instances, rather than loading one per finalist
+        finalist.category = categories_by_id[finalist.category_id]
+
+    return BallotSchema(
+        election_id=election.id,
+        version=version,
+        categories=categories,
+        finalists=finalists,
+        finalist_counts=dict(Counter(f.category_id for f in finalists)),
+        finalist_labels={
+            f.id: markdownify(f.name, custom_settings="admin-label") for f in finalists
+        },
+        nomination_fields={
+            c.id: [
+                (field_id, getattr(c, f"{field_id}_description"))
+                for field_id in NOMINATION_FIELDS[: c.fields]
+            ]
+            for c in categories
+        },
+    )
+
+
+def invalidate_ballot_schema(election_id: int | None) -> None:
+    """Mark the election's schema as changed."""
+    if election_id is None:
+        return
+
+    SCHEMAS.invalidate(election_id)
@@ -0,0 +1,241 @@
+"""Saving members' ballots as the difference from what they've already cast.
+
+Members save their whole ballot every time, but usually only change a rank or a nomination
+or two. Rather than rewriting every row, the submitted ballot is compared with the stored
+one, and only the rows that were added, changed or removed are written. The changes are
+handed back, so that the tallies and caches downstream can be updated for exactly those
+categories.
+"""
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from itertools import chain, groupby
+from operator import attrgetter
+
+from django.utils import timezone
+
+from nominate import models
+from nominate.canonicalize import nomination_key
+from nominate.report_delivery import record_removals
+
+NOMINATION_FIELDS = ["field_1", "field_2", "field_3"]
+
+# A nomination's place on a member's ballot: the category id, and which of the category's
+# entries it is.
+Slot = tuple[int, int]
+
+
+def lock_ballot(member: models.NominatingMemberProfile) -> None:
+    """Hold the member's ballot until the end of the transaction.
+
+    The stored ballot is read and then diffed, so two saves of the same ballot at once would
+    each see the other's rows as missing, and both record the change. Taking a lock on the
+    member first makes the second save wait, and diff against what the first one wrote.
+    """
+    models.NominatingMemberProfile.objects.select_for_update().filter(
+        id=member.id
+    ).exists()
+
+
+@dataclass
+class RankChanges:
+    """The ranks a member's submitted ballot adds, changes and removes."""
+
+    inserted: list[models.Rank] = field(default_factory=list)
+    updated: list[models.Rank] = field(default_factory=list)
+    deleted: list[models.Rank] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+    @property
+    def category_ids(self) -> set[int]:
+        return {
+            rank.finalist.category_id
+            for rank in chain(self.inserted, self.updated, self.deleted)
+        }
+
+
+def diff_ranks(
+    member: models.NominatingMemberProfile,
+    stored: Iterable[models.Rank],
+    votes: Mapping[models.Finalist, int | str | None],
+    voter_ip_address: str | None,
+) -> RankChanges:
+    """Compare the member's stored ranks with the positions they've just voted.
+
+    Only the finalists in `votes` are considered; ranks for any other finalists are left
+    alone.
+    """
+    stored_by_finalist = {rank.finalist_id: rank for rank in stored}
+    now = timezone.now()
+    changes = RankChanges()
+
+    for finalist, vote in votes.items():
+        position = None if vote is None else int(vote)
+        rank = stored_by_finalist.get(finalist.id)
+
+        if rank is None:
+            if position is not None:
+                changes.inserted.append(
+                    models.Rank(
+                        membership=member,
+                        finalist=finalist,
+                        position=position,
+                        voter_ip_address=voter_ip_address,
+                    )
+                )
+        elif position is None:
+            changes.deleted.append(rank)
+        elif rank.position != position:
+            rank.position = position
+            rank.voter_ip_address = voter_ip_address
+            # bulk updates don't touch auto_now fields themselves
+            rank.rank_date = now
+            changes.updated.append(rank)
+
+    return changes
+
+
+def save_rank_changes(changes: RankChanges) -> None:
+    if changes.deleted:
+        models.Rank.objects.filter(
+            id__in=[rank.id for rank in changes.deleted]
+        ).delete()
+        record_removals(
+            "ranks", (rank.finalist.category.election_id for rank in changes.deleted)
+        )
+
+    if changes.updated:
+        models.Rank.objects.bulk_update(
+            changes.updated, ["position", "voter_ip_address", "rank_date"]
+        )
+
+    if changes.inserted:
+        # a concurrent save by the same member may have beaten us to these
+        models.Rank.objects.bulk_create(
+            changes.inserted,
+            update_conflicts=True,
+            unique_fields=["finalist", "membership"],
+            update_fields=["position", "voter_ip_address", "rank_date"],
+        )
+
+
+@dataclass
+class NominationChanges:
+    """The nominations a member's submitted ballot adds, edits and clears."""
+
+    inserted: list[models.Nomination] = field(default_factory=list)
+    updated: list[models.Nomination] = field(default_factory=list)
+    deleted: list[models.Nomination] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
+
+    @property
+    def category_ids(self) -> set[int]:
+        return {
+            nomination.category_id
+            for nomination in chain(self.inserted, self.updated, self.deleted)
+        }
+
+
+def nomination_slots(
+    nominations: Iterable[models.Nomination],
+) -> dict[Slot, models.Nomination]:
+    """The stored nominations by slot; within a category, the ballot shows them in the order
+    they were made."""
+    ordered = sorted(nominations, key=attrgetter("category_id", "id"))
+    return {
+        (category_id, slot): nomination
+        for category_id, category_nominations in groupby(
+            ordered, key=attrgetter("category_id")
+        )
+        for slot, nomination in enumerate(category_nominations)
+    }
+
+
+def nomination_content(nomination: models.Nomination) -> tuple[int, tuple[str, ...]]:
+    """What a nomination says: its category, and the fields the category uses."""
+    fields = NOMINATION_FIELDS[: nomination.category.fields]
+    return (nomination.category_id, tuple(getattr(nomination, f) for f in fields))
+
+
+def diff_nominations(
+    member: models.NominatingMemberProfile,
+    stored: Mapping[Slot, models.Nomination],
+    submitted: Mapping[Slot, models.Nomination],
+    nomination_ip_address: str | None,
+) -> NominationChanges:
+    """Compare the member's stored nominations with the ones they've just submitted.
+
+    A submitted nomination that says the same as a stored one is that nomination, wherever
+    either of them is on the ballot; the stored slots are numbered without gaps, and the
+    submitted ones aren't, so a cleared entry would otherwise shift the ones after it. Only
+    the rest are compared slot by slot, as edits.
+    """
+    now = timezone.now()
+    changes = NominationChanges()
+
+    unmatched = dict(stored)
+    slots_by_content: dict[tuple, list[Slot]] = {}
+    for slot, nomination in stored.items():
+        slots_by_content.setdefault(nomination_content(nomination), []).append(slot)
+
+    edited = {}
+    for slot, nomination in submitted.items():
+        same = slots_by_content.get(nomination_content(nomination))
+        if same:
+            del unmatched[same.pop(0)]
+        else:
+            edited[slot] = nomination
+
+    for slot, nomination in edited.items():
+        existing = unmatched.pop(slot, None)
+        fields = NOMINATION_FIELDS[: nomination.category.fields]
+
+        if existing is None:
+            nomination.nominator = member
+            nomination.nomination_ip_address = nomination_ip_address
+            nomination.normalized_key = nomination_key(nomination)
+            changes.inserted.append(nomination)
+        else:
+            for f in fields:
+                setattr(existing, f, getattr(nomination, f))
+            existing.nomination_ip_address = nomination_ip_address
+            existing.normalized_key = nomination_key(existing)
+            # bulk updates don't touch auto_now fields themselves
+            existing.nomination_date = now
+            changes.updated.append(existing)
+
+    changes.deleted = list(unmatched.values())
+    return changes
+
+
+def save_nomination_changes(changes: NominationChanges) -> None:
+    if changes.deleted:
+        models.Nomination.objects.filter(
+            id__in=[nomination.id for nomination in changes.deleted]
+        ).delete()
+        record_removals(
+            "nominations",
+            (nomination.category.election_id for nomination in changes.deleted),
+        )
+
+    if changes.updated:
+        models.Nomination.objects.bulk_update(
+            changes.updated,
+            [
+                *NOMINATION_FIELDS,
+                "normalized_key",
+                "nomination_ip_address",
+                "nomination_date",
+            ],
+        )
+        # an admin's ruling on a nomination was about what it used to say
+        models.NominationAdminData.objects.filter(
+            nomination__in=changes.updated
+        ).delete()
+
+    if changes.inserted:
+        models.Nomination.objects.bulk_create(changes.inserted)
@@ -0,0 +1,245 @@
+"""Grouping the variant spellings of a nominee into canonical works.
+
+Members write their nominations free-form, so the same work turns up as "The Expanse",
+"the expanse (TV)", "Expanse, The" and so on. Each nomination stores a normalized key: its
+fields case-folded, Unicode-normalized, and stripped of punctuation and articles. Identical
+keys are the same work outright; keys whose trigrams are similar enough are clustered
+together too.
+
+The similarity is the same one `pg_trgm` uses: the share of trigrams two keys have in
+common. When the extension is installed, Postgres finds the similar keys with its trigram
+index; otherwise they're found with an in-memory trigram index.
+"""
+
+import functools
+import math
+import re
+import unicodedata
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from nominate import models
+
+ARTICLES = frozenset(["a", "an", "the"])
+
+# How similar two keys must be to be clustered as the same work
+SIMILARITY_THRESHOLD = 0.7
+
+# separates the normalized fields of a nomination within its key
+FIELD_SEPARATOR = " / "
+
+WORD = re.compile(r"[^\W_]+")
+
+
+def normalize(value: str) -> str:
+    text = value.casefold()
+    if not text.isascii():
+        # decompose accented characters, so that the accents can be dropped
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(word for word in WORD.findall(text) if word not in ARTICLES)
+
+
+def normalized_key(*values: str) -> str:
+    return FIELD_SEPARATOR.join(
+        normalized for normalized in map(normalize, values) if normalized
+    )
+
+
+def nomination_key(nomination: models.Nomination) -> str:
+    """The key for a nomination, from the fields its category uses."""
+    fields = [nomination.field_1, nomination.field_2, nomination.field_3]
+    return normalized_key(*fields[: nomination.category.fields])
+
+
+def trigrams(key: str) -> frozenset[str]:
+    """The trigrams of a key, as `pg_trgm` extracts them: each word is padded with two spaces
+    in front and one behind."""
+    return frozenset(
+        padded[i : i + 3]
+        for word in key.replace(FIELD_SEPARATOR, " ").split()
+        for padded in [f"  {word} "]
+        for i in range(len(padded) - 2)
+    )
+
+
+def similarity(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class InMemoryTrigramIndex:
+    """Finds the pairs of similar keys without comparing every key with every other one.
+
+    Each key's trigrams are ordered from rarest to most common. Two keys can only be similar
+    enough if they share one of the first few trigrams of the smaller key, so only those are
+    indexed, and only keys that share one are compared.
+    """
+
+    def __init__(self, keys: Sequence[str]):
+        self.keys = list(keys)
+        self.trigrams = [trigrams(key) for key in self.keys]
+
+    def similar_pairs(
+        self, threshold: float = SIMILARITY_THRESHOLD
+    ) -> list[tuple[str, str]]:
+        frequency = Counter(gram for grams in self.trigrams for gram in grams)
+        index: dict[str, list[int]] = {}
+        pairs = []
+
+        by_size = sorted(range(len(self.keys)), key=lambda i: len(self.trigrams[i]))
+        for i in by_size:
+            grams = self.trigrams[i]
+            if not grams:
+                continue
+
+            prefix = len(grams) - math.ceil(threshold * len(grams)) + 1
+            candidates: set[int] = set()
+            for gram in sorted(grams, key=lambda g: (frequency[g], g))[:prefix]:
+                indexed = index.setdefault(gram, [])
+                candidates.update(indexed)
+                indexed.append(i)
+
+            pairs.extend(
+                (self.keys[j], self.keys[i])
+                for j in candidates
+                if similarity(self.trigrams[j], grams) >= threshold
+            )
+
+        return pairs
+
+
+@functools.cache
+def pg_trgm_available() -> bool:
+    if connection.vendor != "postgresql":
+        return False
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def valid_nominations(category: models.Category):
+    return models.Nomination.objects.filter(category=category).filter(
+        Q(admin__valid_nomination=True) | Q(admin__isnull=True)
+    )
+
+
+def postgres_similar_pairs(
+    category: models.Category, threshold: float = SIMILARITY_THRESHOLD
+) -> list[tuple[str, str]]:
+    nominations = valid_nominations(category)
+    keys_sql, keys_params = (
+        nominations.exclude(normalized_key="")
+        .values("normalized_key")
+        .distinct()
+        .query.sql_with_params()
+    )
+    valid_sql, valid_params = nominations.values("id").query.sql_with_params()
+
+    # each of the category's keys probes the trigram index on the nominations table for its
+    # matches, rather than every key being compared with every other one
+    with transaction.atomic(), connection.cursor() as cursor:
+        # the threshold `%` matches at, for this transaction only
+        cursor.execute("SET LOCAL pg_trgm.similarity_threshold = %s", [threshold])
+        cursor.execute(
+            f"""
+            WITH keys AS MATERIALIZED ({keys_sql})
+            SELECT DISTINCT a.normalized_key, b.normalized_key
+            FROM keys a
+            JOIN {models.Nomination._meta.db_table} b
+                ON b.normalized_key %% a.normalized_key
+            WHERE b.category_id = %s
+                AND a.normalized_key < b.normalized_key
+                AND b.id IN ({valid_sql})
+            """,
+            [*keys_params, category.id, *valid_params],
+        )
+        return cursor.fetchall()
+
+
+@dataclass
+class CanonicalWork:
+    # the most common normalized key of the work's nominations
+    key: str
+    # the most common spelling of the work's nominations
+    name: str
+    keys: set[str] = field(default_factory=set)
+    nominations: int = 0
+
+
+@dataclass
+class CanonicalWorks:
+    works: list[CanonicalWork]
+    # the work each normalized key belongs to, as an index into `works`
+    work_for_key: dict[str, int]
+
+
+def canonical_works(
+    category: models.Category, threshold: float = SIMILARITY_THRESHOLD
+) -> CanonicalWorks:
+    """Cluster the category's valid nominations into works, by the similarity of their keys."""
+    fields = ["field_1", "field_2", "field_3"][: category.fields]
+    spellings: dict[str, Counter[str]] = {}
+    for key, *values in (
+        valid_nominations(category)
+        .exclude(normalized_key="")
+        .order_by("id")
+        .values_list("normalized_key", *fields)
+        .iterator()
+    ):
+        name = ", ".join(value.strip() for value in values if value.strip())
+        spellings.setdefault(key, Counter())[name] += 1
+
+    if pg_trgm_available():
+        pairs = postgres_similar_pairs(category, threshold)
+    else:
+        pairs = InMemoryTrigramIndex(list(spellings)).similar_pairs(threshold)
+
+    return cluster(spellings, pairs)
+
+
+def cluster(
+    spellings: dict[str, Counter[str]], pairs: Iterable[tuple[str, str]]
+) -> CanonicalWorks:
+    """Group the keys connected by similar pairs; each group is a work."""
+    parent = {key: key for key in spellings}
+
+    def root(key: str) -> str:
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for a, b in pairs:
+        parent[root(a)] = root(b)
+
+    groups: dict[str, list[str]] = {}
+    for key in spellings:
+        groups.setdefault(root(key), []).append(key)
+
+    works = []
+    work_for_key = {}
+    for keys in groups.values():
+        names: Counter[str] = Counter()
+        for key in keys:
+            names.update(spellings[key])
+        counts = {key: spellings[key].total() for key in keys}
+        for key in keys:
+            work_for_key[key] = len(works)
+        works.append(
+            CanonicalWork(
+                key=max(keys, key=lambda k: (counts[k], k)),
+                name=names.most_common(1)[0][0],
+                keys=set(keys),
+                nominations=sum(counts.values()),
+            )
+        )
+
+    return CanonicalWorks(works=works, work_for_key=work_for_key)
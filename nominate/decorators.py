@@ -1,7 +1,11 @@
+from collections.abc import Callable
 from functools import wraps
+from typing import TypeVar
 
 from django.core.exceptions import PermissionDenied
 
+T = TypeVar("T")
+
 
 def user_passes_test_or_forbidden(test_func):
     """Decorator for views that checks that the user passes the given test, returning an error
@@ -18,3 +22,23 @@ def user_passes_test_or_forbidden(test_func):
         return _wrapper_view
 
     return decorator
+
+
+def memoized(method: Callable[[object], T]) -> Callable[[object], T]:
+    """Decorator for view methods that only need to be worked out once per request.
+
+    The result is kept on the view instance, and Django makes a new one of those for every
+    request, so it goes away with the request. (`functools.lru_cache` would keep it, and the
+    view, request and user along with it, in a cache that outlives them all.)
+    """
+    attribute = f"_memoized_{method.__name__}"
+
+    @wraps(method)
+    def _wrapper(self) -> T:
+        try:
+            return self.__dict__[attribute]
+        except KeyError:
+            value = self.__dict__[attribute] = method(self)
+            return value
+
+    return _wrapper
@@ -0,0 +1,89 @@
+"""The election a request is about, and the member making it, resolved once per request.
+
+Every election page looks the election up by its slug, often more than once: the view, its
+permission checks and the packet's decorators all used to load it for themselves. The
+request's `ElectionContext`, kept in its svcs container, resolves each slug and the member's
+profile at most once, and shares them.
+
+Elections hardly ever change, so each process also keeps the ones it's loaded, by slug,
+under a version that's shared through the cache and replaced whenever any election is saved
+or deleted; a state change reaches every process on its next request.
+"""
+
+import copy
+
+import svcs
+from django.http import Http404, HttpRequest
+from django_svcs.apps import svcs_from
+
+from nominate import models
+from nominate.versioned_cache import VersionedCache
+
+ELECTIONS = VersionedCache("elections")
+
+# The elections this process has already loaded, with the version they were loaded under,
+# by slug
+_loaded: dict[str, tuple[str, models.Election]] = {}
+
+
+def get_election(slug: str) -> models.Election:
+    """The election with this slug, raising Http404 if there isn't one.
+
+    Each call gets its own copy, so the caller is free to annotate it.
+    """
+    version = ELECTIONS.version()
+
+    loaded = _loaded.get(slug)
+    if loaded is None or loaded[0] != version:
+        try:
+            election = models.Election.objects.get(slug=slug)
+        except models.Election.DoesNotExist:
+            raise Http404("No such election")
+
+        loaded = _loaded[slug] = (version, election)
+
+    return copy.deepcopy(loaded[1])
+
+
+def invalidate_elections() -> None:
+    """Mark every election as changed."""
+    ELECTIONS.invalidate()
+
+
+class ElectionContext:
+    def __init__(self, request: HttpRequest):
+        self.request = request
+        self._elections: dict[str, models.Election] = {}
+        self._profile: models.NominatingMemberProfile | None = None
+        self._profile_loaded = False
+
+    def election(self, slug: str) -> models.Election:
+        if slug not in self._elections:
+            self._elections[slug] = get_election(slug)
+
+        return self._elections[slug]
+
+    def profile(self) -> models.NominatingMemberProfile | None:
+        """The requesting user's member profile, if they have one."""
+        if not self._profile_loaded:
+            user = self.request.user
+            if user.is_authenticated:
+                try:
+                    self._profile = user.convention_profile
+                except models.NominatingMemberProfile.DoesNotExist:
+                    self._profile = None
+
+            self._profile_loaded = True
+
+        return self._profile
+
+
+def election_context(request: HttpRequest) -> ElectionContext:
+    """The request's election context, registered with its container on first use."""
+    container = svcs_from(request)
+    try:
+        return container.get(ElectionContext)
+    except svcs.exceptions.ServiceNotFoundError:
+        context = ElectionContext(request)
+        container.register_local_value(ElectionContext, context)
+        return context
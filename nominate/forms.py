@@ -1,3 +1,4 @@
+from collections import Counter
 from dataclasses import dataclass
 from itertools import groupby
 from operator import attrgetter
@@ -10,6 +11,7 @@ from django.db import models
 from django.utils.translation import gettext as _
 from markdownify.templatetags.markdownify import markdownify
 
+from .ballot_schema import NOMINATION_FIELDS, BallotSchema
 from .models import Category, Finalist, Nomination, Rank
 
 
@@ -27,6 +29,7 @@ class NominationForm(forms.BaseForm):
         *args,
         categories: list[Category],
         queryset: models.QuerySet | None = None,
+        schema: BallotSchema | None = None,
         **kwargs,
     ):
         self.categories = categories
@@ -44,27 +47,34 @@ class NominationForm(forms.BaseForm):
 
         fieldsets: dict[Category, list[list[forms.BoundField]]] = {}
         self.fieldsets_grouped_by_category = fieldsets
+        # the names of each category's fields, so a category can be posted on its own
+        self.field_names_by_category: dict[Category, list[str]] = {}
 
         self.fields = {}
         for category in self.categories:
-            field_descriptions = {
-                "field_1": category.field_1_description,
-                "field_2": category.field_2_description,
-                "field_3": category.field_3_description,
-            }
+            if schema is not None:
+                field_labels = schema.nomination_fields[category.id]
+            else:
+                field_labels = [
+                    (field_id, getattr(category, f"{field_id}_description"))
+                    for field_id in NOMINATION_FIELDS[: category.fields]
+                ]
             fieldset_list = fieldsets.setdefault(category, [])
             for nomination_entry in range(settings.NOMNOM_HUGO_NOMINATION_COUNT):
                 fieldset = []
                 fieldset_list.append(fieldset)
 
-                for field_id in ["field_1", "field_2", "field_3"][0 : category.fields]:
+                for field_id, label in field_labels:
                     form_field_id = f"{category.id}-{nomination_entry}-{field_id}"
                     kwargs = {
-                        "label": field_descriptions[field_id],
+                        "label": label,
                     }
                     field = category_field_definitions[field_id].formfield(**kwargs)
                     field.required = False
                     self.fields[form_field_id] = field
+                    self.field_names_by_category.setdefault(category, []).append(
+                        form_field_id
+                    )
 
                     # we go into the __getitem__ here because this is how the fields are bound.
                     # We could hack around this, but this way we're following the Django API.
@@ -89,9 +99,11 @@ class NominationForm(forms.BaseForm):
 
     def clean(self) -> dict[str, Any]:
         nominations: list[Nomination] = []
+        # the same nominations, by the category and the place on the ballot they were entered in
+        nominations_by_slot: dict[tuple[int, int], Nomination] = {}
         for category in self.categories:
             fieldset_list = self.fieldsets_grouped_by_category[category]
-            for fieldset in fieldset_list:
+            for slot, fieldset in enumerate(fieldset_list):
                 # for each fieldset, either all fields are blank or none are blank
                 set_values = [bf.value() for bf in fieldset]
                 required = [
@@ -108,9 +120,9 @@ class NominationForm(forms.BaseForm):
                     nomination_kwargs = dict(
                         zip(nomination_field_names, nomination_values)
                     )
-                    nominations.append(
-                        Nomination(category=category, **nomination_kwargs)
-                    )
+                    nomination = Nomination(category=category, **nomination_kwargs)
+                    nominations.append(nomination)
+                    nominations_by_slot[(category.id, slot)] = nomination
                     continue
 
                 if not any(set_values):
@@ -129,6 +141,7 @@ class NominationForm(forms.BaseForm):
                         )
 
         self.cleaned_data["nominations"] = nominations
+        self.cleaned_data["nominations_by_slot"] = nominations_by_slot
         return self.cleaned_data
 
 
@@ -140,9 +153,16 @@ class RankForm(forms.BaseForm):
         *args,
         finalists: Iterable[Finalist],
         ranks: Iterable[Rank] | None = None,
+        schema: BallotSchema | None = None,
         **kwargs,
     ):
         self.finalists = finalists
+        self.schema = schema
+        if schema is not None:
+            self.finalist_counts = schema.finalist_counts
+        else:
+            # the finalists are always whole categories
+            self.finalist_counts = Counter(f.category_id for f in finalists)
         self.ranks = {f: None for f in finalists}
         if ranks is not None:
             for rank in ranks:
@@ -167,13 +187,21 @@ class RankForm(forms.BaseForm):
             (category, unordered_fields[category])
             for category in sorted(unordered_fields, key=attrgetter("ballot_position"))
         ]
+        # the names of each category's fields, so a category can be posted on its own
+        self.field_names_by_category = {
+            category: [bf.html_name for bf in fields]
+            for category, fields in self.fields_grouped_by_category
+        }
 
         # autofocus all error fields; the browser will jump to the first one
         for field in self.errors:
             self[field].field.widget.attrs.update({"autofocus": ""})
 
     def field_for_finalist(self, finalist: Finalist) -> forms.Field:
-        label = markdownify(finalist.name, custom_settings="admin-label")
+        if self.schema is not None:
+            label = self.schema.finalist_labels[finalist.id]
+        else:
+            label = markdownify(finalist.name, custom_settings="admin-label")
         field = forms.ChoiceField(
             label=label,
             initial=self.ranks[finalist],
@@ -183,13 +211,14 @@ class RankForm(forms.BaseForm):
         return field
 
     def field_key(self, finalist):
-        return f"{finalist.category.id}_{finalist.id}"
+        return f"{finalist.category_id}_{finalist.id}"
 
     def ranks_from_category(
         self, finalist: Finalist
     ) -> list[tuple[int, str] | tuple[None, str]]:
         return [(None, _("Unranked"))] + [
-            (i + 1, str(i + 1)) for i in range(finalist.category.finalist_set.count())
+            (i + 1, str(i + 1))
+            for i in range(self.finalist_counts.get(finalist.category_id, 0))
         ]
 
     def clean(self) -> dict[str, Any] | None:
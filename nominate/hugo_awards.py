@@ -1,46 +1,280 @@
+import functools
+import inspect
+import multiprocessing
+import operator
+from collections import Counter
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from itertools import takewhile
+from itertools import groupby, repeat, takewhile
+from typing import Any
 
+import django
 import pyrankvote
 import pyrankvote.helpers
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections
+from django.db.models import F, Q
 from django.utils.safestring import mark_safe
 from nomnom.convention import HugoAwards
-from wsfs.rules.constitution_2023 import ballots_from_category
+from wsfs.rules.constitution_2023 import (
+    BALLOT_CHUNK_SIZE,
+    ballots_from_category,
+    ballots_from_tally,
+)
 
 from nominate import models
+from nominate.versioned_cache import CACHE_TIMEOUT, VersionedCache
+
+
+# Results are cached under a version of each category's ballot set
+RESULTS = VersionedCache("results")
 
 
 def get_results_for_election(
-    awards: HugoAwards, election: models.Election
+    awards: HugoAwards,
+    election: models.Election,
+    workers: int | None = None,
+    live: bool = False,
+) -> dict[models.Category, pyrankvote.helpers.ElectionResults]:
+    """Count every category in the election, in ballot order.
+
+    Results are cached against each category's ballot set version, so only the categories
+    that have had votes since their last count are counted again. With more than one worker
+    (`NOMNOM_COUNTING_WORKERS` by default), those are loaded and counted in a pool of processes.
+
+    A live count runs over the distinct rankings in the live tally, rather than every
+    member's ballot.
+    """
+    categories = list(election.category_set.all())
+
+    keys = {
+        c: RESULTS.key(v, "live" if live else "full", c.id)
+        for c, v in ballot_set_versions(categories)
+    }
+    results = cache.get_many(keys.values())
+
+    counted = count_categories(
+        awards, [c for c in categories if keys[c] not in results], workers, live
+    )
+    cache.set_many(
+        {keys[c]: result for c, result in counted.items()},
+        timeout=CACHE_TIMEOUT,
+    )
+    results.update((keys[c], result) for c, result in counted.items())
+
+    return {c: results[keys[c]] for c in categories}
+
+
+def count_categories(
+    awards: HugoAwards,
+    categories: list[models.Category],
+    workers: int | None = None,
+    live: bool = False,
 ) -> dict[models.Category, pyrankvote.helpers.ElectionResults]:
-    category_results: dict[models.Category, pyrankvote.helpers.ElectionResults] = {}
-    for c in election.category_set.all():
-        category_results[c] = run_election(awards, c)
+    if workers is None:
+        workers = settings.NOMNOM_COUNTING_WORKERS
+
+    if not can_count_in_parallel(workers, categories):
+        return {c: run_election(awards, c, live=live) for c in categories}
+
+    # The worker processes open their own database connections; make sure none of ours are
+    # inherited by them.
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(categories)),
+        initializer=setup_counting_worker,
+    ) as executor:
+        results = executor.map(
+            run_election_for_category_id,
+            repeat(awards),
+            [c.id for c in categories],
+            repeat(live),
+        )
+        return dict(zip(categories, results))
+
+
+def ballot_set_versions(
+    categories: list[models.Category],
+) -> list[tuple[models.Category, str]]:
+    """The current version of each category's ballot set.
+
+    A category that doesn't have a version yet, or has just been invalidated, gets a new one.
+    """
+    return list(zip(categories, RESULTS.versions((c.id,) for c in categories)))
+
+
+def invalidate_results(category_ids: Iterable[int]) -> None:
+    """Mark the ballot sets for these categories as changed, once the current transaction
+    commits."""
+    # Invalidating any earlier would let a count that started before the commit, and so
+    # didn't see the new ranks, be cached against the new version.
+    RESULTS.invalidate_many(
+        ((category_id,) for category_id in set(category_ids)), on_commit_only=True
+    )
+
+
+def ballot_signature(finalist_ids: Iterable[int]) -> str:
+    """The key for a ranking in the live tally; the finalist ids, most preferred first."""
+    return ",".join(str(finalist_id) for finalist_id in finalist_ids)
+
+
+def ballot_signatures_by_category(
+    positions: Iterable[tuple[models.Finalist, int | None]],
+) -> dict[int, str]:
+    """One member's ballot signature in each category, from the positions they gave finalists."""
+    ranked: dict[int, list[tuple[int, int]]] = {}
+    for finalist, position in positions:
+        category_ranks = ranked.setdefault(finalist.category_id, [])
+        if position is not None:
+            category_ranks.append((position, finalist.id))
+
+    return {
+        category_id: ballot_signature(finalist_id for _, finalist_id in sorted(ranks))
+        for category_id, ranks in ranked.items()
+    }
+
+
+def record_ballot_changes(changes: Iterable[tuple[int, str, str]]) -> None:
+    """Move members' ballots between rankings in the live tally.
+
+    Each change is a category id, along with the ballot's signature before and after the
+    change; an empty signature is no ballot at all.
+    """
+    changes = [(c, before, after) for c, before, after in changes if before != after]
+    removed = [(c, before) for c, before, _ in changes if before]
+    added = [(c, after) for c, _, after in changes if after]
+
+    # A member only has one ballot per category, so no row appears twice here.
+    if removed:
+        models.BallotSignature.objects.filter(
+            signatures_matching(removed), weight__gt=0
+        ).update(weight=F("weight") - 1)
+
+    if added:
+        models.BallotSignature.objects.bulk_create(
+            [
+                models.BallotSignature(category_id=category_id, signature=signature)
+                for category_id, signature in added
+            ],
+            ignore_conflicts=True,
+        )
+        models.BallotSignature.objects.filter(signatures_matching(added)).update(
+            weight=F("weight") + 1
+        )
+
+
+def signatures_matching(signatures: list[tuple[int, str]]) -> Q:
+    return functools.reduce(
+        operator.or_,
+        (
+            Q(category_id=category_id, signature=signature)
+            for category_id, signature in signatures
+        ),
+    )
 
-    return category_results
+
+def rebuild_ballot_tally(category_ids: Iterable[int]) -> None:
+    """Recount the live tally for these categories from their ranks."""
+    category_ids = set(category_ids)
+    models.BallotSignature.objects.filter(category_id__in=category_ids).delete()
+
+    category_ranks = (
+        models.Rank.objects.filter(
+            finalist__category_id__in=category_ids, position__isnull=False
+        )
+        .order_by("finalist__category_id", "membership_id", "position")
+        .values_list("finalist__category_id", "membership_id", "finalist_id")
+        .iterator(chunk_size=BALLOT_CHUNK_SIZE)
+    )
+    weights = Counter(
+        (category_id, ballot_signature(finalist_id for *_, finalist_id in ranks))
+        for (category_id, _), ranks in groupby(
+            category_ranks, key=operator.itemgetter(0, 1)
+        )
+    )
+
+    models.BallotSignature.objects.bulk_create(
+        models.BallotSignature(
+            category_id=category_id, signature=signature, weight=weight
+        )
+        for (category_id, signature), weight in weights.items()
+    )
+
+
+def can_count_in_parallel(workers: int, categories: list[models.Category]) -> bool:
+    if workers <= 1 or len(categories) <= 1:
+        return False
+
+    # The workers can't see anything that hasn't been committed yet, so they'd count
+    # different ballots from the ones we can see.
+    if connection.in_atomic_block:
+        return False
+
+    # daemonic processes, like some task workers, can't start children.
+    return not multiprocessing.current_process().daemon
+
+
+def setup_counting_worker() -> None:
+    # workers that are spawned, rather than forked, start without Django
+    if not apps.ready:
+        django.setup()
+
+
+def run_election_for_category_id(
+    awards: HugoAwards, category_id: int, live: bool = False
+) -> pyrankvote.helpers.ElectionResults:
+    return run_election(awards, models.Category.objects.get(id=category_id), live=live)
 
 
 def run_election(
     awards: HugoAwards,
     category: models.Category,
     excluded_finalists: list[str] | None = None,
+    live: bool = False,
 ) -> pyrankvote.helpers.ElectionResults:
-    election_ballots = ballots_from_category(
-        category, excluded_finalists=excluded_finalists
-    )
+    load_ballots = ballots_from_tally if live else ballots_from_category
+    election_ballots = load_ballots(category, excluded_finalists=excluded_finalists)
     maybe_no_award = [c for c in category.finalist_set.all() if c.name == "No Award"]
     if maybe_no_award:
         no_award = pyrankvote.Candidate(str(maybe_no_award[0]))
     else:
         no_award = None
 
+    if counts_weighted_ballots(awards.counter):
+        return awards.counter(
+            ballots=election_ballots.ballots,
+            candidates=election_ballots.candidates,
+            runoff_candidate=no_award,
+            ballot_weights=election_ballots.weights,
+        )
+
     return awards.counter(
-        ballots=election_ballots.ballots,
+        ballots=election_ballots.one_per_member(),
         candidates=election_ballots.candidates,
         runoff_candidate=no_award,
     )
 
 
+def counts_weighted_ballots(counter: Callable[..., Any]) -> bool:
+    """Whether the counter takes `ballot_weights` by name.
+
+    A counter that only swallows it in `**kwargs` would count each distinct ranking once, so
+    it's given one ballot per member instead, like any counter that doesn't take it.
+    """
+    try:
+        parameter = inspect.signature(counter).parameters.get("ballot_weights")
+    except (TypeError, ValueError):
+        return False
+
+    return parameter is not None and parameter.kind in (
+        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+        inspect.Parameter.KEYWORD_ONLY,
+    )
+
+
 @dataclass
 class VPR:
     votes: str | None
@@ -0,0 +1,39 @@
+"""Sending a task's emails over a single connection, a batch at a time.
+
+`EmailMessage.send()` opens a connection to the mail server, sends the one message and hangs
+up again; for a report going to a dozen recipients, that's a dozen SMTP handshakes and logins.
+Here, the messages are built as they're needed and sent in batches of
+`NOMNOM_EMAIL_BATCH_SIZE` over one connection, which stays open for the whole run. Each batch is
+handed back once it's been sent, so the caller can record what went out even if a later batch
+fails.
+"""
+
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from typing import TypeVar
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+T = TypeVar("T")
+
+
+def batches(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def send_in_batches(
+    items: Iterable[T],
+    build_message: Callable[[T], EmailMessage],
+    batch_size: int | None = None,
+) -> Iterator[list[T]]:
+    """Send a message for each of the items, over one connection, yielding the items a batch
+    at a time once their messages have been sent."""
+    batch_size = batch_size or settings.NOMNOM_EMAIL_BATCH_SIZE
+
+    with get_connection() as connection:
+        for batch in batches(items, batch_size):
+            connection.send_messages([build_message(item) for item in batch])
+            yield batch
@@ -0,0 +1,14 @@
+import djclick as click
+from nominate.ballot_export import write_ballot_matrix
+from nominate.models import Election
+
+
+@click.command()
+@click.argument("election_id")
+@click.argument("output", type=click.File("wb"))
+def main(election_id: str, output):
+    """Export the election's ballots as rank matrices, to an .npz file for numpy.load."""
+    election = Election.objects.get(slug=election_id)
+    write_ballot_matrix(election, output)
+    # on stderr, so that it stays out of the export when that's written to stdout
+    click.echo(f"Exported the ballots for {election.name}", err=True)
@@ -0,0 +1,68 @@
+# Generated by Django 5.0.6 on 2026-10-18 17:51
+
+from collections import Counter
+from itertools import groupby
+from operator import itemgetter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def tally_existing_ballots(apps, schema_editor):
+    Rank = apps.get_model("nominate", "Rank")
+    BallotSignature = apps.get_model("nominate", "BallotSignature")
+
+    category_ranks = (
+        Rank.objects.filter(position__isnull=False)
+        .order_by("finalist__category_id", "membership_id", "position")
+        .values_list("finalist__category_id", "membership_id", "finalist_id")
+        .iterator(chunk_size=10_000)
+    )
+    weights = Counter(
+        (category_id, ",".join(str(finalist_id) for *_, finalist_id in ranks))
+        for (category_id, _), ranks in groupby(category_ranks, key=itemgetter(0, 1))
+    )
+
+    BallotSignature.objects.bulk_create(
+        BallotSignature(category_id=category_id, signature=signature, weight=weight)
+        for (category_id, signature), weight in weights.items()
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nominate", "0025_merge_0023_finalist_short_name_0024_rank_rank_date"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BallotSignature",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("signature", models.TextField()),
+                ("weight", models.PositiveIntegerField(default=0)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="nominate.category",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="ballotsignature",
+            constraint=models.UniqueConstraint(
+                fields=("category", "signature"), name="unique_ballot_signature"
+            ),
+        ),
+        migrations.RunPython(tally_existing_ballots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:40
+
+import re
+import unicodedata
+
+from django.db import DatabaseError, migrations, models, transaction
+
+TRIGRAM_INDEX = "nominate_nomination_normalized_key_trgm"
+
+# A copy of nominate.canonicalize's normalization as it was when this migration was written,
+# so that later changes to it don't change what this backfills
+ARTICLES = frozenset(["a", "an", "the"])
+FIELD_SEPARATOR = " / "
+WORD = re.compile(r"[^\W_]+")
+
+
+def normalize(value):
+    text = value.casefold()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(word for word in WORD.findall(text) if word not in ARTICLES)
+
+
+def normalized_key(*values):
+    return FIELD_SEPARATOR.join(
+        normalized for normalized in map(normalize, values) if normalized
+    )
+
+
+def normalize_existing_nominations(apps, schema_editor):
+    Nomination = apps.get_model("nominate", "Nomination")
+
+    nominations = list(
+        Nomination.objects.select_related("category").only(
+            "field_1", "field_2", "field_3", "category__fields"
+        )
+    )
+    for nomination in nominations:
+        fields = [nomination.field_1, nomination.field_2, nomination.field_3]
+        nomination.normalized_key = normalized_key(
+            *fields[: nomination.category.fields]
+        )
+    Nomination.objects.bulk_update(nominations, ["normalized_key"], batch_size=1000)
+
+
+def create_trigram_index(apps, schema_editor):
+    """Index the keys with pg_trgm, if we can; without it, they're matched in memory."""
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+
+        try:
+            with transaction.atomic(using=connection.alias):
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except DatabaseError:
+            # installing extensions needs privileges we may not have
+            return
+
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON nominate_nomination "
+            "USING gin (normalized_key gin_trgm_ops)"
+        )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {TRIGRAM_INDEX}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nominate", "0026_ballotsignature"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="nomination",
+            name="normalized_key",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.RunPython(normalize_existing_nominations, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
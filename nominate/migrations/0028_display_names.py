@@ -0,0 +1,52 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:03
+
+from bs4 import BeautifulSoup
+from django.db import migrations, models
+from markdown import markdown
+
+
+# A copy of the strip_html_tags filter as it was when this migration was written, so that
+# later changes to it don't change what this backfills
+def html_text(html):
+    if html:
+        soup = BeautifulSoup(html, "html.parser")
+        return soup.get_text(separator=" ", strip=True)
+
+    return ""
+
+
+def set_display_names(apps, schema_editor):
+    Category = apps.get_model("nominate", "Category")
+    Finalist = apps.get_model("nominate", "Finalist")
+
+    categories = list(Category.objects.all())
+    for category in categories:
+        category.display_name = html_text(markdown(category.name))
+    Category.objects.bulk_update(categories, ["display_name"])
+
+    finalists = list(Finalist.objects.all())
+    for finalist in finalists:
+        finalist.display_name = html_text(
+            markdown(finalist.short_name or finalist.name)
+        )
+    Finalist.objects.bulk_update(finalists, ["display_name"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nominate", "0027_nomination_normalized_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="display_name",
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name="finalist",
+            name="display_name",
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(set_display_names, migrations.RunPython.noop),
+    ]
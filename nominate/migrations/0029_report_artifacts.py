@@ -0,0 +1,63 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nominate", "0028_display_names"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReportArtifact",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("report_name", models.CharField(max_length=100)),
+                ("parameters", models.CharField(blank=True, max_length=100)),
+                ("data_version", models.CharField(max_length=64)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("ready", "Ready"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                    ),
+                ),
+                ("filename", models.CharField(max_length=300)),
+                ("content_type", models.CharField(max_length=100)),
+                ("storage_name", models.CharField(blank=True, max_length=400)),
+                ("error", models.TextField(blank=True)),
+                ("requested_at", models.DateTimeField(auto_now_add=True)),
+                ("generated_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "election",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="nominate.election",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="reportartifact",
+            constraint=models.UniqueConstraint(
+                fields=("election", "report_name", "parameters", "data_version"),
+                name="unique_report_artifact",
+            ),
+        ),
+    ]
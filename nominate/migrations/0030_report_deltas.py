@@ -0,0 +1,54 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nominate", "0029_report_artifacts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="nominationadmindata",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.CreateModel(
+            name="ReportDelivery",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("last_sent_at", models.DateTimeField()),
+                ("last_full_sent_at", models.DateTimeField()),
+                (
+                    "election",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="nominate.election",
+                    ),
+                ),
+                (
+                    "recipient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="nominate.reportrecipient",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="reportdelivery",
+            constraint=models.UniqueConstraint(
+                fields=("recipient", "election"), name="unique_report_delivery"
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-18 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nominate", "0030_report_deltas"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reportartifact",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.6 on 2026-10-18 19:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("nominate", "0031_reportartifact_started_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReportRemoval",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("report_name", models.CharField(max_length=200)),
+                ("removed_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "election",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="nominate.election",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["election", "report_name", "removed_at"],
+                        name="report_removal_lookup",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -17,6 +17,11 @@ from nominate.templatetags.nomnom_filters import html_text
 UserModel = get_user_model()
 
 
+def markdown_text(value: str) -> str:
+    """The plain text of some markdown, for places that can't render it."""
+    return html_text(markdown(value))
+
+
 class NominatingMemberProfile(models.Model):
     class Meta:
         verbose_name = "Nominating Member Profile"
@@ -257,9 +262,14 @@ class Category(models.Model):
         null=True,
         help_text="This is only relevant if the field count means it'd be included",
     )
+    # the name as plain text, kept up to date on save
+    display_name = models.CharField(max_length=200, blank=True, editable=False)
 
     def __str__(self):
-        return html_text(markdown(self.name))
+        return self.display_name or markdown_text(self.name)
+
+    def get_display_name(self) -> str:
+        return markdown_text(self.name)
 
     def field_required(self, field_number: int) -> bool:
         if field_number == 1:
@@ -295,6 +305,8 @@ class Nomination(models.Model):
     field_1 = models.CharField(max_length=200)
     field_2 = models.CharField(max_length=200)
     field_3 = models.CharField(max_length=200)
+    # the fields, normalized for grouping variant spellings; see nominate.canonicalize
+    normalized_key = models.TextField(default="", blank=True, editable=False)
 
     nominator = models.ForeignKey(
         NominatingMemberProfile, on_delete=models.DO_NOTHING, null=False
@@ -345,6 +357,8 @@ class NominationAdminData(models.Model):
     )
 
     valid_nomination = models.BooleanField(default=True)
+    # when an admin last ruled on the nomination; bulk updates have to set this themselves
+    updated_at = models.DateTimeField(auto_now=True)
 
 
 class Finalist(models.Model):
@@ -364,10 +378,15 @@ class Finalist(models.Model):
         default=None,
         null=True,
     )
+    # the short name, or else the name, as plain text; kept up to date on save
+    display_name = models.TextField(blank=True, editable=False)
 
     def __str__(self):
         return self.short_name if self.short_name else self.name
 
+    def get_display_name(self) -> str:
+        return markdown_text(str(self))
+
     class Meta:
         ordering = ["ballot_position"]
 
@@ -394,6 +413,29 @@ class Rank(models.Model):
     rank_date = models.DateTimeField(null=False, auto_now=True)
 
 
+class BallotSignature(models.Model):
+    """The number of members who ranked a category's finalists in exactly this order.
+
+    This is kept up to date as ballots are cast, so that a live count only has to run over the
+    distinct rankings rather than every member's ballot.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "signature"], name="unique_ballot_signature"
+            ),
+        ]
+
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    # the ranked finalists' ids, most preferred first, separated by commas
+    signature = models.TextField()
+    weight = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.category}: {self.signature} x {self.weight}"
+
+
 # These models are configuration models specifically for admin operations.
 class ReportRecipient(models.Model):
     report_name = models.CharField(max_length=200)
@@ -401,6 +443,93 @@ class ReportRecipient(models.Model):
     recipient_email = models.CharField(max_length=200)
 
 
+class ReportDelivery(models.Model):
+    """The last time a recipient was sent an election's report, so that the next one can
+    contain only what's changed since."""
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipient", "election"], name="unique_report_delivery"
+            ),
+        ]
+
+    recipient = models.ForeignKey(ReportRecipient, on_delete=models.CASCADE)
+    election = models.ForeignKey(Election, on_delete=models.CASCADE)
+    # the time the last report was taken at, whether it was full or only the changes
+    last_sent_at = models.DateTimeField()
+    last_full_sent_at = models.DateTimeField()
+
+
+class ReportRemoval(models.Model):
+    """Rows deleted from an election's report, which a report of only the changes can't show.
+
+    One is kept for each save that deletes any, so that the recipients who'd have been sent
+    the changes since then are sent the whole report instead.
+    """
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["election", "report_name", "removed_at"],
+                name="report_removal_lookup",
+            ),
+        ]
+
+    election = models.ForeignKey(Election, on_delete=models.CASCADE)
+    report_name = models.CharField(max_length=200)
+    removed_at = models.DateTimeField(auto_now_add=True)
+
+
+class ReportArtifact(models.Model):
+    """A report that's been generated in the background, and where it was stored.
+
+    Each one is for the report's data as it was at `data_version`; until that changes, the
+    stored report is served rather than generated again.
+    """
+
+    class STATUS:
+        PENDING = "pending"
+        RUNNING = "running"
+        READY = "ready"
+        FAILED = "failed"
+
+    STATUS_CHOICES = (
+        (STATUS.PENDING, _("Pending")),
+        (STATUS.RUNNING, _("Running")),
+        (STATUS.READY, _("Ready")),
+        (STATUS.FAILED, _("Failed")),
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["election", "report_name", "parameters", "data_version"],
+                name="unique_report_artifact",
+            ),
+        ]
+
+    election = models.ForeignKey(Election, on_delete=models.CASCADE)
+    report_name = models.CharField(max_length=100)
+    # anything else the report was built from, such as its category
+    parameters = models.CharField(max_length=100, blank=True)
+    data_version = models.CharField(max_length=64)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default=STATUS.PENDING
+    )
+    filename = models.CharField(max_length=300)
+    content_type = models.CharField(max_length=100)
+    # the name the report was stored under
+    storage_name = models.CharField(max_length=400, blank=True)
+    error = models.TextField(blank=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    generated_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+
+
 # Admin Messages
 class AdminMessage(models.Model):
     message = models.TextField(help_text="Markdown field for the admin message")
@@ -0,0 +1,85 @@
+"""Users' effective permissions, for checking their rights in the elections.
+
+Checking a right asks the authentication backends, and the ModelBackend only remembers the
+answer on the user object, so every request loads the user's permissions from the database
+again. Members' rights only change when the social auth pipeline adds them to the nominating
+or voting groups, or when an admin edits the groups, so each user's permissions are cached
+between requests instead, under a version that's replaced whenever any group or permission
+changes.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from django.contrib.auth.models import AbstractBaseUser, AnonymousUser
+from django.core.cache import cache
+
+from nominate.versioned_cache import CACHE_TIMEOUT, VersionedCache, delete_keys
+
+
+@dataclass(frozen=True)
+class PermissionSnapshot:
+    """A user's effective permissions, read all at once.
+
+    It stands in for the user anywhere only their permissions are checked, such as
+    `Election.user_can_nominate`, so that a page checking rights on many elections asks the
+    authentication backends once rather than for every check.
+    """
+
+    is_authenticated: bool
+    is_superuser: bool
+    permissions: frozenset[str]
+
+    @classmethod
+    def of(cls, user: AbstractBaseUser | AnonymousUser) -> "PermissionSnapshot":
+        # as with the ModelBackend, inactive users have no permissions at all, and superusers
+        # have all of them
+        if not user.is_active:
+            return cls(user.is_authenticated, False, frozenset())
+
+        if user.is_superuser:
+            return cls(user.is_authenticated, True, frozenset())
+
+        return cls(user.is_authenticated, False, frozenset(user.get_all_permissions()))
+
+    @property
+    def is_anonymous(self) -> bool:
+        return not self.is_authenticated
+
+    def has_perm(self, perm: str, obj=None) -> bool:
+        return self.is_superuser or perm in self.permissions
+
+    def has_perms(self, perm_list: Iterable[str], obj=None) -> bool:
+        return all(self.has_perm(perm, obj) for perm in perm_list)
+
+
+PERMISSIONS = VersionedCache("permissions")
+
+
+def user_permissions(user: AbstractBaseUser | AnonymousUser) -> PermissionSnapshot:
+    """The user's permissions, from the cache if they've been read since they last changed."""
+    if not user.is_authenticated:
+        return PermissionSnapshot.of(user)
+
+    key = PERMISSIONS.key(PERMISSIONS.version(), user.pk)
+
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = PermissionSnapshot.of(user)
+        cache.set(key, snapshot, timeout=CACHE_TIMEOUT)
+
+    return snapshot
+
+
+def invalidate_user_permissions(user_ids: Iterable[int]) -> None:
+    """Forget these users' cached permissions, leaving everyone else's alone."""
+    version = PERMISSIONS.current_version()
+    if version is None:
+        return
+
+    delete_keys([PERMISSIONS.key(version, user_id) for user_id in user_ids])
+
+
+def invalidate_all_permissions() -> None:
+    """Forget everyone's cached permissions, for changes to a group or a permission."""
+    PERMISSIONS.invalidate()
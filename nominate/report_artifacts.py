@@ -0,0 +1,214 @@
+"""Reports generated in the background, and stored until their data changes.
+
+Building a report ties up a web worker for as long as it takes, and several staff pulling
+reports at once can stall the site. When `NOMNOM_REPORTS_IN_BACKGROUND` is set, the report
+views instead record a `ReportArtifact` for the report's current data version and hand it to
+a Celery task, which stores the finished report; until then, the view shows a page that polls
+for it. Once it's ready, it's served to everyone who asks for that report, until the data
+behind it changes. A report that's been waiting or generating for longer than
+`REPORT_STALE_AFTER` is assumed to have been lost with its worker, and is queued again.
+
+Once a report's been stored, the ones for its earlier data are deleted, files and all.
+
+The reports are stored in the S3 bucket named by `NOMNOM_REPORT_S3_BUCKET`, through the
+packet's S3 client, or otherwise in the `NOMNOM_REPORT_FILE_ROOT` directory.
+"""
+
+import tempfile
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Protocol
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect
+from django.utils import timezone
+from django_svcs.apps import svcs_from
+
+from nominate import models
+
+# How long a link to a report stored in S3 is good for
+REPORT_URL_EXPIRY = 5 * 60
+
+# How long the pending page waits before asking again
+REPORT_POLL_SECONDS = 2
+
+# How long a report can wait for a worker, or be generated, before it's queued again
+REPORT_STALE_AFTER = timedelta(minutes=30)
+
+
+class ReportStorage(Protocol):
+    def save(self, name: str, chunks: Iterable[str | bytes]) -> None: ...
+
+    def response(self, artifact: models.ReportArtifact) -> HttpResponse: ...
+
+    def delete(self, name: str) -> None: ...
+
+
+def encoded(chunks: Iterable[str | bytes]) -> Iterable[bytes]:
+    for chunk in chunks:
+        yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+class FileSystemReportStorage:
+    def __init__(self, root: Path | str):
+        self.root = Path(root)
+
+    def path(self, name: str) -> Path:
+        return self.root / name
+
+    def save(self, name: str, chunks: Iterable[str | bytes]) -> None:
+        path = self.path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as file:
+            file.writelines(encoded(chunks))
+
+    def response(self, artifact: models.ReportArtifact) -> HttpResponse:
+        return FileResponse(
+            self.path(artifact.storage_name).open("rb"),
+            as_attachment=True,
+            filename=artifact.filename,
+            content_type=artifact.content_type,
+        )
+
+    def delete(self, name: str) -> None:
+        path = self.path(name)
+        path.unlink(missing_ok=True)
+        # each report is stored in a directory of its own
+        try:
+            path.parent.rmdir()
+        except OSError:
+            pass
+
+
+class S3ReportStorage:
+    def __init__(self, client, bucket: str):
+        self.client = client
+        self.bucket = bucket
+
+    def save(self, name: str, chunks: Iterable[str | bytes]) -> None:
+        # spooled to disk past a few megabytes, so a large report isn't held in memory
+        with tempfile.SpooledTemporaryFile(max_size=4 * 1024 * 1024) as file:
+            file.writelines(encoded(chunks))
+            file.seek(0)
+            self.client.upload_fileobj(file, self.bucket, name)
+
+    def response(self, artifact: models.ReportArtifact) -> HttpResponse:
+        url = self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": artifact.storage_name,
+                "ResponseContentType": artifact.content_type,
+                "ResponseContentDisposition": f'attachment; filename="{artifact.filename}"',
+            },
+            ExpiresIn=REPORT_URL_EXPIRY,
+        )
+        return HttpResponseRedirect(url)
+
+    def delete(self, name: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=name)
+
+
+def get_report_storage() -> ReportStorage:
+    if settings.NOMNOM_REPORT_S3_BUCKET:
+        from hugopacket.apps import S3Client
+
+        return S3ReportStorage(
+            svcs_from(settings).get(S3Client), settings.NOMNOM_REPORT_S3_BUCKET
+        )
+
+    return FileSystemReportStorage(settings.NOMNOM_REPORT_FILE_ROOT)
+
+
+def needs_requeueing(now: datetime) -> Q:
+    """The artifacts that failed, or that have been pending or running for so long that
+    their worker must have been lost."""
+    stale = now - REPORT_STALE_AFTER
+    return (
+        Q(status=models.ReportArtifact.STATUS.FAILED)
+        | Q(status=models.ReportArtifact.STATUS.PENDING, requested_at__lt=stale)
+        | Q(status=models.ReportArtifact.STATUS.RUNNING, started_at__lt=stale)
+    )
+
+
+def request_report(report, content_type: str) -> models.ReportArtifact:
+    """The stored report for the report's current data, queueing it to be generated if it
+    hasn't been yet, if it failed last time, or if it's been lost."""
+    from nominate.tasks import generate_report
+
+    artifact, created = models.ReportArtifact.objects.get_or_create(
+        election=report.election,
+        report_name=report.report_name,
+        parameters=report.parameters,
+        data_version=report.data_version(),
+        defaults={"filename": report.get_filename(), "content_type": content_type},
+    )
+
+    if not created and artifact.status != models.ReportArtifact.STATUS.READY:
+        # only one request gets to retry it
+        now = timezone.now()
+        created = bool(
+            models.ReportArtifact.objects.filter(
+                needs_requeueing(now), id=artifact.id
+            ).update(
+                status=models.ReportArtifact.STATUS.PENDING,
+                error="",
+                requested_at=now,
+                started_at=None,
+            )
+        )
+        if created:
+            artifact.status = models.ReportArtifact.STATUS.PENDING
+
+    if created:
+        transaction.on_commit(lambda: generate_report.delay(artifact.id))
+
+    return artifact
+
+
+def store_report(artifact: models.ReportArtifact, report) -> None:
+    """Generate the report and store it, recording how that went on the artifact."""
+    artifact.status = models.ReportArtifact.STATUS.RUNNING
+    artifact.started_at = timezone.now()
+    artifact.storage_name = (
+        f"{artifact.election.slug}/{artifact.id}-{artifact.data_version}"
+        f"/{artifact.filename}"
+    )
+    artifact.save(update_fields=["status", "started_at", "storage_name"])
+
+    try:
+        get_report_storage().save(artifact.storage_name, report.stream())
+    except Exception as e:
+        artifact.status = models.ReportArtifact.STATUS.FAILED
+        artifact.error = repr(e)
+        artifact.save(update_fields=["status", "error"])
+        raise
+
+    artifact.status = models.ReportArtifact.STATUS.READY
+    artifact.generated_at = timezone.now()
+    artifact.save(update_fields=["status", "generated_at"])
+
+    delete_superseded_reports(artifact)
+
+
+def delete_superseded_reports(artifact: models.ReportArtifact) -> None:
+    """Delete the stored reports for this report's earlier data, now that it's ready.
+
+    Earlier ones still being generated are left to finish, unless they've been lost.
+    """
+    superseded = models.ReportArtifact.objects.filter(
+        Q(status=models.ReportArtifact.STATUS.READY) | needs_requeueing(timezone.now()),
+        election=artifact.election,
+        report_name=artifact.report_name,
+        parameters=artifact.parameters,
+        id__lt=artifact.id,
+    )
+
+    storage = get_report_storage()
+    for old in superseded:
+        if old.storage_name:
+            storage.delete(old.storage_name)
+        old.delete()
@@ -0,0 +1,164 @@
+"""Scheduled report emails that carry only what's changed since the recipient's last one.
+
+The nominations and ranks reports are mailed to their recipients on a schedule, and a full
+report repeats every row, every time. Sent in delta mode, each recipient is instead sent the
+rows added or edited since their last report, and nominations an admin has ruled on since;
+when each recipient was last sent the report is kept in a `ReportDelivery`, and only moved on
+once the email's been sent.
+
+Ballots are saved as the difference from what was cast before, so a nomination or rank the
+member removes is deleted outright and can't show up in the changes. Each save that deletes
+any records a `ReportRemoval`, and a recipient whose changes would start before one is sent
+the whole report instead. A full report also goes out once the recipient's last one is
+`FULL_REPORT_INTERVAL` old.
+
+Either way, the report is gzipped before it's attached. Each distinct report is generated and
+rendered once, however many recipients it goes to, and they're all sent over one connection.
+"""
+
+import gzip
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.core.mail import EmailMultiAlternatives
+from django.db.models import Max
+
+from nominate import mail, models
+
+# How often a recipient is sent the whole report, even in delta mode
+FULL_REPORT_INTERVAL = timedelta(days=1)
+
+# How far before the last report the next one's changes start, so that a row saved while the
+# last report was being read isn't missed; it'll be in both
+DELTA_OVERLAP = timedelta(minutes=5)
+
+
+@dataclass(frozen=True)
+class Attachment:
+    filename: str
+    content: bytes
+    mimetype: str = "application/gzip"
+
+    @classmethod
+    def compressed(cls, filename: str, content: str) -> "Attachment":
+        return cls(f"{filename}.gz", gzip.compress(content.encode("utf-8")))
+
+    def as_tuple(self) -> tuple[str, bytes, str]:
+        return (self.filename, self.content, self.mimetype)
+
+
+@dataclass(frozen=True)
+class ReportEmail:
+    """A report's email, rendered, to be sent on to each of its recipients."""
+
+    subject: str
+    from_email: str
+    text_content: str
+    html_content: str
+    attachment: Attachment
+
+    def message(self, to: str) -> EmailMultiAlternatives:
+        message = EmailMultiAlternatives(
+            subject=self.subject,
+            from_email=self.from_email,
+            body=self.text_content,
+            to=[to],
+            attachments=[self.attachment.as_tuple()],
+        )
+        message.attach_alternative(self.html_content, "text/html")
+        return message
+
+
+# Where a report is going: the address, the recipient if it's a configured one, and when its
+# changes start from, or None for the whole report
+Send = tuple[str, models.ReportRecipient | None, datetime | None]
+
+
+def deliveries_for(
+    election: models.Election, recipients: list[models.ReportRecipient]
+) -> dict[int, models.ReportDelivery]:
+    """The recipients' last deliveries of the election's report, by recipient id."""
+    return {
+        delivery.recipient_id: delivery
+        for delivery in models.ReportDelivery.objects.filter(
+            election=election, recipient__in=recipients
+        )
+    }
+
+
+def record_removals(report_name: str, election_ids: Iterable[int]) -> None:
+    """Note that rows have just been deleted from these elections' report."""
+    models.ReportRemoval.objects.bulk_create(
+        models.ReportRemoval(election_id=election_id, report_name=report_name)
+        for election_id in set(election_ids)
+    )
+
+
+def last_removal(election: models.Election, report_name: str) -> datetime | None:
+    """When rows were last deleted from the election's report, if they ever have been."""
+    return models.ReportRemoval.objects.filter(
+        election=election, report_name=report_name
+    ).aggregate(last=Max("removed_at"))["last"]
+
+
+def changes_since(
+    delivery: models.ReportDelivery | None,
+    report_date: datetime,
+    delta: bool,
+    last_removed_at: datetime | None = None,
+) -> datetime | None:
+    """When the recipient's report should start from, or None if they're due the whole of
+    it."""
+    if not delta or delivery is None:
+        return None
+
+    if report_date - delivery.last_full_sent_at >= FULL_REPORT_INTERVAL:
+        return None
+
+    since = delivery.last_sent_at - DELTA_OVERLAP
+    if last_removed_at is not None and last_removed_at > since:
+        return None
+
+    return since
+
+
+def record_delivery(
+    recipient: models.ReportRecipient,
+    election: models.Election,
+    report_date: datetime,
+    full: bool,
+) -> None:
+    """Move the recipient's watermark on to the report they've just been sent."""
+    defaults = {"last_sent_at": report_date}
+    if full:
+        defaults["last_full_sent_at"] = report_date
+
+    models.ReportDelivery.objects.update_or_create(
+        recipient=recipient,
+        election=election,
+        defaults=defaults,
+        create_defaults={"last_sent_at": report_date, "last_full_sent_at": report_date},
+    )
+
+
+def send_reports(
+    election: models.Election,
+    report_date: datetime,
+    sends: Sequence[Send],
+    email_for: Callable[[datetime | None], ReportEmail],
+) -> None:
+    """Send each recipient their report, building each distinct one only once, and record
+    the deliveries a batch at a time as they go out."""
+    emails: dict[datetime | None, ReportEmail] = {}
+
+    def build_message(send: Send) -> EmailMultiAlternatives:
+        address, _, since = send
+        if since not in emails:
+            emails[since] = email_for(since)
+        return emails[since].message(address)
+
+    for batch in mail.send_in_batches(sends, build_message):
+        for _, recipient, since in batch:
+            if recipient is not None:
+                record_delivery(recipient, election, report_date, full=since is None)
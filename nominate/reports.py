@@ -1,10 +1,11 @@
 import csv
-import functools
+import hashlib
+import uuid
 from abc import abstractmethod
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
-from io import StringIO
-from itertools import groupby
+from io import BytesIO, StringIO
+from itertools import chain
 from pathlib import Path
 from typing import Any
 
@@ -13,16 +14,22 @@ from django.contrib.auth.decorators import (
     permission_required,
     user_passes_test,
 )
-from django.db.models import Case, F, Q, QuerySet, TextField, Value, When
-from django.http import HttpRequest, HttpResponse, HttpResponseBase
-from django.shortcuts import get_object_or_404, render
+from django.conf import settings
+from django.db.models import Case, Count, F, Max, Q, QuerySet, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.http import HttpRequest, HttpResponseBase, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
+from django.template.response import TemplateResponse
 from django.utils.decorators import method_decorator
+from django.utils.html import escape
 from django.views.generic import View
-from markdown import markdown
 
-from nominate import models
-from nominate.decorators import user_passes_test_or_forbidden
-from nominate.templatetags.nomnom_filters import html_text
+from nominate import models, report_artifacts
+from nominate.ballot_export import write_ballot_matrix
+from nominate.ballot_schema import ballot_schema_version
+from nominate.decorators import memoized, user_passes_test_or_forbidden
+from nominate.election_context import get_election
 
 report_decorators = [
     user_passes_test(lambda u: u.is_staff, login_url="/admin/login/"),
@@ -38,6 +45,20 @@ raw_report_decorators = [
 ]
 
 
+# How many rows to fetch from the database at a time while streaming a report
+REPORT_CHUNK_SIZE = 2000
+
+# Roughly how many characters of CSV to gather before sending them on to the client
+REPORT_BUFFER_SIZE = 64 * 1024
+
+
+class Echo:
+    """A file-like object for the CSV writer that hands back each line instead of storing it."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
 class ReportWriter:
     @abstractmethod
     def add_header(self, field_names) -> "ReportWriter": ...
@@ -52,9 +73,45 @@ class CSVWriter(ReportWriter): ...
 
 
 class Report:
+    # what the report's known as when it's generated in the background
+    report_name: str = "report"
+    # the fields whose latest value changes whenever a row of the report is edited
+    version_fields: tuple[str, ...] = ()
+
+    election: models.Election
+
     @abstractmethod
     def query_set(self) -> QuerySet: ...
 
+    @classmethod
+    def for_election(cls, election: models.Election, parameters: str) -> "Report":
+        """The report again, from what `parameters` recorded about it."""
+        return cls(election)
+
+    @property
+    def parameters(self) -> str:
+        return ""
+
+    def version_query_set(self) -> QuerySet:
+        return self.query_set()
+
+    def data_version(self) -> str:
+        """A fingerprint of the report's data, which changes whenever a row of it is added,
+        removed or edited, or the election's ballot is."""
+        aggregates = (
+            self.version_query_set()
+            .order_by()
+            .aggregate(
+                count=Count("pk"),
+                ids=Sum("pk"),
+                **{f"latest_{field}": Max(field) for field in self.version_fields},
+            )
+        )
+        fingerprint = repr(
+            (sorted(aggregates.items()), ballot_schema_version(self.election.id))
+        )
+        return hashlib.sha256(fingerprint.encode()).hexdigest()[:32]
+
     def get_content_type(self) -> str:
         return getattr(self, "content_type", "text/csv")
 
@@ -80,14 +137,33 @@ class Report:
     def build_report_header(self, writer) -> None:
         writer.writerow(self.get_field_names())
 
-    def build_report(self, writer) -> None:
-        query_set = self.query_set()
+    def rows(self) -> Iterator[list[Any]]:
+        """The report's header and then its rows, read from the database in chunks."""
         field_names = self.get_field_names()
+        yield field_names
 
-        self.build_report_header(writer)
+        for obj in self.query_set().iterator(chunk_size=REPORT_CHUNK_SIZE):
+            yield [getattr(obj, field) for field in field_names]
 
-        for obj in query_set:
-            writer.writerow([getattr(obj, field) for field in field_names])
+    def build_report(self, writer) -> None:
+        writer.writerows(self.rows())
+
+    def stream(self) -> Iterator[str]:
+        """The report as CSV, a buffer at a time, without holding the whole of it in memory."""
+        writer = csv.writer(Echo())
+        buffer = []
+        size = 0
+        for row in self.rows():
+            line = writer.writerow(row)
+            buffer.append(line)
+            size += len(line)
+            if size >= REPORT_BUFFER_SIZE:
+                yield "".join(buffer)
+                buffer = []
+                size = 0
+
+        if buffer:
+            yield "".join(buffer)
 
     def get_report_header(self) -> str:
         string = StringIO()
@@ -103,6 +179,8 @@ class Report:
 
 
 class NominationsReport(Report):
+    report_name = "nominations"
+    version_fields = ("nomination_date",)
     extra_fields = ["email", "member_number"]
     content_type = "text/csv"
 
@@ -129,70 +207,183 @@ class NominationsReport(Report):
         )
 
 
+class NominationChangesReport(NominationsReport):
+    """The nominations made or edited since `since`, and the ones an admin has ruled on since,
+    valid or not."""
+
+    extra_fields = ["email", "member_number", "valid"]
+
+    def __init__(self, election: models.Election, since: datetime):
+        super().__init__(election)
+        self.since = since
+
+    @property
+    def filename(self) -> str:
+        return f"{self.election.slug}-nomination-changes.csv"
+
+    def query_set(self) -> QuerySet:
+        return (
+            models.Nomination.objects.filter(category__election=self.election)
+            .filter(
+                Q(nomination_date__gt=self.since) | Q(admin__updated_at__gt=self.since)
+            )
+            .select_related("nominator__user", "category")
+            .annotate(
+                preferred_name=F("nominator__preferred_name"),
+                member_number=F("nominator__member_number"),
+                username=F("nominator__user__username"),
+                email=F("nominator__user__email"),
+                valid=Coalesce("admin__valid_nomination", Value(True)),
+            )
+        )
+
+
+def ballot_matrix(
+    ranks: QuerySet[models.Rank], finalists: Iterable[models.Finalist]
+) -> QuerySet:
+    """The ranks pivoted into one row per member: their member number and name, and then the
+    position they gave each of the finalists, or None.
+
+    The pivot is done by the database, in a single query, with one conditional aggregate per
+    finalist.
+    """
+    positions = {
+        f"finalist_{finalist.id}": Max("position", filter=Q(finalist_id=finalist.id))
+        for finalist in finalists
+    }
+    return (
+        ranks.values(
+            "membership", "membership__member_number", "membership__preferred_name"
+        )
+        .annotate(**positions)
+        .order_by("membership")
+        .values_list(
+            "membership__member_number", "membership__preferred_name", *positions
+        )
+    )
+
+
 class CategoryVotingReport(Report):
+    report_name = "category-votes"
+    version_fields = ("rank_date",)
+
     def __init__(self, category: models.Category):
         self.category = category
         self.election = category.election
 
+    @classmethod
+    def for_election(cls, election: models.Election, parameters: str) -> Report:
+        return cls(models.Category.objects.get(election=election, id=int(parameters)))
+
+    @property
+    def parameters(self) -> str:
+        return str(self.category.id)
+
+    def version_query_set(self) -> QuerySet:
+        return models.Rank.objects.filter(finalist__category=self.category)
+
     @property
     def filename(self) -> str:
         return f"{self.election.slug}-{self.category.id}-voting-report.csv"
 
-    def query_set(self) -> QuerySet:
-        return models.Rank.objects.filter(
-            finalist__category=self.category
-        ).select_related("membership__user", "finalist")
-
-    def get_finalists(self) -> Iterable[models.Finalist]:
-        return (
+    @memoized
+    def get_finalists(self) -> list[models.Finalist]:
+        # The finalist columns _must be stable_, so they're in ballot order; and because it's
+        # possible for a member not to have ranked a finalist, they come from the category,
+        # not the ranks.
+        return list(
             models.Finalist.objects.filter(category=self.category)
+            .select_related("category")
             .order_by("category__ballot_position", "ballot_position")
-            .all()
+        )
+
+    def query_set(self) -> QuerySet:
+        return ballot_matrix(
+            models.Rank.objects.filter(finalist__category=self.category),
+            self.get_finalists(),
         )
 
     def get_field_names(self):
-        # The field names are: the member ID, the member name, one per finalist. The question is...
-        # do we want one report per category, or one overall report?
-        finalists = self.get_finalists()
         return [
             "member_id",
             "name",
-        ] + [str(f) for f in finalists]
-
-    def process(self, query_set: QuerySet) -> Iterable[Any]:
-        # The queryset is per-finalist-rank. What we want is per-member, with columns for each
-        # finalist. The finalist columns _must be stable_; we can't rely on the order of the
-        # queryset. so we'll depend on the built in ballot order for both the finalists and the
-        # categories. Also, because it's possible for a member not to have ranked a finalist, we get
-        # our finalist list from the category set, not the query set.
-        sorted_by_member = query_set.order_by(
-            "membership", "finalist__category__ballot_position"
+        ] + [str(f) for f in self.get_finalists()]
+
+    def rows(self) -> Iterator[Any]:
+        yield self.get_field_names()
+        yield from self.query_set().iterator(chunk_size=REPORT_CHUNK_SIZE)
+
+
+class ElectionVotingReport(CategoryVotingReport):
+    """Every member's ballot, with a column for each finalist in every category."""
+
+    report_name = "vote-matrix"
+
+    def __init__(self, election: models.Election):
+        self.election = election
+
+    @classmethod
+    def for_election(cls, election: models.Election, parameters: str) -> Report:
+        return cls(election)
+
+    @property
+    def parameters(self) -> str:
+        return ""
+
+    def version_query_set(self) -> QuerySet:
+        return models.Rank.objects.filter(finalist__category__election=self.election)
+
+    @property
+    def filename(self) -> str:
+        return f"{self.election.slug}-voting-matrix-report.csv"
+
+    @memoized
+    def get_finalists(self) -> list[models.Finalist]:
+        return list(
+            models.Finalist.objects.filter(category__election=self.election)
+            .select_related("category")
+            .order_by("category__ballot_position", "ballot_position")
         )
 
-        grouper: Iterable[
-            tuple[models.NominatingMemberProfile, Iterable[models.Rank]]
-        ] = groupby(sorted_by_member, key=lambda x: x.membership)
-        for member, rows in grouper:
-            yield [member.member_number, member.preferred_name] + [
-                pos for _, pos in self.ranks_for_member(rows)
-            ]
+    def query_set(self) -> QuerySet:
+        return ballot_matrix(
+            models.Rank.objects.filter(finalist__category__election=self.election),
+            self.get_finalists(),
+        )
 
-    def ranks_for_member(
-        self, rows: Iterable[models.Rank]
-    ) -> list[tuple[models.Finalist, int | None]]:
-        rfm = {r.finalist: r.position for r in rows}
-        return [(f, rfm.get(f)) for f in self.get_finalists()]
+    def get_field_names(self):
+        return [
+            "member_id",
+            "name",
+        ] + [f"{f.category}: {f}" for f in self.get_finalists()]
 
-    def build_report(self, writer) -> None:
-        query_set = self.query_set()
 
-        self.build_report_header(writer)
+class BallotMatrixReport(Report):
+    """The election's ballots as rank matrices, in NumPy's `.npz` format."""
 
-        for obj in self.process(query_set):
-            writer.writerow(obj)
+    report_name = "ballot-matrix"
+    version_fields = ("rank_date",)
+
+    def __init__(self, election: models.Election):
+        self.election = election
+
+    @property
+    def filename(self) -> str:
+        return f"{self.election.slug}-ballot-matrix.npz"
+
+    def query_set(self) -> QuerySet:
+        return models.Rank.objects.filter(finalist__category__election=self.election)
+
+    def stream(self) -> Iterator[bytes]:
+        # the matrices are compact, so the archive is built in memory and sent in one go
+        buffer = BytesIO()
+        write_ballot_matrix(self.election, buffer, chunk_size=REPORT_CHUNK_SIZE)
+        yield buffer.getvalue()
 
 
 class InvalidatedNominationsReport(Report):
+    report_name = "invalidated-nominations"
+    version_fields = ("nomination_date",)
     extra_fields = ["email", "member_number"]
     content_type = "text/csv"
 
@@ -228,20 +419,17 @@ class ElectionReportView(View):
     def get_report_class(self):
         return getattr(self, "report_class", NominationsReport)
 
-    @functools.lru_cache
+    @memoized
     def election(self) -> models.Election:
-        return get_object_or_404(models.Election, slug=self.kwargs.get("election_id"))
+        return get_election(self.kwargs.get("election_id"))
 
-    @functools.lru_cache
+    @memoized
     def report(self) -> Report:
         return self.build_report()
 
     def build_report(self):
         return self.get_report_class()(self.election())
 
-    def get_writer(self, response) -> Any:
-        return csv.writer(response)
-
     def dispatch(
         self, request: HttpRequest, *args: Any, **kwargs: Any
     ) -> HttpResponseBase:
@@ -256,33 +444,51 @@ class ElectionReportView(View):
             return self.render_report_in_page(
                 request, self.html_template_name, report, *args, **kwargs
             )
+        elif settings.NOMNOM_REPORTS_IN_BACKGROUND:
+            return self.get_stored_report_response(request, report, *args, **kwargs)
         else:
             return self.get_raw_report_response(request, report, *args, **kwargs)
 
+    def get_stored_report_response(self, request, report, *args, **kwargs):
+        artifact = report_artifacts.request_report(report, self.content_type)
+        if artifact.status == models.ReportArtifact.STATUS.READY:
+            return report_artifacts.get_report_storage().response(artifact)
+
+        return TemplateResponse(
+            request,
+            "nominate/reports/report_pending.html",
+            {
+                "artifact": artifact,
+                "poll_seconds": report_artifacts.REPORT_POLL_SECONDS,
+            },
+            status=202,
+        )
+
     def get_raw_report_response(self, request, report, *args, **kwargs):
-        response = HttpResponse(content_type=self.content_type)
+        response = StreamingHttpResponse(
+            report.stream(), content_type=self.content_type
+        )
         if self.is_attachment:
             response["Content-Disposition"] = (
                 f'attachment; filename="{report.get_filename()}"'
             )
 
-        report.build_report(self.get_writer(response))
-
         return response
 
     def render_report_in_page(
         self, request, html_template_name, report, *args, **kwargs
     ):
-        report_content = StringIO()
-        report.build_report(csv.writer(report_content))
-
-        return render(
-            request,
+        # Render the page around a placeholder, and stream the report in where it goes
+        placeholder = uuid.uuid4().hex
+        page = render_to_string(
             html_template_name,
-            {
-                "report": report,
-                "report_content": report_content.getvalue(),
-            },
+            {"report": report, "report_content": placeholder},
+            request=request,
+        )
+        before, after = page.split(placeholder, 1)
+
+        return StreamingHttpResponse(
+            chain([before], map(escape, report.stream()), [after])
         )
 
 
@@ -295,6 +501,9 @@ class InvalidatedNominations(ElectionReportView):
 
 
 class RanksReport(Report):
+    report_name = "votes"
+    version_fields = ("rank_date",)
+
     def __init__(self, election: models.Election):
         self.election = election
 
@@ -305,18 +514,10 @@ class RanksReport(Report):
     def query_set(self) -> QuerySet:
         return (
             models.Rank.objects.filter(finalist__category__election=self.election)
-            .select_related("membership__user", "finalist", "finalist__category")
             .annotate(
                 member_number=F("membership__member_number"),
-                category=F("finalist__category__name"),
-                finalist_name=Case(
-                    When(
-                        finalist__short_name__isnull=False,
-                        then=F("finalist__short_name"),
-                    ),
-                    default=F("finalist__name"),
-                    output_field=TextField(),
-                ),
+                category=F("finalist__category__display_name"),
+                finalist_name=F("finalist__display_name"),
                 ip_address=Case(
                     When(voter_ip_address__isnull=False, then=F("voter_ip_address")),
                     default=Value("*NOIP*"),
@@ -339,16 +540,32 @@ class RanksReport(Report):
             "position",
         ]
 
-    def build_report(self, writer):
-        query_set = self.query_set()
+    def rows(self) -> Iterator[list[Any]]:
+        # the names are stored as plain text already, so the rows come straight out of the
+        # database
+        field_names = self.get_field_names()
+        yield field_names
+
+        yield from (
+            self.query_set()
+            .values_list(*field_names)
+            .iterator(chunk_size=REPORT_CHUNK_SIZE)
+        )
 
-        self.build_report_header(writer)
 
-        for row in query_set:
-            row_dict = {fn: getattr(row, fn) for fn in self.get_field_names()}
-            row_dict["category"] = html_text(markdown(row_dict["category"]))
-            row_dict["finalist_name"] = html_text(markdown(row_dict["finalist_name"]))
-            writer.writerow(row_dict.values())
+class RankChangesReport(RanksReport):
+    """The ranks cast or changed since `since`."""
+
+    def __init__(self, election: models.Election, since: datetime):
+        super().__init__(election)
+        self.since = since
+
+    @property
+    def filename(self) -> str:
+        return f"{self.election.slug}-voting-changes.csv"
+
+    def query_set(self) -> QuerySet:
+        return super().query_set().filter(rank_date__gt=self.since)
 
 
 @method_decorator(raw_report_decorators, name="get")
@@ -366,15 +583,42 @@ class CategoryVotes(ElectionReportView):
 
     report_class = CategoryVotingReport
 
-    @functools.lru_cache
+    @memoized
     def category(self) -> models.Category:
-        return get_object_or_404(models.Category, id=self.kwargs.get("category_id"))
+        return get_object_or_404(
+            models.Category, id=self.kwargs.get("category_id"), election=self.election()
+        )
 
-    @functools.lru_cache
+    @memoized
     def report(self) -> Report:
         return CategoryVotingReport(category=self.category())
 
 
+@method_decorator(raw_report_decorators, name="get")
+class ElectionVotes(ElectionReportView):
+    report_class = ElectionVotingReport
+
+
+@method_decorator(raw_report_decorators, name="get")
+class BallotMatrix(ElectionReportView):
+    content_type = "application/octet-stream"
+    report_class = BallotMatrixReport
+
+
 @method_decorator(raw_report_decorators, name="get")
 class ElectionResults(ElectionReportView):
     report_class = InvalidatedNominationsReport
+
+
+# The reports that can be generated in the background, by name
+REPORTS: dict[str, type[Report]] = {
+    report_class.report_name: report_class
+    for report_class in [
+        NominationsReport,
+        InvalidatedNominationsReport,
+        RanksReport,
+        CategoryVotingReport,
+        ElectionVotingReport,
+        BallotMatrixReport,
+    ]
+}
@@ -1,12 +1,27 @@
 from django.conf import settings
-from django.contrib.auth.models import Group
-from django.db.models.signals import m2m_changed
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django_svcs.apps import svcs_from
 from nomnom.convention import ConventionConfiguration
 
-from nominate import admin
-from nominate.models import NominatingMemberProfile, Nomination
+from nominate import admin, site_data
+from nominate.ballot_schema import invalidate_ballot_schema
+from nominate.canonicalize import nomination_key
+from nominate.election_context import invalidate_elections
+from nominate.models import (
+    AdminMessage,
+    Category,
+    Election,
+    Finalist,
+    NominatingMemberProfile,
+    Nomination,
+)
+from nominate.permissions import (
+    invalidate_all_permissions,
+    invalidate_user_permissions,
+)
 
 
 @receiver(m2m_changed, sender=Group.user_set.through)
@@ -27,3 +42,82 @@ def user_added_or_removed_from_group(sender, instance, action, pk_set, **kwargs)
             admin.set_validation(
                 Nomination.objects.filter(nominator=instance.convention_profile), False
             )
+
+
+UserModel = get_user_model()
+
+
+@receiver(m2m_changed, sender=UserModel.groups.through)
+@receiver(m2m_changed, sender=UserModel.user_permissions.through)
+def user_permissions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        invalidate_user_permissions([instance.pk])
+    elif pk_set is None:
+        # a group or permission was cleared of all its users; we don't know who they were
+        invalidate_all_permissions()
+    else:
+        invalidate_user_permissions(pk_set)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_all_permissions()
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def group_or_permission_deleted(sender, instance, **kwargs):
+    # deleting these removes them from their users without any m2m_changed signal
+    invalidate_all_permissions()
+
+
+@receiver(post_save, sender=UserModel)
+@receiver(post_delete, sender=UserModel)
+def user_changed(sender, instance, **kwargs):
+    # their active and superuser flags are part of their permissions
+    invalidate_user_permissions([instance.pk])
+
+
+@receiver(pre_save, sender=Nomination)
+def normalize_nomination(sender, instance, **kwargs):
+    # bulk creates skip this; they have to set the key themselves
+    instance.normalized_key = nomination_key(instance)
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Finalist)
+def set_display_name(sender, instance, **kwargs):
+    instance.display_name = instance.get_display_name()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    invalidate_ballot_schema(instance.election_id)
+
+
+@receiver(post_save, sender=Finalist)
+@receiver(post_delete, sender=Finalist)
+def finalist_changed(sender, instance, **kwargs):
+    invalidate_ballot_schema(
+        Category.objects.filter(id=instance.category_id)
+        .values_list("election_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=AdminMessage)
+@receiver(post_delete, sender=AdminMessage)
+def admin_message_changed(sender, instance, **kwargs):
+    site_data.admin_message.invalidate()
+
+
+@receiver(post_save, sender=Election)
+@receiver(post_delete, sender=Election)
+def election_changed(sender, instance, **kwargs):
+    invalidate_elections()
+    invalidate_ballot_schema(instance.id)
@@ -0,0 +1,104 @@
+"""Site-wide values that every page needs, cached so that rendering one doesn't cost a query.
+
+The site context processor runs for every template that's rendered, including the HTMX
+fragments and the emails, and most of what it adds hardly ever changes. Values that come from
+the database are kept in each process, under a version that's shared through the cache. When
+the value changes, a signal replaces the version, and every process loads the new value on its
+next read, as with the ballot schema.
+"""
+
+import platform
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Generic, TypeVar
+from urllib.parse import urlparse
+
+import django
+from django.core.cache import cache
+from django.templatetags.static import static
+from nomnom.convention import ConventionConfiguration
+
+from nominate import models
+from nominate.versioned_cache import CACHE_TIMEOUT, VersionedCache
+
+T = TypeVar("T")
+
+SITE_DATA = VersionedCache("site-data")
+
+
+@dataclass
+class CachedValue(Generic[T]):
+    key: str
+    load: Callable[[], T]
+    # this process's copy, and the version it was loaded under
+    _local: tuple[str, T] | None = field(default=None, init=False, repr=False)
+
+    def get(self) -> T:
+        version = SITE_DATA.version(self.key)
+        if self._local is not None and self._local[0] == version:
+            return self._local[1]
+
+        # wrapped, so that a value of None can be told apart from a miss
+        (value,) = cache.get_or_set(
+            SITE_DATA.key(version, self.key),
+            lambda: (self.load(),),
+            timeout=CACHE_TIMEOUT,
+        )
+        self._local = (version, value)
+        return value
+
+    def invalidate(self) -> None:
+        """Replace the value's version, so that every process loads it again."""
+        SITE_DATA.invalidate(self.key)
+
+    def reset(self) -> None:
+        """Forget this process's copy, leaving the shared version alone."""
+        self._local = None
+
+
+def load_admin_message() -> str | None:
+    return (
+        models.AdminMessage.objects.filter(active=True)
+        .values_list("message", flat=True)
+        .first()
+    )
+
+
+# The convention's values, and the configuration they came from
+_convention_constants: tuple[ConventionConfiguration, dict[str, Any]] | None = None
+
+
+def convention_constants(convention: ConventionConfiguration) -> dict[str, Any]:
+    """The context's values that only depend on the convention's configuration.
+
+    The configuration is registered once, when the process starts, so these are worked out
+    once for as long as it stays the same one.
+    """
+    global _convention_constants
+
+    if _convention_constants is None or _convention_constants[0] is not convention:
+        _convention_constants = (
+            convention,
+            {
+                "DJANGO_VERSION": ".".join(str(i) for i in django.VERSION[:2]),
+                "PYTHON_VERSION": platform.python_version(),
+                "CONVENTION_NAME": convention.name,
+                "CONVENTION_SUBTITLE": convention.subtitle,
+                "CONVENTION_SLUG": convention.slug,
+                "CONVENTION_SITE_URL": convention.site_url,
+                "CONVENTION_LOGO_ALT_TEXT": convention.logo_alt_text,
+                "CONVENTION_LOGO": url_or_static(convention.logo),
+            },
+        )
+
+    return _convention_constants[1]
+
+
+def url_or_static(url: str) -> str:
+    urlparts = urlparse(url)
+    if bool(urlparts.scheme):
+        return url
+    return static(url)
+
+
+admin_message = CachedValue("admin-message", load_admin_message)
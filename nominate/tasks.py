@@ -1,4 +1,4 @@
-from datetime import UTC, datetime
+from datetime import datetime
 from itertools import groupby
 from operator import attrgetter
 
@@ -11,11 +11,13 @@ from django.contrib.sites.models import Site
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import get_template
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.formats import localize
 from django_svcs.apps import svcs_from
 from nomnom.convention import ConventionConfiguration, HugoAwards
 
-from nominate import hugo_awards, models, reports
+from nominate import hugo_awards, models, report_artifacts, report_delivery, reports
+from nominate.ballot_schema import get_ballot_schema
 from nominate.forms import RankForm
 
 logger = get_task_logger(__name__)
@@ -33,49 +35,68 @@ def configure_django_from_settings(sender, instance, **kwargs):
 
 @shared_task
 def send_nomination_report(report_name, **kwargs):
+    """Mail the nominations report to its recipients.
+
+    With `delta`, each recipient who's had a full report recently is sent only the
+    nominations that have changed since their last one.
+    """
     if report_name == "nominations":
         election_id = kwargs["election_id"]
+        delta = kwargs.get("delta", False)
         election = models.Election.objects.get(slug=election_id)
-        report = reports.NominationsReport(election=election)
-        recipients = models.ReportRecipient.objects.filter(report_name=report_name)
-        report_date = datetime.utcnow()
+        recipients = list(
+            models.ReportRecipient.objects.filter(report_name=report_name)
+        )
+        report_date = timezone.now()
 
         if not recipients:
             logger.warning("No recipients configured for the nominations report")
             return
 
-        content = report.get_report_content()
-
-        context = {
-            "report_date": localize(report_date),
-            "election": election,
-            "ballot_url": reverse(
-                "election:nominate", kwargs={"election_id": election_id}
-            ),
-        }
-
-        text_content = get_template("nominate/email/nomination_report.txt").render(
-            context
-        )
-        html_content = get_template("nominate/email/nomination_report.html").render(
-            context
-        )
+        deliveries = report_delivery.deliveries_for(election, recipients)
+        last_removed_at = report_delivery.last_removal(election, report_name)
+        sends = [
+            (
+                recipient.recipient_email,
+                recipient,
+                report_delivery.changes_since(
+                    deliveries.get(recipient.id), report_date, delta, last_removed_at
+                ),
+            )
+            for recipient in recipients
+        ]
 
         convention_configuration = svcs_from(settings).get(ConventionConfiguration)
 
-        for recipient in recipients:
-            message = EmailMultiAlternatives(
+        def email_for(since: datetime | None) -> report_delivery.ReportEmail:
+            if since is None:
+                report = reports.NominationsReport(election=election)
+            else:
+                report = reports.NominationChangesReport(election, since)
+
+            context = {
+                "report_date": localize(report_date),
+                "election": election,
+                "since": since and localize(since),
+                "ballot_url": reverse(
+                    "election:nominate", kwargs={"election_id": election_id}
+                ),
+            }
+            return report_delivery.ReportEmail(
                 subject=f"Nominations Report - {localize(report_date)}",
                 from_email=convention_configuration.get_hugo_admin_email(),  # use the default
-                body=text_content,
-                to=[recipient.recipient_email],
-                attachments=[
-                    (report.get_filename(), content, report.get_content_type()),
-                ],
+                text_content=get_template(
+                    "nominate/email/nomination_report.txt"
+                ).render(context),
+                html_content=get_template(
+                    "nominate/email/nomination_report.html"
+                ).render(context),
+                attachment=report_delivery.Attachment.compressed(
+                    report.get_filename(), report.get_report_content()
+                ),
             )
-            message.attach_alternative(html_content, "text/html")
 
-            message.send()
+        report_delivery.send_reports(election, report_date, sends, email_for)
 
     else:
         raise ValueError(f"Invalid report name: {report_name}")
@@ -83,30 +104,44 @@ def send_nomination_report(report_name, **kwargs):
 
 @shared_task
 def send_rank_report(**kwargs):
+    """Mail the ranks report to its recipients, and to any given in `recipients`.
+
+    With `delta`, each configured recipient who's had a full report recently is sent only the
+    ranks that have changed since their last one; the ones given in `recipients` always get
+    the full report.
+    """
     election_id = kwargs["election_id"]
+    delta = kwargs.get("delta", False)
     election = models.Election.objects.get(slug=election_id)
-    report = reports.RanksReport(election=election)
-    recipients = models.ReportRecipient.objects.filter(report_name="ranks")
+    recipients = list(models.ReportRecipient.objects.filter(report_name="ranks"))
     explicit_recipients = kwargs.get("recipients", "")
     if explicit_recipients:
         explicit_recipient_addresses = explicit_recipients.split(",")
     else:
         explicit_recipient_addresses = []
 
-    recipient_addresses = [recipient.recipient_email for recipient in recipients]
-    recipient_addresses.extend(explicit_recipient_addresses)
-
-    report_date = datetime.now(UTC)
+    report_date = timezone.now()
 
-    if not recipient_addresses:
+    if not recipients and not explicit_recipient_addresses:
         logger.warning("No recipients configured for the ranks report")
         return
 
-    content = report.get_report_content()
+    deliveries = report_delivery.deliveries_for(election, recipients)
+    last_removed_at = report_delivery.last_removal(election, "ranks")
+    sends = [
+        (
+            recipient.recipient_email,
+            recipient,
+            report_delivery.changes_since(
+                deliveries.get(recipient.id), report_date, delta, last_removed_at
+            ),
+        )
+        for recipient in recipients
+    ] + [(address, None, None) for address in explicit_recipient_addresses]
 
     rules = svcs_from(settings).get(HugoAwards)
 
-    context = {
+    results_context = {
         "report_date": localize(report_date),
         "election": election,
         "ballot_url": reverse("election:vote", kwargs={"election_id": election_id}),
@@ -114,24 +149,30 @@ def send_rank_report(**kwargs):
         "category_results": hugo_awards.get_results_for_election(rules, election),
     }
 
-    text_content = get_template("nominate/email/ranks_report.txt").render(context)
-    html_content = get_template("nominate/email/ranks_report.html").render(context)
-
     convention_configuration = svcs_from(settings).get(ConventionConfiguration)
 
-    for recipient in recipient_addresses:
-        message = EmailMultiAlternatives(
+    def email_for(since: datetime | None) -> report_delivery.ReportEmail:
+        if since is None:
+            report = reports.RanksReport(election=election)
+        else:
+            report = reports.RankChangesReport(election, since)
+
+        context = {**results_context, "since": since and localize(since)}
+        return report_delivery.ReportEmail(
             subject=f"Ranks Report - {localize(report_date)}",
             from_email=convention_configuration.get_hugo_admin_email(),  # use the default
-            body=text_content,
-            to=[recipient],
-            attachments=[
-                (report.get_filename(), content, report.get_content_type()),
-            ],
+            text_content=get_template("nominate/email/ranks_report.txt").render(
+                context
+            ),
+            html_content=get_template("nominate/email/ranks_report.html").render(
+                context
+            ),
+            attachment=report_delivery.Attachment.compressed(
+                report.get_filename(), report.get_report_content()
+            ),
         )
-        message.attach_alternative(html_content, "text/html")
 
-        message.send()
+    report_delivery.send_reports(election, report_date, sends, email_for)
 
 
 @shared_task(bind=True)
@@ -207,15 +248,17 @@ def send_voting_ballot(self, election_id, voting_member_id, message=None):
 
     logger.info(f"Sending votes for {election=} {member=}")
 
-    finalists = models.Finalist.objects.filter(category__election=election)
-    ranks = models.Rank.objects.filter(finalist__in=finalists, membership=member)
+    schema = get_ballot_schema(election)
+    ranks = models.Rank.objects.filter(
+        finalist__in=schema.finalists, membership=member
+    ).select_related("finalist")
 
     report_date = datetime.utcnow()
     site_url = Site.objects.get_current().domain
     ballot_path = reverse("election:vote", kwargs={"election_id": election.slug})
     ballot_url = f"https://{site_url}{ballot_path}"
 
-    form = RankForm(finalists=finalists, ranks=ranks)
+    form = RankForm(finalists=schema.finalists, ranks=ranks, schema=schema)
     # run "clean" to populate the form with the existing data and
     # group the finalists by category into display-oriented structures.
     # We're doing a bit of a hack here, because full_clean requires posted
@@ -245,3 +288,17 @@ def send_voting_ballot(self, election_id, voting_member_id, message=None):
     email.attach_alternative(html_content, "text/html")
 
     email.send()
+
+
+@shared_task
+def generate_report(artifact_id: int):
+    artifact = models.ReportArtifact.objects.select_related("election").get(
+        id=artifact_id
+    )
+    if artifact.status == models.ReportArtifact.STATUS.READY:
+        return
+
+    report = reports.REPORTS[artifact.report_name].for_election(
+        artifact.election, artifact.parameters
+    )
+    report_artifacts.store_report(artifact, report)
@@ -0,0 +1,164 @@
+import ast
+import zipfile
+from array import array
+from io import BytesIO
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from nominate import factories
+from nominate.ballot_export import write_ballot_matrix
+
+pytestmark = pytest.mark.django_db
+
+
+def read_npy(data: bytes):
+    """The shape and values of an array, as numpy.load would read them."""
+    assert data[:6] == b"\x93NUMPY"
+    header_length = int.from_bytes(data[8:10], "little")
+    assert (10 + header_length) % 64 == 0
+    header = ast.literal_eval(data[10 : 10 + header_length].decode("latin1"))
+    assert not header["fortran_order"]
+    body = data[10 + header_length :]
+
+    match header["descr"]:
+        case "<i8":
+            values = list(array("q", body))
+        case "|u1":
+            values = list(body)
+        case descr:
+            width = int(descr[2:])
+            values = [
+                body[i : i + width * 4].decode("utf-32-le").rstrip("\0")
+                for i in range(0, len(body), width * 4)
+            ]
+
+    return header["shape"], values
+
+
+def read_npz(data: bytes) -> dict:
+    with zipfile.ZipFile(BytesIO(data)) as archive:
+        return {
+            name.removesuffix(".npy"): read_npy(archive.read(name))
+            for name in archive.namelist()
+        }
+
+
+@pytest.fixture(name="election")
+def make_election():
+    return factories.ElectionFactory.create(state="voting")
+
+
+@pytest.fixture(name="ballots")
+def make_ballots(election):
+    categories = factories.CategoryFactory.create_batch(2, election=election)
+    finalists = {
+        c: [
+            factories.FinalistFactory.create(category=c, ballot_position=i)
+            for i in range(1, 4)
+        ]
+        for c in categories
+    }
+    members = factories.NominatingMemberProfileFactory.create_batch(2)
+    # the first member ranks everything in reverse; the second only the first category's last
+    for c in categories:
+        for position, finalist in enumerate(reversed(finalists[c]), start=1):
+            factories.RankFactory.create(
+                membership=members[0], finalist=finalist, position=position
+            )
+    factories.RankFactory.create(
+        membership=members[1], finalist=finalists[categories[0]][2], position=1
+    )
+    return categories, finalists, members
+
+
+def export(election) -> dict:
+    file = BytesIO()
+    write_ballot_matrix(election, file, chunk_size=2)
+    return read_npz(file.getvalue())
+
+
+def test_each_category_is_a_member_by_finalist_matrix(election, ballots):
+    categories, finalists, members = ballots
+
+    arrays = export(election)
+
+    assert arrays["member_ids"] == ((2,), [m.id for m in members])
+    assert arrays["member_numbers"] == ((2,), [m.member_number for m in members])
+    assert arrays["category_ids"] == ((2,), [c.id for c in categories])
+    assert arrays["category_names"][1] == [c.display_name for c in categories]
+
+    first, second = (f"category_{c.id}" for c in categories)
+    assert arrays[f"{first}_finalist_ids"][1] == [
+        f.id for f in finalists[categories[0]]
+    ]
+    assert arrays[f"{first}_ranks"] == ((2, 3), [3, 2, 1, 0, 0, 1])
+    assert arrays[f"{second}_ranks"] == ((2, 3), [3, 2, 1, 0, 0, 0])
+
+
+def test_an_election_without_ballots_exports_empty_matrices(election):
+    category = factories.CategoryFactory.create(election=election)
+    factories.FinalistFactory.create_batch(2, category=category)
+
+    assert export(election)[f"category_{category.id}_ranks"] == ((0, 2), [])
+
+
+def test_ranks_without_a_position_are_left_out(election, ballots):
+    categories, finalists, members = ballots
+    abstainer = factories.NominatingMemberProfileFactory.create()
+    factories.RankFactory.create(
+        membership=abstainer, finalist=finalists[categories[0]][0], position=None
+    )
+    factories.RankFactory.create(
+        membership=members[1], finalist=finalists[categories[1]][0], position=None
+    )
+
+    arrays = export(election)
+
+    assert arrays["member_ids"] == ((2,), [m.id for m in members])
+    assert arrays[f"category_{categories[1].id}_ranks"] == (
+        (2, 3),
+        [3, 2, 1, 0, 0, 0],
+    )
+
+
+def test_the_categories_are_in_ballot_order(election):
+    later = factories.CategoryFactory.create(election=election, ballot_position=2)
+    earlier = factories.CategoryFactory.create(election=election, ballot_position=1)
+
+    assert export(election)["category_ids"][1] == [earlier.id, later.id]
+
+
+def test_the_export_takes_the_same_queries_however_many_voters(
+    election, ballots, django_assert_num_queries
+):
+    with django_assert_num_queries(4):
+        export(election)
+
+
+def test_staff_can_download_the_export(election, ballots, tp, staff_user):
+    for codename in ["report", "view_raw_results"]:
+        staff_user.user_permissions.add(Permission.objects.get(codename=codename))
+    tp.client.force_login(staff_user)
+
+    response = tp.get("election:ballot-matrix-export", election_id=election.slug)
+
+    tp.response_200(response)
+    assert ".npz" in response["Content-Disposition"]
+    assert read_npz(b"".join(response.streaming_content)) == export(election)
+
+
+def test_the_export_command_writes_a_file(election, ballots, tmp_path):
+    output = tmp_path / "ballots.npz"
+
+    call_command("export_ballot_matrix", election.slug, str(output))
+
+    assert read_npz(output.read_bytes()) == export(election)
+
+
+def test_the_export_command_can_write_to_stdout(election, ballots, capfdbinary):
+    call_command("export_ballot_matrix", election.slug, "-")
+
+    captured = capfdbinary.readouterr()
+    assert read_npz(captured.out) == export(election)
+    assert b"Exported the ballots" in captured.err
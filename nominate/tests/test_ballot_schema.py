@@ -0,0 +1,135 @@
+import pytest
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from nominate import ballot_schema, factories
+from nominate.ballot_schema import get_ballot_schema
+from nominate.forms import NominationForm, RankForm
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(name="election")
+def make_election():
+    return factories.ElectionFactory.create(state="voting")
+
+
+@pytest.fixture(name="categories")
+def make_categories(election):
+    categories = factories.CategoryFactory.create_batch(
+        3, election=election, fields=2, field_2_description="Author"
+    )
+    for category in categories:
+        factories.FinalistFactory.create_batch(4, category=category)
+    return categories
+
+
+def test_forms_are_built_from_a_warm_schema_without_queries(
+    election, categories, django_assert_num_queries
+):
+    get_ballot_schema(election)
+
+    with django_assert_num_queries(0):
+        schema = get_ballot_schema(election)
+        rank_form = RankForm(finalists=schema.finalists, schema=schema)
+        nomination_form = NominationForm(categories=schema.categories, schema=schema)
+
+    assert len(rank_form.fields) == 12
+    assert rank_form.fields[f"{categories[0].id}_{schema.finalists[0].id}"].choices == [
+        (None, "Unranked"),
+        (1, "1"),
+        (2, "2"),
+        (3, "3"),
+        (4, "4"),
+    ]
+    assert [
+        f.label for f in nomination_form.fieldsets_grouped_by_category[categories[0]][0]
+    ] == [categories[0].field_1_description, "Author"]
+
+
+def test_the_schema_is_shared_through_the_cache(election, categories, monkeypatch):
+    first = get_ballot_schema(election)
+    # as if this were another process
+    monkeypatch.setattr(ballot_schema, "_loaded", {})
+
+    schema = get_ballot_schema(election)
+
+    assert schema is not first
+    assert schema.version == first.version
+    assert [f.id for f in schema.finalists] == [f.id for f in first.finalists]
+    assert schema.finalists[0].category is schema.categories[0]
+
+
+def test_changing_a_finalist_invalidates_the_schema(election, categories):
+    before = get_ballot_schema(election)
+
+    finalist = factories.FinalistFactory.create(category=categories[0], name="*New*")
+
+    schema = get_ballot_schema(election)
+    assert schema.version != before.version
+    assert schema.finalist_counts[categories[0].id] == 5
+    assert "<em>New</em>" in schema.finalist_labels[finalist.id]
+
+
+def test_changing_a_category_invalidates_the_schema(election, categories):
+    before = get_ballot_schema(election)
+
+    categories[1].field_1_description = "Title"
+    categories[1].save()
+
+    assert get_ballot_schema(election).nomination_fields[categories[1].id][0] == (
+        "field_1",
+        "Title",
+    )
+    assert get_ballot_schema(election).version != before.version
+
+
+def test_the_vote_page_queries_do_not_grow_with_the_finalists(
+    election, tp, member, django_assert_max_num_queries
+):
+    def vote_page_queries(category_count) -> int:
+        for category in factories.CategoryFactory.create_batch(
+            category_count, election=election
+        ):
+            factories.FinalistFactory.create_batch(6, category=category)
+
+        tp.client.force_login(member.user)
+        url = tp.reverse("election:vote", election_id=election.slug)
+        tp.get(url)
+        with tp.assertNumQueriesLessThan(1000) as context:
+            tp.get(url)
+        return len(context.captured_queries)
+
+    assert vote_page_queries(1) == vote_page_queries(5)
+
+
+def cached_category_header(election, category) -> str | None:
+    key = make_template_fragment_key(
+        "ballot-category",
+        [election.id, get_ballot_schema(election).version, category.id],
+    )
+    return cache.get(key)
+
+
+def test_the_ballot_category_headers_are_cached(election, categories, tp, member):
+    categories[0].description = "Best *thing*"
+    categories[0].save()
+    tp.client.force_login(member.user)
+
+    tp.get(tp.reverse("election:vote", election_id=election.slug))
+
+    header = cached_category_header(election, categories[0])
+    assert "<em>thing</em>" in header
+    tp.assertResponseContains(header, html=False)
+
+
+def test_changing_the_election_replaces_the_cached_headers(
+    election, categories, tp, member
+):
+    tp.client.force_login(member.user)
+    tp.get(tp.reverse("election:vote", election_id=election.slug))
+    assert cached_category_header(election, categories[0]) is not None
+
+    election.name = "Renamed"
+    election.save()
+
+    assert cached_category_header(election, categories[0]) is None
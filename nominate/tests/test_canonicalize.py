@@ -0,0 +1,133 @@
+import random
+import string
+
+import pytest
+from nominate import factories, models
+from nominate.canonicalize import (
+    InMemoryTrigramIndex,
+    canonical_works,
+    normalize,
+    normalized_key,
+    pg_trgm_available,
+    postgres_similar_pairs,
+    similarity,
+    trigrams,
+)
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("The Expanse", "expanse"),
+        ("  the EXPANSE (TV) ", "expanse tv"),
+        ("Expanse, The", "expanse"),
+        ("Café à la Carte", "cafe la carte"),
+        ("A Memory Called Empire", "memory called empire"),
+        ("“Fully-Punctuated!”", "fully punctuated"),
+        ("Ｆｕｌｌｗｉｄｔｈ", "fullwidth"),
+    ],
+)
+def test_normalize(value, expected):
+    assert normalize(value) == expected
+
+
+def test_normalized_key_skips_blank_fields():
+    assert normalized_key("The Book", "", "An Author") == "book / author"
+
+
+def test_trigrams_are_padded_like_pg_trgm():
+    # SELECT show_trgm('cat') => {"  c"," ca","at ",cat}
+    assert trigrams("cat") == {"  c", " ca", "cat", "at "}
+    assert trigrams("cat / dog") == trigrams("cat") | trigrams("dog")
+
+
+def brute_force_pairs(keys, threshold):
+    grams = [trigrams(key) for key in keys]
+    return {
+        frozenset([keys[i], keys[j]])
+        for i in range(len(keys))
+        for j in range(i + 1, len(keys))
+        if similarity(grams[i], grams[j]) >= threshold
+    }
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_in_memory_index_finds_every_similar_pair(seed):
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase[:6], k=4)) for _ in range(30)]
+    keys = list({" ".join(rng.sample(words, k=rng.randint(1, 3))) for _ in range(200)})
+    threshold = rng.choice([0.3, 0.5, 0.7, 0.9])
+
+    pairs = InMemoryTrigramIndex(keys).similar_pairs(threshold)
+
+    assert {frozenset(pair) for pair in pairs} == brute_force_pairs(keys, threshold)
+
+
+@pytest.fixture(name="category")
+def make_category():
+    return factories.CategoryFactory.create(fields=1)
+
+
+def nominate(category, *titles):
+    member = factories.NominatingMemberProfileFactory.create()
+    return [
+        factories.NominationFactory.create(
+            category=category, nominator=member, field_1=title, field_2="", field_3=""
+        )
+        for title in titles
+    ]
+
+
+@pytest.mark.django_db
+def test_saving_a_nomination_stores_its_key(category):
+    (nomination,) = nominate(category, "The Expanse")
+
+    nomination.field_1 = "Leviathan Wakes"
+    nomination.save()
+
+    nomination.refresh_from_db()
+    assert nomination.normalized_key == "leviathan wakes"
+
+
+@pytest.mark.django_db
+def test_variant_spellings_are_one_work(category):
+    nominate(category, "The Expanse")
+    nominate(category, "the expanse")
+    nominate(category, "The Expanse (TV)", "Dune")
+    nominate(category, "Dune Messiah")
+
+    works = canonical_works(category)
+
+    assert sorted((work.name, work.nominations) for work in works.works) == [
+        ("Dune", 1),
+        ("Dune Messiah", 1),
+        ("The Expanse", 3),
+    ]
+    expanse = works.works[works.work_for_key["expanse tv"]]
+    assert expanse.key == "expanse"
+    assert expanse.keys == {"expanse", "expanse tv"}
+
+
+@pytest.mark.django_db
+def test_invalid_nominations_are_not_works(category):
+    (invalid,) = nominate(category, "Spam")
+    models.NominationAdminData.objects.create(
+        nomination=invalid, valid_nomination=False
+    )
+
+    assert canonical_works(category).works == []
+
+
+@pytest.mark.django_db
+def test_postgres_finds_the_same_pairs_as_the_in_memory_index(category):
+    if not pg_trgm_available():
+        pytest.skip("pg_trgm is not installed")
+
+    titles = ["The Expanse", "The Expanse (TV)", "Dune", "Dune Messiah", "Dune, Part 1"]
+    for title in titles:
+        nominate(category, title)
+    keys = [normalize(title) for title in titles]
+
+    assert {frozenset(p) for p in postgres_similar_pairs(category, 0.5)} == {
+        frozenset(p) for p in InMemoryTrigramIndex(keys).similar_pairs(0.5)
+    }
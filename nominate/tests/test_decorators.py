@@ -0,0 +1,96 @@
+import gc
+import weakref
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.http import Http404
+from django.test import RequestFactory
+from nominate import factories, reports
+from nominate.decorators import memoized
+from nominate.views import ElectionView, NominationView
+
+pytestmark = pytest.mark.usefixtures("db")
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    @memoized
+    def value(self):
+        self.calls += 1
+        return object()
+
+    @memoized
+    def missing(self):
+        self.calls += 1
+        raise Http404
+
+
+def test_memoized_methods_run_once_per_instance():
+    first, second = Counter(), Counter()
+
+    assert first.value() is first.value()
+    assert first.value() is not second.value()
+    assert (first.calls, second.calls) == (1, 1)
+
+
+def test_memoized_methods_do_not_remember_exceptions():
+    counter = Counter()
+
+    for _ in range(2):
+        with pytest.raises(Http404):
+            counter.missing()
+
+    assert counter.calls == 2
+
+
+@pytest.fixture(name="live_views")
+def track_views(monkeypatch):
+    """Every view instance that's set up for a request, for as long as it's still alive."""
+    live_views = weakref.WeakSet()
+
+    for view_class in [ElectionView, NominationView, reports.ElectionReportView]:
+        setup = view_class.setup
+
+        def tracking_setup(self, request, *args, _setup=setup, **kwargs):
+            live_views.add(self)
+            return _setup(self, request, *args, **kwargs)
+
+        monkeypatch.setattr(view_class, "setup", tracking_setup)
+
+    return live_views
+
+
+def test_views_are_released_after_thousands_of_requests(live_views):
+    election = factories.ElectionFactory.create(state="nominating")
+    factories.CategoryFactory.create_batch(2, election=election)
+    member = factories.NominatingMemberProfileFactory.create()
+    member.user.is_staff = True
+    member.user.save()
+    for codename in ["nominate", "report"]:
+        member.user.user_permissions.add(Permission.objects.get(codename=codename))
+
+    request_factory = RequestFactory()
+    views = [
+        (ElectionView.as_view(), {}),
+        (NominationView.as_view(), {"election_id": election.slug}),
+        (reports.Nominations.as_view(), {"election_id": election.slug}),
+    ]
+
+    requests = 0
+    for _ in range(700):
+        for view, kwargs in views:
+            request = request_factory.get("/")
+            request.user = member.user
+            response = view(request, **kwargs)
+            # the pages' contexts are built, but rendering them would only slow this down
+            if response.streaming:
+                b"".join(response.streaming_content)
+            assert response.status_code == 200
+            requests += 1
+
+    gc.collect()
+
+    assert requests == 2100
+    assert len(live_views) == 0
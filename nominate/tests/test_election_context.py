@@ -0,0 +1,86 @@
+import pytest
+from django.http import Http404
+from nominate import election_context as election_context_module
+from nominate import factories, models
+from nominate.election_context import election_context, get_election
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(name="election")
+def make_election():
+    return factories.ElectionFactory.create(state=models.Election.STATE.VOTING)
+
+
+def test_a_loaded_election_takes_no_queries(election, django_assert_num_queries):
+    get_election(election.slug)
+
+    with django_assert_num_queries(0):
+        loaded = get_election(election.slug)
+
+    assert loaded == election
+
+
+def test_each_caller_gets_its_own_copy(election):
+    first = get_election(election.slug)
+    first.is_open_for_user = True
+
+    assert not hasattr(get_election(election.slug), "is_open_for_user")
+
+
+def test_saving_an_election_replaces_the_loaded_one(election):
+    get_election(election.slug)
+
+    election.state = models.Election.STATE.VOTING_CLOSED
+    election.save()
+
+    assert get_election(election.slug).state == models.Election.STATE.VOTING_CLOSED
+
+
+def test_other_processes_reload_it_once_the_version_changes(election):
+    get_election(election.slug)
+
+    # as if it were changed by another process
+    models.Election.objects.filter(id=election.id).update(name="Renamed")
+    assert get_election(election.slug).name != "Renamed"
+
+    election_context_module.invalidate_elections()
+    assert get_election(election.slug).name == "Renamed"
+
+
+def test_missing_elections_are_not_found():
+    with pytest.raises(Http404):
+        get_election("no-such-election")
+
+
+def test_the_request_context_resolves_everything_once(
+    election, member, request_factory, django_assert_num_queries
+):
+    request = request_factory.get("/")
+    request.user = member.user
+    context = election_context(request)
+
+    assert context.election(election.slug) is context.election(election.slug)
+    assert election_context(request) is context
+    with django_assert_num_queries(0):
+        assert context.profile() == member
+        assert context.profile() == member
+
+
+def test_the_vote_page_does_not_load_the_election(
+    election, member, tp, django_assert_max_num_queries
+):
+    factories.FinalistFactory.create(
+        category=factories.CategoryFactory.create(election=election)
+    )
+    tp.client.force_login(member.user)
+    url = tp.reverse("election:vote", election_id=election.slug)
+    tp.get(url)
+
+    with django_assert_max_num_queries(1000) as context:
+        tp.get(url)
+    tp.response_200()
+
+    assert not [
+        q for q in context.captured_queries if 'FROM "nominate_election"' in q["sql"]
+    ]
@@ -0,0 +1,194 @@
+import random
+
+import pytest
+from django.contrib import admin
+from nominate import factories, models
+from nominate import hugo_awards as hugo_awards_module
+from nominate.hugo_awards import (
+    get_results_for_election,
+    invalidate_results,
+    rebuild_ballot_tally,
+    run_election,
+)
+from nomnom.convention import HugoAwards
+from wsfs.rules.constitution_2023 import hugo_awards, pyrankvote_hugo_voting
+from wsfs.tests.test_instant_runoff import round_summaries
+
+
+def results_summary(results) -> list:
+    return [
+        (category.name, [c.name for c in result.get_winners()])
+        for category, result in results.items()
+    ]
+
+
+@pytest.fixture(name="counted_election")
+def make_counted_election():
+    election = factories.ElectionFactory.create()
+    members = factories.NominatingMemberProfileFactory.create_batch(5)
+    for i in range(3):
+        category = factories.CategoryFactory.create(
+            election=election, name=f"Category {i}", ballot_position=i
+        )
+        finalists = [
+            factories.FinalistFactory.create(
+                category=category, name=name, ballot_position=position
+            )
+            for position, name in enumerate(["No Award", "A", "B"])
+        ]
+        # every category gets a different winner
+        for member in members:
+            factories.RankFactory.create(
+                membership=member, finalist=finalists[i], position=1
+            )
+
+    return election
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_count_matches_serial_count(counted_election):
+    serial = get_results_for_election(hugo_awards, counted_election, workers=1)
+    parallel = get_results_for_election(hugo_awards, counted_election, workers=2)
+
+    assert results_summary(parallel) == results_summary(serial)
+    assert results_summary(parallel) == [
+        ("Category 0", ["No Award"]),
+        ("Category 1", ["A"]),
+        ("Category 2", ["B"]),
+    ]
+
+
+@pytest.mark.django_db
+def test_count_is_serial_inside_a_transaction(counted_election, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("counted in a process pool")
+
+    monkeypatch.setattr("nominate.hugo_awards.ProcessPoolExecutor", no_pool)
+
+    results = get_results_for_election(hugo_awards, counted_election, workers=4)
+
+    assert results_summary(results)[1] == ("Category 1", ["A"])
+
+
+@pytest.fixture(name="counted_categories")
+def count_categories(monkeypatch):
+    counted = []
+    original = hugo_awards_module.run_election
+
+    def run_election(awards, category, *args, **kwargs):
+        counted.append(category.name)
+        return original(awards, category, *args, **kwargs)
+
+    monkeypatch.setattr(hugo_awards_module, "run_election", run_election)
+    return counted
+
+
+@pytest.mark.django_db
+def test_unchanged_categories_are_served_from_the_cache(
+    counted_election, counted_categories
+):
+    first = get_results_for_election(hugo_awards, counted_election)
+    second = get_results_for_election(hugo_awards, counted_election)
+
+    assert results_summary(second) == results_summary(first)
+    assert counted_categories == ["Category 0", "Category 1", "Category 2"]
+
+
+@pytest.mark.django_db
+def test_only_invalidated_categories_are_recounted(
+    counted_election, counted_categories, django_capture_on_commit_callbacks
+):
+    get_results_for_election(hugo_awards, counted_election)
+    category = counted_election.category_set.get(name="Category 2")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        invalidate_results([category.id])
+    results = get_results_for_election(hugo_awards, counted_election)
+
+    assert counted_categories[3:] == ["Category 2"]
+    assert results_summary(results)[2] == ("Category 2", ["B"])
+
+
+@pytest.mark.django_db
+def test_invalidation_waits_for_the_transaction_to_commit(
+    counted_election, counted_categories, django_capture_on_commit_callbacks
+):
+    get_results_for_election(hugo_awards, counted_election)
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        invalidate_results(c.id for c in counted_election.category_set.all())
+        get_results_for_election(hugo_awards, counted_election)
+
+    assert len(counted_categories) == 3
+    assert len(callbacks) == 1
+
+
+@pytest.mark.django_db
+def test_admin_rank_changes_invalidate_their_category(
+    counted_election, counted_categories, django_capture_on_commit_callbacks, rf
+):
+    get_results_for_election(hugo_awards, counted_election)
+    rank_admin = admin.site._registry[models.Rank]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        rank_admin.delete_queryset(
+            rf.post("/"), models.Rank.objects.filter(finalist__name="A")
+        )
+    results = get_results_for_election(hugo_awards, counted_election)
+
+    assert counted_categories[3:] == ["Category 1"]
+    # with no ballots left, nobody can beat anybody else
+    category, winners = results_summary(results)[1]
+    assert sorted(winners) == ["A", "B", "No Award"]
+
+
+@pytest.mark.django_db
+def test_live_count_matches_full_count(counted_election):
+    rebuild_ballot_tally(c.id for c in counted_election.category_set.all())
+
+    # finalists without votes are eliminated in a random order
+    random.seed(0)
+    live = get_results_for_election(hugo_awards, counted_election, live=True)
+    random.seed(0)
+    full = get_results_for_election(hugo_awards, counted_election)
+
+    assert results_summary(live) == results_summary(full)
+    for category in full:
+        assert round_summaries(live[category]) == round_summaries(full[category])
+
+
+def unweighted_counter(counted):
+    def counter(candidates, ballots, runoff_candidate=None):
+        counted.append(len(ballots))
+        return pyrankvote_hugo_voting(candidates, ballots, runoff_candidate)
+
+    return counter
+
+
+def kwargs_counter(counted):
+    def counter(candidates, ballots, runoff_candidate=None, **kwargs):
+        counted.append(len(ballots))
+        return pyrankvote_hugo_voting(candidates, ballots, runoff_candidate)
+
+    return counter
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("make_counter", [unweighted_counter, kwargs_counter])
+def test_counters_without_weights_get_a_ballot_per_member(
+    counted_election, make_counter
+):
+    category = counted_election.category_set.get(name="Category 0")
+    counted = []
+    awards = HugoAwards(
+        results_class=hugo_awards.results_class, counter=make_counter(counted)
+    )
+
+    random.seed(0)
+    results = run_election(awards, category)
+    random.seed(0)
+    expected = run_election(hugo_awards, category)
+
+    # the five members ranked identically
+    assert counted == [5]
+    assert round_summaries(results) == round_summaries(expected)
@@ -0,0 +1,178 @@
+import socketserver
+import threading
+import time
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends import locmem
+from nominate import factories, models, tasks
+from nominate.mail import batches, send_in_batches
+
+
+class CountingBackend(locmem.EmailBackend):
+    """The test backend, counting the connections it opens as the SMTP backend would."""
+
+    connections = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.is_open = False
+
+    def open(self):
+        if self.is_open:
+            return False
+        CountingBackend.connections += 1
+        self.is_open = True
+        return True
+
+    def close(self):
+        self.is_open = False
+
+    def send_messages(self, messages):
+        # like the SMTP backend, a connection that isn't open yet is only opened for this
+        opened = self.open()
+        try:
+            return super().send_messages(messages)
+        finally:
+            if opened:
+                self.close()
+
+
+@pytest.fixture(name="backend")
+def counting_backend(settings):
+    settings.EMAIL_BACKEND = f"{__name__}.CountingBackend"
+    CountingBackend.connections = 0
+    return CountingBackend
+
+
+def make_message(n: int) -> EmailMessage:
+    return EmailMessage(
+        subject=f"Report {n}",
+        body="Please find attached the report.",
+        from_email="nomnom-admin@example.com",
+        to=[f"recipient-{n}@example.com"],
+    )
+
+
+def test_batches():
+    assert list(batches(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batches([], 2)) == []
+
+
+def test_every_batch_goes_over_one_connection(backend):
+    sent = list(send_in_batches(range(5), make_message, batch_size=2))
+
+    assert sent == [[0, 1], [2, 3], [4]]
+    assert len(mail.outbox) == 5
+    assert backend.connections == 1
+
+
+def test_sending_messages_one_by_one_connects_for_each(backend):
+    for n in range(5):
+        make_message(n).send()
+
+    assert len(mail.outbox) == 5
+    assert backend.connections == 5
+
+
+def test_a_batch_is_only_handed_back_once_it_is_sent(backend):
+    def build_message(n: int) -> EmailMessage:
+        if n == 3:
+            raise RuntimeError("Couldn't build the message")
+        return make_message(n)
+
+    sent = []
+    with pytest.raises(RuntimeError):
+        for batch in send_in_batches(range(5), build_message, batch_size=2):
+            sent.extend(batch)
+
+    assert sent == [0, 1]
+    assert len(mail.outbox) == 2
+
+
+@pytest.mark.django_db
+def test_a_report_task_connects_once_for_all_its_recipients(backend):
+    election = factories.ElectionFactory.create()
+    for n in range(3):
+        models.ReportRecipient.objects.create(
+            report_name="nominations", recipient_email=f"admin-{n}@example.com"
+        )
+
+    tasks.send_nomination_report("nominations", election_id=election.slug)
+
+    assert len(mail.outbox) == 3
+    assert backend.connections == 1
+    assert models.ReportDelivery.objects.filter(election=election).count() == 3
+
+
+# What the stand-in server makes each new connection wait for, in place of the TLS handshake
+# and login a real server would take
+CONNECTION_SETUP_SECONDS = 0.02
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough of SMTP for Django's backend to deliver to."""
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        time.sleep(CONNECTION_SETUP_SECONDS)
+        self.reply("220 localhost stand-in")
+
+        while line := self.rfile.readline():
+            command = line.decode().strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250 localhost")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+@pytest.fixture(name="smtp_server")
+def make_smtp_server(settings):
+    server = SMTPServer(("127.0.0.1", 0), SMTPHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+    settings.EMAIL_HOST, settings.EMAIL_PORT = server.server_address
+    settings.EMAIL_HOST_USER = settings.EMAIL_HOST_PASSWORD = None
+    settings.EMAIL_USE_TLS = False
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.benchmark
+def test_benchmark_reusing_the_connection(smtp_server, record_property):
+    count = 20
+
+    started = time.perf_counter()
+    for n in range(count):
+        make_message(n).send()
+    record_property(
+        "one_connection_each_per_second", count / (time.perf_counter() - started)
+    )
+
+    started = time.perf_counter()
+    for _ in send_in_batches(range(count), make_message, batch_size=5):
+        pass
+    record_property(
+        "one_connection_per_second", count / (time.perf_counter() - started)
+    )
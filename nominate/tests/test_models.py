@@ -3,6 +3,7 @@ from django.contrib.auth.models import AnonymousUser, Permission
 from nominate.factories import (
     CategoryFactory,
     ElectionFactory,
+    FinalistFactory,
     NominatingMemberProfileFactory,
 )
 from nominate.models import Election, Nomination
@@ -33,6 +34,26 @@ def test_nomination_validation(category, nominator):
     Nomination(category=category, nominator=nominator).save()
 
 
+def test_category_display_name_is_plain_text_and_kept_current(category):
+    category.name = "Best *Novel*"
+    category.save()
+
+    category.refresh_from_db()
+    assert category.display_name == "Best Novel"
+    assert str(category) == "Best Novel"
+
+
+def test_finalist_display_name_prefers_the_short_name(category):
+    finalist = FinalistFactory(category=category, name="**A Long** _Title_")
+    assert finalist.display_name == "A Long Title"
+
+    finalist.short_name = "Short"
+    finalist.save()
+
+    finalist.refresh_from_db()
+    assert finalist.display_name == "Short"
+
+
 @pytest.mark.django_db
 class MemberMixin:
     def setup_method(self, test_method):
@@ -0,0 +1,108 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser, Group, Permission
+from nominate import factories, models
+from nominate.permissions import PermissionSnapshot, user_permissions
+
+pytestmark = pytest.mark.django_db
+
+
+def test_the_snapshot_has_the_users_permissions(voting_user):
+    snapshot = PermissionSnapshot.of(voting_user)
+
+    assert snapshot.is_authenticated
+    assert snapshot.has_perm("nominate.vote")
+    assert not snapshot.has_perm("nominate.nominate")
+
+
+def test_superusers_have_every_permission():
+    snapshot = PermissionSnapshot.of(factories.UserFactory.create(is_superuser=True))
+
+    assert snapshot.has_perms(["nominate.vote", "hugopacket.preview_packet"])
+
+
+def test_inactive_users_have_no_permissions(voting_user):
+    voting_user.is_active = False
+
+    assert not PermissionSnapshot.of(voting_user).has_perm("nominate.vote")
+
+
+def test_anonymous_users_have_no_permissions():
+    snapshot = PermissionSnapshot.of(AnonymousUser())
+
+    assert snapshot.is_anonymous
+    assert not snapshot.has_perm("nominate.vote")
+
+
+def test_elections_check_rights_against_the_snapshot(
+    voting_user, django_assert_num_queries
+):
+    elections = [
+        factories.ElectionFactory.create(state=state)
+        for state, _ in models.Election.STATE_CHOICES
+    ]
+    snapshot = PermissionSnapshot.of(voting_user)
+
+    with django_assert_num_queries(0):
+        open_for = {e.state for e in elections if e.is_open_for(snapshot)}
+
+    assert open_for == {models.Election.STATE.VOTING}
+
+
+@pytest.fixture(name="vote_permission")
+def get_vote_permission():
+    return Permission.objects.get(codename="vote", content_type__app_label="nominate")
+
+
+@pytest.fixture(name="user")
+def make_user():
+    return factories.UserFactory.create()
+
+
+def fresh(user):
+    """The user as a new request would load them, without the backends' own cache."""
+    return type(user).objects.get(pk=user.pk)
+
+
+def test_cached_permissions_take_no_queries(voting_user, django_assert_num_queries):
+    user_permissions(fresh(voting_user))
+
+    user = fresh(voting_user)
+    with django_assert_num_queries(0):
+        assert user_permissions(user).has_perm("nominate.vote")
+
+
+def test_adding_a_user_to_a_group_replaces_their_permissions(user, vote_permission):
+    group = Group.objects.create(name="Voters")
+    group.permissions.add(vote_permission)
+    assert not user_permissions(fresh(user)).has_perm("nominate.vote")
+
+    group.user_set.add(user)
+    assert user_permissions(fresh(user)).has_perm("nominate.vote")
+
+    user.groups.remove(group)
+    assert not user_permissions(fresh(user)).has_perm("nominate.vote")
+
+
+def test_changing_a_groups_permissions_replaces_its_users_permissions(
+    user, vote_permission
+):
+    group = Group.objects.create(name="Voters")
+    user.groups.add(group)
+    assert not user_permissions(fresh(user)).has_perm("nominate.vote")
+
+    group.permissions.add(vote_permission)
+    assert user_permissions(fresh(user)).has_perm("nominate.vote")
+
+    group.delete()
+    assert not user_permissions(fresh(user)).has_perm("nominate.vote")
+
+
+def test_changing_a_users_own_permissions_replaces_them(user, vote_permission):
+    assert not user_permissions(fresh(user)).has_perm("nominate.vote")
+
+    user.user_permissions.add(vote_permission)
+    assert user_permissions(fresh(user)).has_perm("nominate.vote")
+
+    user.is_active = False
+    user.save()
+    assert not user_permissions(fresh(user)).has_perm("nominate.vote")
@@ -0,0 +1,231 @@
+import pytest
+from django.contrib.auth.models import Permission
+from django.utils import timezone
+from nominate import factories, models, report_artifacts, reports
+from nominate.report_artifacts import S3ReportStorage
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def background_reports(settings, tmp_path):
+    settings.NOMNOM_REPORTS_IN_BACKGROUND = True
+    settings.NOMNOM_REPORT_S3_BUCKET = None
+    settings.NOMNOM_REPORT_FILE_ROOT = tmp_path
+
+
+@pytest.fixture(name="election")
+def make_election():
+    return factories.ElectionFactory.create(state="nominating")
+
+
+@pytest.fixture(name="category")
+def make_category(election):
+    return factories.CategoryFactory.create(election=election)
+
+
+@pytest.fixture(name="nominations")
+def make_nominations(category):
+    return factories.NominationFactory.create_batch(3, category=category)
+
+
+@pytest.fixture(name="reporter")
+def make_reporter(staff_user, tp):
+    staff_user.user_permissions.add(Permission.objects.get(codename="report"))
+    tp.client.force_login(staff_user)
+    return staff_user
+
+
+def get_report(tp, election):
+    return tp.get("election:nomination-report", election_id=election.slug)
+
+
+def test_the_report_is_generated_in_the_background_and_then_served(
+    tp, reporter, election, nominations, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        pending = get_report(tp, election)
+
+    assert pending.status_code == 202
+    assert len(callbacks) == 1
+    artifact = models.ReportArtifact.objects.get()
+    assert artifact.status == models.ReportArtifact.STATUS.READY
+    assert artifact.generated_at is not None
+
+    response = get_report(tp, election)
+    tp.response_200(response)
+    content = b"".join(response.streaming_content).decode()
+    assert content == reports.NominationsReport(election).get_report_content()
+    assert artifact.filename in response["Content-Disposition"]
+
+
+def test_the_stored_report_is_reused_until_the_data_changes(
+    tp, reporter, election, category, nominations, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        get_report(tp, election)
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        get_report(tp, election)
+    assert not callbacks
+
+    factories.NominationFactory.create(category=category)
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        assert get_report(tp, election).status_code == 202
+
+    assert len(callbacks) == 1
+    # the report for the earlier data was deleted once the new one was stored
+    assert models.ReportArtifact.objects.get().status == "ready"
+
+
+def test_editing_a_row_changes_the_data_version(election, nominations):
+    report = reports.NominationsReport(election)
+    before = report.data_version()
+
+    nominations[0].field_1 = "Edited"
+    nominations[0].save()
+
+    assert report.data_version() != before
+
+
+def test_a_failed_report_is_retried_on_the_next_request(
+    tp, reporter, election, nominations, django_capture_on_commit_callbacks, monkeypatch
+):
+    def broken_save(self, name, chunks):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(report_artifacts.FileSystemReportStorage, "save", broken_save)
+    with pytest.raises(OSError):
+        with django_capture_on_commit_callbacks(execute=True):
+            get_report(tp, election)
+    assert models.ReportArtifact.objects.get().status == "failed"
+
+    monkeypatch.undo()
+    with django_capture_on_commit_callbacks(execute=True):
+        get_report(tp, election)
+
+    assert models.ReportArtifact.objects.get().status == "ready"
+
+
+def test_a_lost_report_is_queued_again(
+    tp, reporter, election, nominations, django_capture_on_commit_callbacks
+):
+    # as if the worker never got the task
+    with django_capture_on_commit_callbacks(execute=False):
+        get_report(tp, election)
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        assert get_report(tp, election).status_code == 202
+    assert not callbacks
+
+    models.ReportArtifact.objects.update(
+        requested_at=timezone.now() - report_artifacts.REPORT_STALE_AFTER * 2
+    )
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        get_report(tp, election)
+
+    assert len(callbacks) == 1
+    assert models.ReportArtifact.objects.get().status == "ready"
+
+
+def test_a_report_whose_worker_died_is_queued_again(
+    tp, reporter, election, nominations, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=False):
+        get_report(tp, election)
+    models.ReportArtifact.objects.update(
+        status=models.ReportArtifact.STATUS.RUNNING, started_at=timezone.now()
+    )
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        get_report(tp, election)
+    assert not callbacks
+
+    models.ReportArtifact.objects.update(
+        started_at=timezone.now() - report_artifacts.REPORT_STALE_AFTER * 2
+    )
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        get_report(tp, election)
+
+    assert len(callbacks) == 1
+    assert models.ReportArtifact.objects.get().status == "ready"
+
+
+def test_superseded_reports_are_deleted_with_their_files(
+    tp,
+    reporter,
+    election,
+    category,
+    nominations,
+    tmp_path,
+    django_capture_on_commit_callbacks,
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        get_report(tp, election)
+    old = models.ReportArtifact.objects.get()
+    assert (tmp_path / old.storage_name).exists()
+
+    factories.NominationFactory.create(category=category)
+    with django_capture_on_commit_callbacks(execute=True):
+        get_report(tp, election)
+
+    new = models.ReportArtifact.objects.get()
+    assert new.id != old.id
+    assert not (tmp_path / old.storage_name).exists()
+    assert not (tmp_path / old.storage_name).parent.exists()
+    assert (tmp_path / new.storage_name).exists()
+
+
+def test_superseded_reports_still_being_generated_are_kept(
+    tp, reporter, election, category, nominations, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=False):
+        get_report(tp, election)
+
+    factories.NominationFactory.create(category=category)
+    with django_capture_on_commit_callbacks(execute=False) as callbacks:
+        get_report(tp, election)
+    # the newer report is generated first
+    callbacks[0]()
+
+    assert sorted(models.ReportArtifact.objects.values_list("status", flat=True)) == [
+        "pending",
+        "ready",
+    ]
+
+
+class RecordingS3Client:
+    def __init__(self):
+        self.objects = {}
+
+    def upload_fileobj(self, file, bucket, key):
+        self.objects[bucket, key] = file.read()
+
+    def generate_presigned_url(self, method, Params, ExpiresIn):
+        return f"https://s3.example.com/{Params['Bucket']}/{Params['Key']}"
+
+    def delete_object(self, Bucket, Key):
+        del self.objects[Bucket, Key]
+
+
+def test_reports_can_be_stored_in_s3(election, nominations):
+    client = RecordingS3Client()
+    storage = S3ReportStorage(client, "reports")
+    report = reports.NominationsReport(election)
+    artifact = models.ReportArtifact.objects.create(
+        election=election,
+        report_name=report.report_name,
+        data_version=report.data_version(),
+        filename="report.csv",
+        content_type="text/csv",
+        storage_name="test/report.csv",
+    )
+
+    storage.save(artifact.storage_name, report.stream())
+    response = storage.response(artifact)
+
+    assert client.objects["reports", "test/report.csv"].decode() == (
+        report.get_report_content()
+    )
+    assert response.status_code == 302
+    assert response.url == "https://s3.example.com/reports/test/report.csv"
+
+    storage.delete(artifact.storage_name)
+    assert not client.objects
@@ -0,0 +1,174 @@
+import csv
+import gzip
+from io import StringIO
+
+import pytest
+from django.core import mail
+from freezegun import freeze_time
+from nominate import factories, models, tasks
+from nominate.admin import set_validation
+from nominate.ballots import NominationChanges, save_nomination_changes
+from nominate.report_delivery import DELTA_OVERLAP, FULL_REPORT_INTERVAL
+from nomnom.convention import HugoAwards
+from wsfs.rules import constitution_2023
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(name="category")
+def make_category():
+    return factories.CategoryFactory.create()
+
+
+@pytest.fixture(name="election")
+def make_election(category):
+    return category.election
+
+
+def attachment_rows(message) -> list[dict[str, str]]:
+    [(filename, content, mimetype)] = message.attachments
+    assert filename.endswith(".csv.gz")
+    assert mimetype == "application/gzip"
+    return list(csv.DictReader(StringIO(gzip.decompress(content).decode("utf-8"))))
+
+
+def send_nominations(election, delta=True):
+    mail.outbox.clear()
+    tasks.send_nomination_report("nominations", election_id=election.slug, delta=delta)
+    return mail.outbox
+
+
+def test_the_first_report_is_the_whole_of_it(election, category):
+    models.ReportRecipient.objects.create(
+        report_name="nominations", recipient_email="admin@example.com"
+    )
+    factories.NominationFactory.create_batch(2, category=category)
+
+    with freeze_time("2024-03-01 12:00"):
+        [message] = send_nominations(election)
+
+    assert len(attachment_rows(message)) == 2
+    assert "changed since" not in message.body
+    delivery = models.ReportDelivery.objects.get(election=election)
+    assert delivery.last_sent_at == delivery.last_full_sent_at
+
+
+def test_a_delta_report_has_only_the_changes(election, category):
+    models.ReportRecipient.objects.create(
+        report_name="nominations", recipient_email="admin@example.com"
+    )
+    with freeze_time("2024-03-01 12:00") as frozen:
+        old, invalidated = factories.NominationFactory.create_batch(
+            2, category=category
+        )
+        frozen.tick(DELTA_OVERLAP * 2)
+        send_nominations(election)
+
+        frozen.tick(DELTA_OVERLAP * 2)
+        new = factories.NominationFactory.create(category=category)
+        set_validation(models.Nomination.objects.filter(id=invalidated.id), False)
+
+        frozen.tick(DELTA_OVERLAP * 2)
+        [message] = send_nominations(election)
+
+    rows = {int(row["id"]): row for row in attachment_rows(message)}
+    assert rows.keys() == {new.id, invalidated.id}
+    assert rows[invalidated.id]["valid"] == "False"
+    assert rows[new.id]["valid"] == "True"
+    assert "changed since" in message.body
+
+
+def test_a_removal_since_the_last_report_sends_the_whole_of_it(election, category):
+    models.ReportRecipient.objects.create(
+        report_name="nominations", recipient_email="admin@example.com"
+    )
+    with freeze_time("2024-03-01 12:00") as frozen:
+        kept, removed = factories.NominationFactory.create_batch(2, category=category)
+        frozen.tick(DELTA_OVERLAP * 2)
+        send_nominations(election)
+
+        frozen.tick(DELTA_OVERLAP * 2)
+        save_nomination_changes(NominationChanges(deleted=[removed]))
+
+        frozen.tick(DELTA_OVERLAP * 2)
+        [message] = send_nominations(election)
+
+    assert [int(row["id"]) for row in attachment_rows(message)] == [kept.id]
+    assert "changed since" not in message.body
+
+
+def test_a_removal_before_the_last_report_is_already_in_it(election, category):
+    models.ReportRecipient.objects.create(
+        report_name="nominations", recipient_email="admin@example.com"
+    )
+    with freeze_time("2024-03-01 12:00") as frozen:
+        removed = factories.NominationFactory.create(category=category)
+        save_nomination_changes(NominationChanges(deleted=[removed]))
+        frozen.tick(DELTA_OVERLAP * 2)
+        send_nominations(election)
+
+        frozen.tick(DELTA_OVERLAP * 2)
+        factories.NominationFactory.create(category=category)
+        frozen.tick(DELTA_OVERLAP * 2)
+        [message] = send_nominations(election)
+
+    assert "changed since" in message.body
+
+
+def test_recipients_are_sent_the_whole_report_periodically(election, category):
+    models.ReportRecipient.objects.create(
+        report_name="nominations", recipient_email="admin@example.com"
+    )
+    factories.NominationFactory.create_batch(3, category=category)
+
+    with freeze_time("2024-03-01 12:00") as frozen:
+        send_nominations(election)
+        frozen.tick(FULL_REPORT_INTERVAL)
+        [message] = send_nominations(election)
+
+    assert len(attachment_rows(message)) == 3
+
+
+def test_without_delta_everyone_gets_the_whole_report(election, category):
+    models.ReportRecipient.objects.create(
+        report_name="nominations", recipient_email="admin@example.com"
+    )
+    factories.NominationFactory.create(category=category)
+
+    with freeze_time("2024-03-01 12:00") as frozen:
+        send_nominations(election, delta=False)
+        frozen.tick(DELTA_OVERLAP * 2)
+        [message] = send_nominations(election, delta=False)
+
+    assert len(attachment_rows(message)) == 1
+
+
+def test_ranks_deltas_go_only_to_the_configured_recipients(
+    election, category, registry
+):
+    registry.register_value(HugoAwards, constitution_2023.hugo_awards)
+    models.ReportRecipient.objects.create(
+        report_name="ranks", recipient_email="admin@example.com"
+    )
+    finalist = factories.FinalistFactory.create(category=category)
+
+    with freeze_time("2024-03-01 12:00") as frozen:
+        factories.RankFactory.create(finalist=finalist)
+        frozen.tick(DELTA_OVERLAP * 2)
+        tasks.send_rank_report(election_id=election.slug, delta=True)
+
+        frozen.tick(DELTA_OVERLAP * 2)
+        new = factories.RankFactory.create(finalist=finalist)
+        mail.outbox.clear()
+        tasks.send_rank_report(
+            election_id=election.slug, delta=True, recipients="hugo@example.com"
+        )
+
+    sent = {message.to[0]: attachment_rows(message) for message in mail.outbox}
+    assert [row["member_number"] for row in sent["admin@example.com"]] == [
+        new.membership.member_number
+    ]
+    assert len(sent["hugo@example.com"]) == 2
+    assert not models.ReportDelivery.objects.filter(
+        recipient__recipient_email="hugo@example.com"
+    ).exists()
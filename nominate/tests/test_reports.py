@@ -6,6 +6,7 @@ import pytest
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser, Permission
 from django.test import RequestFactory
+from django.utils.html import escape
 from freezegun import freeze_time
 from nominate import factories, models, reports
 
@@ -157,12 +158,17 @@ def test_nomination_view_get_unauthenticated(nominations_view, unauthenticated_r
     assert query["next"][0] == unauthenticated_request.path
 
 
+def streamed_content(response) -> str:
+    return b"".join(response.streaming_content).decode()
+
+
 def test_nomination_view_get(http_request, nominations_view, nomination):
     response = nominations_view.get(http_request)
 
     assert response.status_code == 200
+    report_content = streamed_content(response)
 
-    content = StringIO(response.content.decode())
+    content = StringIO(report_content)
     reader = csv.reader(content)
 
     header = next(reader)
@@ -171,7 +177,7 @@ def test_nomination_view_get(http_request, nominations_view, nomination):
     ] + nominations_view.report().extra_fields
     assert header == expected_header
 
-    content = StringIO(response.content.decode())
+    content = StringIO(report_content)
     reader = csv.DictReader(content)
 
     data_row = next(reader)
@@ -180,3 +186,127 @@ def test_nomination_view_get(http_request, nominations_view, nomination):
 
     with pytest.raises(StopIteration):  # No more data
         next(reader)
+
+
+def test_nomination_view_streams_the_report(http_request, nominations_view, nomination):
+    response = nominations_view.get(http_request)
+
+    assert response.streaming
+    assert 'attachment; filename="election_slug' in response["Content-Disposition"]
+
+
+def test_streamed_report_matches_the_built_report(
+    monkeypatch, nominations_report, category, user
+):
+    monkeypatch.setattr(reports, "REPORT_BUFFER_SIZE", 100)
+    for member in factories.NominatingMemberProfileFactory.create_batch(5):
+        factories.NominationFactory.create(category=category, nominator=member)
+
+    chunks = list(nominations_report.stream())
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == nominations_report.get_report_content()
+
+
+@pytest.fixture(name="ranks")
+def make_ranks(category):
+    finalist = factories.FinalistFactory.create(category=category, name="<b>Bold</b>")
+    for position, member in enumerate(
+        factories.NominatingMemberProfileFactory.create_batch(3), start=1
+    ):
+        factories.RankFactory.create(
+            membership=member, finalist=finalist, position=position
+        )
+
+
+def test_all_votes_in_page_streams_the_escaped_report(
+    request_factory, user, election, ranks
+):
+    user.user_permissions.add(Permission.objects.get(codename="view_raw_results"))
+    request = request_factory.get("/votes/", {"html": "true"})
+    request.user = user
+
+    response = reports.AllVotes.as_view()(request, election_id=election.slug)
+
+    assert response.streaming
+    page = streamed_content(response)
+    report = reports.RanksReport(election=election).get_report_content()
+    assert report.count("\n") == 4
+    assert f"<pre>{escape(report)}" in page
+    assert page.rstrip().endswith("</html>")
+
+
+def test_ranks_report_uses_plain_text_names(election, category, ranks):
+    category.name = "Best *Category*"
+    category.save()
+
+    reader = csv.DictReader(
+        reports.RanksReport(election=election).get_report_content().splitlines()
+    )
+
+    assert {(row["category"], row["finalist_name"]) for row in reader} == {
+        ("Best Category", "Bold")
+    }
+
+
+@pytest.fixture(name="ballots")
+def make_ballots(election, category):
+    second = factories.CategoryFactory.create(election=election, ballot_position=2)
+    finalists = {
+        c: [
+            factories.FinalistFactory.create(
+                category=c, name=f"{c.id}-{i}", ballot_position=i
+            )
+            for i in range(1, 4)
+        ]
+        for c in [category, second]
+    }
+    members = factories.NominatingMemberProfileFactory.create_batch(3)
+    # each member ranks one fewer finalist than the last, in each category
+    for skip, member in enumerate(members):
+        for c in finalists:
+            for position, finalist in enumerate(finalists[c][skip:], start=1):
+                factories.RankFactory.create(
+                    membership=member, finalist=finalist, position=position
+                )
+    return members, finalists
+
+
+def test_category_voting_report_pivots_each_members_ranks(category, ballots):
+    members, finalists = ballots
+
+    rows = list(reports.CategoryVotingReport(category=category).rows())
+
+    assert rows[0] == ["member_id", "name"] + [str(f) for f in finalists[category]]
+    assert rows[1:] == [
+        (members[0].member_number, members[0].preferred_name, 1, 2, 3),
+        (members[1].member_number, members[1].preferred_name, None, 1, 2),
+        (members[2].member_number, members[2].preferred_name, None, None, 1),
+    ]
+
+
+def test_election_voting_report_covers_every_category(election, category, ballots):
+    members, finalists = ballots
+
+    rows = list(reports.ElectionVotingReport(election=election).rows())
+
+    assert len(rows[0]) == 2 + 6
+    assert rows[0][2] == f"{category}: {finalists[category][0]}"
+    assert rows[2][2:] == (None, 1, 2, None, 1, 2)
+
+
+def test_voting_reports_take_the_same_queries_however_many_voters(
+    election, category, ballots, django_assert_num_queries
+):
+    def report_queries() -> int:
+        with django_assert_num_queries(2) as context:
+            list(reports.ElectionVotingReport(election=election).rows())
+        return len(context.captured_queries)
+
+    first = report_queries()
+    for member in factories.NominatingMemberProfileFactory.create_batch(5):
+        factories.RankFactory.create(
+            membership=member, finalist=ballots[1][category][0], position=1
+        )
+
+    assert report_queries() == first
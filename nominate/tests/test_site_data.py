@@ -0,0 +1,54 @@
+import pytest
+from django.test import RequestFactory
+from nominate import models, site_data
+from nominate.context_processors import site
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(name="request_")
+def make_request():
+    return RequestFactory().get("/")
+
+
+def test_a_warm_context_takes_no_queries(request_, django_assert_num_queries):
+    models.AdminMessage.objects.create(message="Voting closes soon", active=True)
+    site(request_)
+
+    with django_assert_num_queries(0):
+        context = site(request_)
+
+    assert context["ADMIN_MESSAGE"] == "Voting closes soon"
+    assert context["CONVENTION_NAME"] == "NomNom Testing"
+
+
+def test_no_message_is_cached_too(request_, django_assert_num_queries):
+    assert site(request_)["ADMIN_MESSAGE"] is None
+
+    with django_assert_num_queries(0):
+        assert site(request_)["ADMIN_MESSAGE"] is None
+
+
+def test_saving_a_message_replaces_the_cached_one(request_):
+    message = models.AdminMessage.objects.create(message="Voting is open", active=True)
+    assert site(request_)["ADMIN_MESSAGE"] == "Voting is open"
+
+    message.message = "Voting is closed"
+    message.save()
+    assert site(request_)["ADMIN_MESSAGE"] == "Voting is closed"
+
+    message.delete()
+    assert site(request_)["ADMIN_MESSAGE"] is None
+
+
+def test_other_processes_see_the_change_on_their_next_read(request_):
+    message = models.AdminMessage.objects.create(message="Voting is open", active=True)
+    # another process's copy of the same value
+    elsewhere = site_data.CachedValue("admin-message", site_data.load_admin_message)
+    assert elsewhere.get() == "Voting is open"
+
+    message.message = "Voting is closed"
+    message.save()
+
+    assert elsewhere.get() == "Voting is closed"
+    assert site(request_)["ADMIN_MESSAGE"] == "Voting is closed"
@@ -30,6 +30,31 @@ class TestElectionView(TestCase):
         assert response.status_code == 200
 
 
+def test_election_index_queries_do_not_grow_with_the_elections(
+    member, convention, request_factory, django_assert_max_num_queries
+):
+    from hugopacket.models import ElectionPacket
+
+    convention.hugo_packet_backend = "s3"
+
+    def index_queries(election_count) -> int:
+        for state, _ in itertools.islice(
+            itertools.cycle(models.Election.STATE_CHOICES), election_count
+        ):
+            election = factories.ElectionFactory.create(state=state)
+            ElectionPacket.objects.create(election=election, name=election.name)
+
+        request = request_factory.get("/")
+        request.user = models.NominatingMemberProfile.objects.get(id=member.id).user
+        ElectionView.as_view()(request)
+        with django_assert_max_num_queries(1000) as context:
+            response = ElectionView.as_view()(request)
+        assert len(response.context_data["object_list"]) > 0
+        return len(context.captured_queries)
+
+    assert index_queries(1) == index_queries(8)
+
+
 class TestElectionModeView(TestCase):
     def setup_method(self, test_method):
         self.election = factories.ElectionFactory.create()
@@ -214,6 +239,18 @@ class NominationViewInvariants(TestCase):
             )
         )
 
+    def test_submitting_valid_data_stores_normalized_keys(self):
+        valid_data = {
+            f"{self.c1.id}-0-field_1": "The Expanse",
+            f"{self.c1.id}-0-field_2": "James S. A. Corey",
+        }
+
+        self.submit_nominations(valid_data)
+
+        assert models.Nomination.objects.get().normalized_key == (
+            "expanse / james s corey"
+        )
+
     def test_submitting_valid_data_clears_previous_nominations_for_member(self):
         factories.NominationFactory.create_batch(
             2,
@@ -229,6 +266,88 @@ class NominationViewInvariants(TestCase):
         assert response.status_code == self.success_status_code
         assert models.Nomination.objects.count() == 1
 
+    def test_resubmitting_unchanged_nominations_leaves_them_untouched(self):
+        data = field_data(self.c1, 0, "title 1", "author 1")
+        data.update(field_data(self.c1, 1, "title 2", "author 2"))
+        self.submit_nominations(data)
+        nominations = self.member.nomination_set.all()
+        models.NominationAdminData.objects.create(
+            nomination=nominations.first(), valid_nomination=False
+        )
+        saved = set(nominations.values_list("id", "nomination_date"))
+
+        self.submit_nominations(data)
+
+        assert set(nominations.values_list("id", "nomination_date")) == saved
+        assert models.NominationAdminData.objects.count() == 1
+
+    def test_editing_a_slot_updates_only_that_nomination(self):
+        data = field_data(self.c1, 0, "title 1", "author 1")
+        data.update(field_data(self.c1, 1, "title 2", "author 2"))
+        self.submit_nominations(data)
+        first, second = self.member.nomination_set.order_by("id")
+        models.NominationAdminData.objects.create(
+            nomination=second, valid_nomination=False
+        )
+
+        data.update(field_data(self.c1, 1, "Title Two", "author 2"))
+        self.submit_nominations(data)
+
+        assert list(
+            self.member.nomination_set.order_by("id").values_list(
+                "id", "field_1", "normalized_key"
+            )
+        ) == [
+            (first.id, "title 1", "title 1 / author 1"),
+            (second.id, "Title Two", "title two / author 2"),
+        ]
+        # the ruling was on the nomination as it was
+        assert not models.NominationAdminData.objects.exists()
+        second_date = second.nomination_date
+        second.refresh_from_db()
+        assert second.nomination_date > second_date
+
+    def test_clearing_a_slot_deletes_only_that_nomination(self):
+        data = field_data(self.c1, 0, "title 1", "author 1")
+        data.update(field_data(self.c1, 1, "title 2", "author 2"))
+        data.update(field_data(self.c2, 0, "title 3", "author 3"))
+        self.submit_nominations(data)
+        kept = set(
+            self.member.nomination_set.exclude(field_1="title 1").values_list(
+                "id", "nomination_date"
+            )
+        )
+
+        data.update(field_data(self.c1, 0, "", ""))
+        self.submit_nominations(data)
+
+        assert (
+            set(self.member.nomination_set.values_list("id", "nomination_date")) == kept
+        )
+
+    def test_clearing_a_middle_slot_keeps_the_nominations_after_it(self):
+        data = field_data(self.c1, 0, "title 1", "author 1")
+        data.update(field_data(self.c1, 1, "title 2", "author 2"))
+        data.update(field_data(self.c1, 2, "title 3", "author 3"))
+        self.submit_nominations(data)
+        third = self.member.nomination_set.get(field_1="title 3")
+        models.NominationAdminData.objects.create(
+            nomination=third, valid_nomination=False
+        )
+
+        # the stored slots close up behind the cleared one; the submitted ones don't
+        data.update(field_data(self.c1, 1, "", ""))
+        self.submit_nominations(data)
+        self.submit_nominations(data)
+
+        assert list(
+            self.member.nomination_set.order_by("id").values_list("field_1", flat=True)
+        ) == ["title 1", "title 3"]
+        assert self.member.nomination_set.get(field_1="title 3").nomination_date == (
+            third.nomination_date
+        )
+        assert models.NominationAdminData.objects.get().nomination_id == third.id
+
     def test_submitting_invalid_data_does_not_save(self):
         # Define your initial form data that is invalid
         invalid_data = {
@@ -341,6 +460,111 @@ class TestNominationViewHTMX(NominationViewInvariants, NominationHTMXSubmitMixin
         return reverse("election:nominate", kwargs={"election_id": self.election.slug})
 
 
+class TestNominationCategoryView(TestCase):
+    def setup_method(self, test_method):
+        self.election = factories.ElectionFactory.create(state="nominating")
+        self.member = factories.NominatingMemberProfileFactory.create()
+        self.user = self.member.user
+        self.user.user_permissions.add(
+            Permission.objects.get(
+                codename="nominate", content_type__app_label="nominate"
+            )
+        )
+        self.c1, self.c2 = (
+            factories.CategoryFactory.create(
+                election=self.election, fields=2, ballot_position=i
+            )
+            for i in range(2)
+        )
+
+    def url(self, category):
+        return reverse(
+            "election:nominate-category",
+            kwargs={"election_id": self.election.slug, "category_id": category.id},
+        )
+
+    def submit_category(self, category, data, headers=None):
+        self.client.force_login(self.user)
+        return self.client.post(self.url(category), data=data, headers=headers or {})
+
+    def test_saving_a_category_leaves_the_others_alone(self):
+        self.client.force_login(self.user)
+        self.client.post(
+            reverse("election:nominate", kwargs={"election_id": self.election.slug}),
+            field_data(self.c1, 0, "title 1", "author 1")
+            | field_data(self.c2, 0, "title 2", "author 2"),
+        )
+        c2_nominations = set(
+            self.member.nomination_set.filter(category=self.c2).values_list(
+                "id", "nomination_date"
+            )
+        )
+
+        response = self.submit_category(
+            self.c1, field_data(self.c1, 1, "title 3", "author 3")
+        )
+
+        assert response.status_code == 302
+        assert response.url.endswith(f"#category_{self.c1.id}")
+        assert list(
+            self.member.nomination_set.filter(category=self.c1).values_list(
+                "field_1", flat=True
+            )
+        ) == ["title 3"]
+        assert (
+            set(
+                self.member.nomination_set.filter(category=self.c2).values_list(
+                    "id", "nomination_date"
+                )
+            )
+            == c2_nominations
+        )
+
+    def test_htmx_saves_render_only_the_category(self):
+        response = self.submit_category(
+            self.c1,
+            field_data(self.c1, 0, "title 1", "author 1"),
+            headers={"HX-Request": "true"},
+        )
+
+        assert response.status_code == 200
+        content = response.content.decode()
+        assert content.lstrip().startswith(
+            f'<div id="nominating_category_{self.c1.id}"'
+        )
+        assert f"category_{self.c2.id}" not in content
+        assert 'id="nominating_ballot"' not in content
+        assert self.member.nomination_set.count() == 1
+
+    def test_invalid_category_data_is_not_saved(self):
+        response = self.submit_category(
+            self.c1,
+            field_data(self.c1, 0, "title 1", ""),
+            headers={"HX-Request": "true"},
+        )
+
+        assert response.status_code == 200
+        assert "This field is required." in response.content.decode()
+        assert not self.member.nomination_set.exists()
+
+    def test_categories_from_other_elections_are_not_found(self):
+        other = factories.CategoryFactory.create()
+
+        response = self.submit_category(other, field_data(other, 0, "title", "author"))
+
+        assert response.status_code == 404
+
+    def test_the_ballot_saves_each_category_on_its_own(self):
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse("election:nominate", kwargs={"election_id": self.election.slug})
+        )
+
+        content = response.content.decode()
+        assert f'hx-post="{self.url(self.c1)}"' in content
+        assert f'hx-params="{self.c1.id}-0-field_1,{self.c1.id}-0-field_2,' in content
+
+
 class TestAdminNominationView(TestCase):
     def setup_method(self, test_method):
         self.election = factories.ElectionFactory(state="nominating")
@@ -1,9 +1,15 @@
+import threading
 from itertools import chain
 from typing import Protocol, cast
 
 import pytest
+from django.db import connection
 from django.http import HttpResponse
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from nominate import factories, models
+from nominate.ballots import diff_ranks
+from nominate.hugo_awards import ballot_set_versions
 from nominate.views.vote import VoteView
 from pytest_lazy_fixtures import lf
 
@@ -170,6 +176,165 @@ def test_submitting_clears_blank_ranks(c1, member, submit_votes: Submit):
     assert models.Rank.objects.count() == 4
 
 
+@with_submitters
+def test_submitting_votes_invalidates_cached_results_for_those_categories(
+    c1, c2, submit_votes: Submit, django_capture_on_commit_callbacks
+):
+    before = dict(ballot_set_versions([c1, c2]))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        submit_votes(basic_ranks(c1))
+
+    after = dict(ballot_set_versions([c1, c2]))
+    assert after[c1] != before[c1]
+    assert after[c2] == before[c2]
+
+
+@with_submitters
+def test_submitting_votes_moves_the_ballot_in_the_live_tally(c1, submit_votes: Submit):
+    first, second, *_ = c1.finalist_set.all()
+
+    submit_votes(make_ranks(c1, [(first.id, 1), (second.id, 2)]))
+    submit_votes(make_ranks(c1, [(second.id, 1), (first.id, 2)]))
+
+    assert dict(
+        models.BallotSignature.objects.filter(category=c1).values_list(
+            "signature", "weight"
+        )
+    ) == {f"{first.id},{second.id}": 0, f"{second.id},{first.id}": 1}
+
+
+@with_submitters
+def test_clearing_a_ballot_removes_it_from_the_live_tally(c1, submit_votes: Submit):
+    submit_votes(basic_ranks(c1))
+    submit_votes({})
+
+    assert not models.BallotSignature.objects.filter(weight__gt=0).exists()
+
+
+def rank_writes(queries) -> list[str]:
+    return [
+        q["sql"].split()[0]
+        for q in queries
+        if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+        and '"nominate_rank"' in q["sql"]
+    ]
+
+
+@with_submitters
+def test_resubmitting_an_unchanged_ballot_writes_no_ranks(
+    c1, submit_votes: Submit, member
+):
+    ranks = basic_ranks(c1)
+    submit_votes(ranks)
+    saved = set(member.rank_set.values_list("id", "rank_date"))
+
+    with CaptureQueriesContext(connection) as queries:
+        submit_votes(ranks, extra={"HTTP_X_FORWARDED_FOR": "111.111.111.111"})
+
+    assert rank_writes(queries.captured_queries) == []
+    assert set(member.rank_set.values_list("id", "rank_date")) == saved
+
+
+@with_submitters
+def test_changing_one_rank_only_writes_that_rank(c1, c2, submit_votes: Submit, member):
+    ranks = basic_ranks(c1) | basic_ranks(c2)
+    submit_votes(ranks)
+    first, second, *_ = c1.finalist_set.all()
+    untouched = member.rank_set.exclude(finalist__in=[first, second])
+    saved = set(untouched.values_list("id", "rank_date", "voter_ip_address"))
+
+    ranks[f"{c1.id}_{first.id}"], ranks[f"{c1.id}_{second.id}"] = (
+        ranks[f"{c1.id}_{second.id}"],
+        ranks[f"{c1.id}_{first.id}"],
+    )
+    with CaptureQueriesContext(connection) as queries:
+        submit_votes(ranks, extra={"HTTP_X_FORWARDED_FOR": "111.111.111.111"})
+
+    assert rank_writes(queries.captured_queries) == ["UPDATE"]
+    assert set(untouched.values_list("id", "rank_date", "voter_ip_address")) == saved
+    assert member.rank_set.get(finalist=first).position == 2
+    assert member.rank_set.get(finalist=second).voter_ip_address == "111.111.111.111"
+
+
+def test_rank_changes_report_what_was_inserted_updated_and_deleted(c1, c2, member):
+    first, second, third, *_ = c1.finalist_set.all()
+    other = c2.finalist_set.first()
+    stored = [
+        factories.RankFactory.create(membership=member, finalist=f, position=p)
+        for f, p in [(first, 1), (second, 2), (other, 1)]
+    ]
+
+    changes = diff_ranks(
+        member, stored, {first: "1", second: None, third: "2", other: 1}, None
+    )
+
+    assert [r.finalist for r in changes.inserted] == [third]
+    assert changes.updated == []
+    assert [r.finalist for r in changes.deleted] == [second]
+    assert changes.category_ids == {c1.id}
+
+
+@pytest.fixture(name="category_url")
+def make_category_url(tp, election, c1):
+    return tp.reverse(
+        "election:vote-category", election_id=election.slug, category_id=c1.id
+    )
+
+
+@with_submitters
+def test_saving_a_category_leaves_the_others_alone(
+    c1, c2, tp, member, submit_votes: Submit, category_url
+):
+    submit_votes(basic_ranks(c1) | basic_ranks(c2))
+    c2_ranks = set(
+        member.rank_set.filter(finalist__category=c2).values_list("id", "rank_date")
+    )
+    first, second, *_ = c1.finalist_set.all()
+
+    response = tp.client.post(
+        category_url, make_ranks(c1, [(first.id, 2), (second.id, 1)])
+    )
+
+    assert response.status_code == 302
+    assert response.url.endswith(f"#voting_category_{c1.id}")
+    assert dict(
+        member.rank_set.filter(finalist__category=c1).values_list(
+            "finalist", "position"
+        )
+    ) == {first.id: 2, second.id: 1}
+    assert (
+        set(
+            member.rank_set.filter(finalist__category=c2).values_list("id", "rank_date")
+        )
+        == c2_ranks
+    )
+
+
+def test_htmx_category_saves_render_only_the_category(c1, c2, tp, member, category_url):
+    tp.client.force_login(member.user)
+
+    response = tp.client.post(
+        category_url, basic_ranks(c1), headers={"HX-Request": "true"}
+    )
+
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert content.lstrip().startswith(f'<div id="voting_category_{c1.id}"')
+    assert f"voting_category_{c2.id}" not in content
+    assert member.rank_set.count() == 5
+
+
+def test_the_ballot_saves_each_category_on_its_own(
+    c1, tp, member, view_url, category_url
+):
+    tp.client.force_login(member.user)
+
+    content = tp.get(view_url).content.decode()
+
+    assert f'hx-post="{category_url}"' in content
+
+
 @pytest.fixture
 def duplicate_ranks(c1):
     ranks = basic_ranks(c1)
@@ -334,3 +499,52 @@ def make_category_2(election):
     factories.FinalistFactory.create(category=category)
     factories.FinalistFactory.create(category=category)
     return category
+
+
+@pytest.mark.django_db(transaction=True)
+def test_saving_the_same_ballot_twice_at_once_counts_it_once(
+    c1, member, view_url, monkeypatch
+):
+    both_read = threading.Event()
+    read = []
+
+    def diff_once_both_have_read(*args, **kwargs):
+        read.append(True)
+        if len(read) == 2:
+            both_read.set()
+        # unless the first save holds the ballot, the second reads the same stored ranks
+        # meanwhile
+        both_read.wait(timeout=1)
+        return diff_ranks(*args, **kwargs)
+
+    monkeypatch.setattr("nominate.views.vote.diff_ranks", diff_once_both_have_read)
+
+    def save():
+        try:
+            client = Client()
+            client.force_login(member.user)
+            client.post(view_url, basic_ranks(c1))
+        finally:
+            connection.close()
+
+    saves = [threading.Thread(target=save) for _ in range(2)]
+    for thread in saves:
+        thread.start()
+    for thread in saves:
+        thread.join()
+
+    assert len(read) == 2
+    assert member.rank_set.count() == c1.finalist_set.count()
+    assert list(
+        models.BallotSignature.objects.filter(category=c1, weight__gt=0).values_list(
+            "weight", flat=True
+        )
+    ) == [1]
+
+
+def test_saving_a_ballot_locks_the_member(c1, member, submit_votes_http):
+    with CaptureQueriesContext(connection) as queries:
+        submit_votes_http(basic_ranks(c1))
+
+    [lock] = [q["sql"] for q in queries.captured_queries if "FOR UPDATE" in q["sql"]]
+    assert '"nominate_nominatingmemberprofile"' in lock
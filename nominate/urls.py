@@ -20,6 +20,16 @@ urlpatterns = [
     ),
     path("<election_id>/nominate/", views.NominationView.as_view(), name="nominate"),
     path("<election_id>/vote/", views.VoteView.as_view(), name="vote"),
+    path(
+        "<election_id>/nominate/<int:category_id>/",
+        views.NominationCategoryView.as_view(),
+        name="nominate-category",
+    ),
+    path(
+        "<election_id>/vote/<int:category_id>/",
+        views.VoteCategoryView.as_view(),
+        name="vote-category",
+    ),
     path(
         "<election_id>/edit_nominating_ballot/<member_id>",
         views.AdminNominationView.as_view(),
@@ -47,6 +57,21 @@ urlpatterns = [
         reports.AllVotes.as_view(),
         name="vote-report",
     ),
+    path(
+        "<election_id>/admin/votes/matrix/",
+        reports.ElectionVotes.as_view(),
+        name="vote-matrix-report",
+    ),
+    path(
+        "<election_id>/admin/votes/matrix.npz",
+        reports.BallotMatrix.as_view(),
+        name="ballot-matrix-export",
+    ),
+    path(
+        "<election_id>/admin/votes/<int:category_id>/",
+        reports.CategoryVotes.as_view(),
+        name="category-vote-report",
+    ),
     # The result of the Hugo Award elections, as of the present.
     path(
         "<election_id>/admin/results/",
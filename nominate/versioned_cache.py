@@ -0,0 +1,76 @@
+"""Cached values that are replaced, rather than expired, when what they're built from changes.
+
+Each kind of value has a version, kept in the cache under a key of its own, and optionally
+scoped, to an election or a category say. Values are cached under keys that include the
+version, so that invalidating them is just a matter of dropping the version: the next read
+gets a new one, misses, and builds the value again, in every process at once. A value is only
+ever looked up under the current version, so it never goes stale; `CACHE_TIMEOUT` just stops
+the ones for old versions from lingering forever.
+
+A version is usually dropped straight away, so that the rest of the transaction sees the
+change, and again once the transaction commits, in case another request rebuilt the value from
+the old rows in the meantime.
+"""
+
+import uuid
+from collections.abc import Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def new_version() -> str:
+    return uuid.uuid4().hex
+
+
+def delete_keys(keys: list[str], on_commit_only: bool = False) -> None:
+    """Delete the keys straight away, unless `on_commit_only`, and again once the
+    transaction commits."""
+    if not keys:
+        return
+
+    if not on_commit_only:
+        cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class VersionedCache:
+    def __init__(self, name: str):
+        self.name = name
+
+    def version_key(self, *scope) -> str:
+        return ":".join(["nominate", f"{self.name}-version", *map(str, scope)])
+
+    def key(self, version: str, *parts) -> str:
+        """The key for a value cached under `version`."""
+        return ":".join(["nominate", self.name, *map(str, parts), version])
+
+    def version(self, *scope) -> str:
+        """The current version, starting a new one if there isn't one."""
+        return cache.get_or_set(self.version_key(*scope), new_version, timeout=None)
+
+    def versions(self, scopes: Iterable[tuple]) -> list[str]:
+        """The current versions for each of the scopes, read all at once."""
+        keys = [self.version_key(*scope) for scope in scopes]
+        versions = cache.get_many(keys)
+        return [
+            versions.get(key) or cache.get_or_set(key, new_version, timeout=None)
+            for key in keys
+        ]
+
+    def current_version(self, *scope) -> str | None:
+        """The current version, if there is one."""
+        return cache.get(self.version_key(*scope))
+
+    def invalidate(self, *scope, on_commit_only: bool = False) -> None:
+        self.invalidate_many([scope], on_commit_only=on_commit_only)
+
+    def invalidate_many(
+        self, scopes: Iterable[tuple], on_commit_only: bool = False
+    ) -> None:
+        delete_keys(
+            [self.version_key(*scope) for scope in scopes],
+            on_commit_only=on_commit_only,
+        )
@@ -1,5 +1,5 @@
 # ruff: noqa: F401
 from .base import access_denied, login_error
 from .election import ClosedElectionView, ElectionModeView, ElectionView
-from .nominate import AdminNominationView, NominationView
-from .vote import ElectionResultsPrettyView, VoteView
+from .nominate import AdminNominationView, NominationCategoryView, NominationView
+from .vote import ElectionResultsPrettyView, VoteCategoryView, VoteView
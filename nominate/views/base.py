@@ -1,24 +1,31 @@
-import functools
-
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
-from django.http import HttpRequest, HttpResponse
-from django.shortcuts import get_object_or_404, render
+from django.http import Http404, HttpRequest, HttpResponse
+from django.shortcuts import render
 from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
 
 from nominate import models
+from nominate.ballot_schema import BallotSchema, get_ballot_schema
+from nominate.decorators import memoized
+from nominate.election_context import election_context
+from nominate.permissions import PermissionSnapshot, user_permissions
+from nominate.versioned_cache import CACHE_TIMEOUT
 
 
 class ElectionView(TemplateView):
-    @functools.lru_cache
+    @memoized
     def election(self):
-        return get_object_or_404(models.Election, slug=self.kwargs.get("election_id"))
+        return election_context(self.request).election(self.kwargs.get("election_id"))
 
-    @functools.lru_cache
+    @memoized
     def categories(self):
         return models.Category.objects.filter(election=self.election())
 
+    @memoized
+    def permissions(self) -> PermissionSnapshot:
+        return user_permissions(self.request.user)
+
     def get_context_data(self, **kwargs):
         ctx = {
             "election": self.election,
@@ -36,15 +43,39 @@ class NominatorView(ElectionView):
     def get_context_data(self, **kwargs):
         ctx = {
             "profile": self.profile,
+            **self.ballot_context(),
         }
         ctx.update(super().get_context_data(**kwargs))
         return ctx
 
-    @functools.lru_cache
+    def ballot_context(self) -> dict:
+        """What the ballot templates need to cache the parts that are the same for everyone."""
+        return {
+            "election": self.election(),
+            "ballot_schema": self.ballot_schema(),
+            "ballot_cache_timeout": CACHE_TIMEOUT,
+        }
+
+    @memoized
+    def ballot_schema(self) -> BallotSchema:
+        return get_ballot_schema(self.election())
+
+    def categories(self):
+        return self.ballot_schema().categories
+
+    def category(self) -> models.Category:
+        """The category named in the URL."""
+        category_id = self.kwargs.get("category_id")
+        for category in self.ballot_schema().categories:
+            if category.id == category_id:
+                return category
+
+        raise Http404("No such category in this election")
+
+    @memoized
     def profile(self) -> models.NominatingMemberProfile:
-        try:
-            profile = self.request.user.convention_profile
-        except models.NominatingMemberProfile.DoesNotExist:
+        profile = election_context(self.request).profile()
+        if profile is None:
             raise PermissionDenied("You do not have a nominating profile.")
 
         return profile
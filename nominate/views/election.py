@@ -1,16 +1,16 @@
-from collections.abc import Iterable
 from typing import Any
 
 import django.contrib.auth.forms
 from django.apps import apps
 from django.conf import settings
-from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.views.generic import DetailView, ListView, RedirectView
 from django_svcs.apps import svcs_from
 from nomnom.convention import ConventionConfiguration
 
 from nominate import models
+from nominate.election_context import election_context
+from nominate.permissions import user_permissions
 
 
 class ElectionView(ListView):
@@ -24,35 +24,43 @@ class ElectionView(ListView):
         return context
 
     def get_queryset(self):
-        query_set: Iterable[models.Election] = super().get_queryset()
+        query_set = super().get_queryset()
+        # evaluated up front; the annotations below are made on its cached elections
+        elections: list[models.Election] = list(query_set)
 
         # we only do this if the convention has a packet setting
         convention_configuration = svcs_from(self.request).get(ConventionConfiguration)
 
-        ElectionPacket = None
-        # if the packet application is installed and enabled, let's try load the model here
+        packets = None
+        # if the packet application is installed and enabled, let's load the elections'
+        # packets here, all at once
         if (
             "hugopacket" in settings.INSTALLED_APPS
             and convention_configuration.packet_enabled
         ):
             app_config = apps.get_app_config("hugopacket")
             ElectionPacket = app_config.models_module.ElectionPacket
+            packets = {
+                packet.election_id: packet
+                for packet in ElectionPacket.objects.filter(
+                    election__in=[e.id for e in elections]
+                )
+            }
+
+        # every check below is made against the same snapshot of the user's permissions
+        user = user_permissions(self.request.user)
 
         # annotate our elections with some info
-        for election in query_set:
-            election.is_open_for_user = election.is_open_for(self.request.user)
-            election.user_state = election.describe_state(user=self.request.user)
-            election.user_pretty_state = election.pretty_state(user=self.request.user)
-
-            if ElectionPacket:
-                try:
-                    packet = ElectionPacket.objects.filter(election=election).first()
-                except ElectionPacket.DoesNotExist:
-                    packet = None
+        for election in elections:
+            election.is_open_for_user = election.is_open_for(user)
+            election.user_state = election.describe_state(user=user)
+            election.user_pretty_state = election.pretty_state(user=user)
+
+            if packets is not None:
+                packet = packets.get(election.id)
                 election.packet_exists = packet is not None
                 election.packet_is_ready = packet and (
-                    packet.enabled
-                    or self.request.user.has_perm("hugopacket.preview_packet")
+                    packet.enabled or user.has_perm("hugopacket.preview_packet")
                 )
             else:
                 election.packet_exists = False
@@ -65,11 +73,12 @@ class ElectionModeView(RedirectView):
     query_string = True
 
     def get_redirect_url(self, *args: Any, **kwargs: Any) -> str | None:
-        election = get_object_or_404(models.Election, slug=kwargs.get("election_id"))
-        if election.user_can_nominate(self.request.user):
+        election = election_context(self.request).election(kwargs.get("election_id"))
+        user = user_permissions(self.request.user)
+        if election.user_can_nominate(user):
             return reverse("election:nominate", kwargs={"election_id": election.slug})
 
-        if election.user_can_vote(self.request.user):
+        if election.user_can_vote(user):
             return reverse("election:vote", kwargs={"election_id": election.slug})
 
         return reverse("election:closed", kwargs={"election_id": election.slug})
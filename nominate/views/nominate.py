@@ -1,4 +1,3 @@
-import functools
 from datetime import datetime
 from itertools import groupby
 from operator import attrgetter
@@ -18,7 +17,13 @@ from ipware import get_client_ip
 from render_block import render_block_to_string
 
 from nominate import models
-from nominate.decorators import user_passes_test_or_forbidden
+from nominate.ballots import (
+    diff_nominations,
+    lock_ballot,
+    nomination_slots,
+    save_nomination_changes,
+)
+from nominate.decorators import memoized, user_passes_test_or_forbidden
 from nominate.forms import NominationForm
 from nominate.tasks import send_ballot
 
@@ -27,6 +32,8 @@ from .base import NominatorView
 
 class NominationView(NominatorView):
     template_name = "nominate/nominate.html"
+    # the view that saves a single category of the ballot, if the ballot can be saved that way
+    category_view_name: str | None = "election:nominate-category"
 
     def get_context_data(self, **kwargs):
         nominations = kwargs.pop("nominations", None)
@@ -53,17 +60,34 @@ class NominationView(NominatorView):
                 queryset=self.profile().nomination_set.filter(
                     category__election=self.election()
                 ),
+                schema=self.ballot_schema(),
             )
         ctx = {
             "form": form,
             "nominations": nominations,
             "most_recent": most_recent,
+            "category_save_urls": self.category_save_urls(),
         }
         ctx.update(super().get_context_data(**kwargs))
         return ctx
 
+    def category_save_urls(self) -> dict[models.Category, str]:
+        if self.category_view_name is None:
+            return {}
+
+        return {
+            category: reverse(
+                self.category_view_name,
+                kwargs={
+                    "election_id": self.election().slug,
+                    "category_id": category.id,
+                },
+            )
+            for category in self.categories()
+        }
+
     def can_nominate(self, request) -> bool:
-        return self.election().user_can_nominate(request.user)
+        return self.election().user_can_nominate(self.permissions())
 
     def get_template_names(self) -> list[str]:
         if self.can_nominate(self.request):
@@ -88,21 +112,31 @@ class NominationView(NominatorView):
         profile = self.profile()
         client_ip_address, _ignored = get_client_ip(request=request)
 
-        # Kind of hacky but works - the place on the page is passwed in the submit
-        category_saved = request.POST.get("save_all", None)
+        category_saved = self.saved_anchor(request)
 
-        form = NominationForm(categories=list(self.categories()), data=request.POST)
+        form = NominationForm(
+            categories=list(self.categories()),
+            data=request.POST,
+            schema=self.ballot_schema(),
+        )
 
         if form.is_valid():
-            # first, we clear all of the existing nominations for this user and election; they've
-            # submitted a new ballot, so we're going to start from scratch.
-            profile.nomination_set.filter(category__election=self.election()).delete()
-
-            # now, we're going to iterate through the formsets and save the nominations
-            for nomination in form.cleaned_data["nominations"]:
-                nomination.nominator = profile
-                nomination.nomination_ip_address = client_ip_address
-            models.Nomination.objects.bulk_create(form.cleaned_data["nominations"])
+            # only write the nominations that were added, edited or cleared; the rest keep their
+            # dates and any admin rulings.
+            lock_ballot(profile)
+            stored = nomination_slots(
+                profile.nomination_set.filter(
+                    category__in=form.categories
+                ).select_related("category")
+            )
+            save_nomination_changes(
+                diff_nominations(
+                    profile,
+                    stored,
+                    form.cleaned_data["nominations_by_slot"],
+                    client_ip_address,
+                )
+            )
 
             def on_commit_callback():
                 self.post_save_hook(request)
@@ -110,14 +144,7 @@ class NominationView(NominatorView):
             transaction.on_commit(on_commit_callback)
 
             if request.htmx:
-                return HttpResponse(
-                    render_block_to_string(
-                        "nominate/nominate.html",
-                        "form",
-                        context=self.get_context_data(form=form),
-                        request=request,
-                    )
-                )
+                return self.render_form_fragment(form)
             else:
                 url = reverse(
                     "election:nominate",
@@ -129,23 +156,64 @@ class NominationView(NominatorView):
         else:
             messages.warning(request, "Something wasn't quite right with your ballot")
             if request.htmx:
-                return HttpResponse(
-                    render_block_to_string(
-                        "nominate/nominate.html",
-                        "form",
-                        context=self.get_context_data(form=form),
-                        request=request,
-                    )
-                )
+                return self.render_form_fragment(form)
             else:
                 return self.render_to_response(self.get_context_data(form=form))
 
+    def saved_anchor(self, request: HttpRequest) -> str | None:
+        # Kind of hacky but works - the place on the page is passwed in the submit
+        return request.POST.get("save_all", None)
+
+    def render_form_fragment(self, form: NominationForm) -> HttpResponse:
+        return HttpResponse(
+            render_block_to_string(
+                "nominate/nominate.html",
+                "form",
+                context=self.get_context_data(form=form),
+                request=self.request,
+            )
+        )
+
     def post_save_hook(self, request: HttpRequest) -> None:
         messages.success(request, "Your set of nominations was saved")
 
 
+class NominationCategoryView(NominationView):
+    """Saves one category of the nominating ballot, and re-renders only that category."""
+
+    http_method_names = ["post"]
+
+    def categories(self):
+        return [super().category()]
+
+    def category(self) -> models.Category:
+        return self.categories()[0]
+
+    def saved_anchor(self, request: HttpRequest) -> str | None:
+        return f"category_{self.category().id}"
+
+    def render_form_fragment(self, form: NominationForm) -> HttpResponse:
+        category = self.category()
+        return HttpResponse(
+            render_block_to_string(
+                "nominate/nominate.html",
+                "category",
+                context={
+                    **self.ballot_context(),
+                    "form": form,
+                    "category": category,
+                    "fieldset_list": form.fieldsets_grouped_by_category[category],
+                    "category_save_urls": self.category_save_urls(),
+                },
+                request=self.request,
+            )
+        )
+
+
 class AdminNominationView(NominationView):
     template_name = "nominate/admin_nominate.html"
+    # every save is emailed to the member, so the ballot is only saved as a whole
+    category_view_name = None
 
     @method_decorator(login_required)
     @method_decorator(user_passes_test_or_forbidden(lambda u: u.is_staff))
@@ -159,7 +227,7 @@ class AdminNominationView(NominationView):
         # is always `True`
         return True
 
-    @functools.lru_cache
+    @memoized
     def profile(self):
         return get_object_or_404(
             models.NominatingMemberProfile, id=self.kwargs.get("member_id")
@@ -16,10 +16,14 @@ from nomnom.convention import HugoAwards
 from render_block import render_block_to_string
 
 from nominate import models
+from nominate.ballots import diff_ranks, lock_ballot, save_rank_changes
 from nominate.decorators import user_passes_test_or_forbidden
 from nominate.forms import RankForm
 from nominate.hugo_awards import (
+    ballot_signatures_by_category,
     get_results_for_election,
+    invalidate_results,
+    record_ballot_changes,
     result_to_slant_table,
 )
 from nominate.tasks import send_voting_ballot
@@ -29,16 +33,19 @@ from .base import ElectionView, NominatorView
 
 class VoteView(NominatorView):
     template_name = "nominate/vote.html"
+    # the view that saves a single category of the ballot
+    category_view_name = "election:vote-category"
 
-    def build_ballot_forms(self, data=None) -> RankForm:
+    def build_ballot_forms(self, data=None, ranks=None) -> RankForm:
         args = [] if data is None else [data]
-        return RankForm(*args, finalists=self.finalists(), ranks=self.ranks())
-
-    def finalists(self):
-        return models.Finalist.objects.select_related("category").filter(
-            category__election=self.election()
+        ranks = self.ranks() if ranks is None else ranks
+        return RankForm(
+            *args, finalists=self.finalists(), ranks=ranks, schema=self.ballot_schema()
         )
 
+    def finalists(self) -> list[models.Finalist]:
+        return self.ballot_schema().finalists
+
     def ranks(self):
         return models.Rank.objects.select_related("finalist__category").filter(
             finalist__in=self.finalists(), membership=self.profile()
@@ -48,84 +55,136 @@ class VoteView(NominatorView):
         form = kwargs.pop("form", None)
         if form is None:
             form = self.build_ballot_forms()
-        ctx = {"form": form}
+        ctx = {"form": form, "category_save_urls": self.category_save_urls()}
         ctx.update(super().get_context_data(**kwargs))
         return ctx
 
+    def category_save_urls(self) -> dict[models.Category, str]:
+        return {
+            category: reverse(
+                self.category_view_name,
+                kwargs={
+                    "election_id": self.election().slug,
+                    "category_id": category.id,
+                },
+            )
+            for category in self.categories()
+        }
+
     def get(self, request: HttpRequest, *args, **kwargs):
-        if not self.election().user_can_vote(request.user):
+        if not self.election().user_can_vote(self.permissions()):
             self.template_name = "nominate/election_closed.html"
 
         return super().get(request, *args, **kwargs)
 
     @transaction.atomic
     def post(self, request: HttpRequest, *args, **kwargs):
-        if not self.election().user_can_vote(request.user):
+        if not self.election().user_can_vote(self.permissions()):
             messages.error(
                 request, f"You do not have voting rights for {self.election()}"
             )
             return redirect("election:index")
 
         client_ip_address, _ = get_client_ip(request=request)
-        form = self.build_ballot_forms(request.POST)
+        lock_ballot(self.profile())
+        stored_ranks = list(self.ranks())
+        form = self.build_ballot_forms(request.POST, ranks=stored_ranks)
 
         if form.is_valid():
-            ranks_to_create = []
-            ranks_to_delete = []
-            for finalist, vote in form.cleaned_data["votes"].items():
-                rank = models.Rank(finalist=finalist, membership=self.profile())
-                if vote is None:
-                    ranks_to_delete.append(rank)
-                else:
-                    rank.position = int(vote)
-                    rank.voter_ip_address = client_ip_address
-                    ranks_to_create.append(rank)
-
-            models.Rank.objects.bulk_create(
-                ranks_to_create,
-                update_conflicts=True,
-                unique_fields=["finalist", "membership"],
-                update_fields=["position", "voter_ip_address"],
+            votes = form.cleaned_data["votes"]
+            # only write the ranks that this save actually changes
+            rank_changes = diff_ranks(
+                self.profile(), stored_ranks, votes, client_ip_address
             )
+            save_rank_changes(rank_changes)
 
-            # Find all ranks that are in the ranks_to_delete list in the database
-            # using the ORM.
-            models.Rank.objects.filter(
-                finalist__in=[rank.finalist for rank in ranks_to_delete],
-                membership=self.profile(),
-            ).delete()
+            changed_category_ids = rank_changes.category_ids
+            before = ballot_signatures_by_category(
+                (finalist, position)
+                for finalist, position in form.ranks.items()
+                if finalist.category_id in changed_category_ids
+            )
+            after = ballot_signatures_by_category(
+                (finalist, None if vote is None else int(vote))
+                for finalist, vote in votes.items()
+                if finalist.category_id in changed_category_ids
+            )
+            changes = [
+                (category_id, before.get(category_id, ""), signature)
+                for category_id, signature in after.items()
+            ]
+            record_ballot_changes(changes)
+            # only the categories where this ballot's order actually changed need counting again
+            invalidate_results(
+                category_id for category_id, old, new in changes if old != new
+            )
 
             messages.success(
                 request,
                 f"Your ballot has been cast as {self.profile().preferred_name} for {self.election()}",
             )
             if request.htmx:
-                return HttpResponse(
-                    render_block_to_string(
-                        self.template_name,
-                        "form",
-                        context=self.get_context_data(form=form),
-                        request=request,
-                    )
-                )
+                return self.render_form_fragment(form)
             else:
-                return redirect(
-                    "election:vote", election_id=self.kwargs.get("election_id")
-                )
+                return redirect(self.get_success_url())
         else:
             messages.warning(request, "Something wasn't quite right with your ballot")
             if request.htmx:
-                return HttpResponse(
-                    render_block_to_string(
-                        self.template_name,
-                        "form",
-                        context=self.get_context_data(form=form),
-                        request=request,
-                    )
-                )
+                return self.render_form_fragment(form)
             else:
                 return self.render_to_response(self.get_context_data(form=form))
 
+    def get_success_url(self) -> str:
+        return reverse(
+            "election:vote", kwargs={"election_id": self.kwargs.get("election_id")}
+        )
+
+    def render_form_fragment(self, form: RankForm) -> HttpResponse:
+        return HttpResponse(
+            render_block_to_string(
+                self.template_name,
+                "form",
+                context=self.get_context_data(form=form),
+                request=self.request,
+            )
+        )
+
+
+class VoteCategoryView(VoteView):
+    """Saves one category of the voting ballot, and re-renders only that category."""
+
+    http_method_names = ["post"]
+
+    def categories(self):
+        return [super().category()]
+
+    def category(self) -> models.Category:
+        return self.categories()[0]
+
+    def finalists(self) -> list[models.Finalist]:
+        return self.ballot_schema().finalists_in(self.category())
+
+    def get_success_url(self) -> str:
+        return f"{super().get_success_url()}#voting_category_{self.category().id}"
+
+    def render_form_fragment(self, form: RankForm) -> HttpResponse:
+        category = self.category()
+        fields = dict(form.fields_grouped_by_category).get(category, [])
+        return HttpResponse(
+            render_block_to_string(
+                "nominate/voting_ballot_form.html",
+                "category",
+                context={
+                    **self.ballot_context(),
+                    "form": form,
+                    "category": category,
+                    "fields": fields,
+                    "category_save_urls": self.category_save_urls(),
+                },
+                request=self.request,
+            )
+        )
+
 
 class EmailVotes(NominatorView):
     def get(self, request: HttpRequest, *args, **kwargs):
@@ -138,10 +197,10 @@ class EmailVotes(NominatorView):
             self.template_name = "nominate/email/votes_for_user.html"
             self.content_type = "text/html"
 
-        finalists = models.Finalist.objects.filter(category__election=self.election())
+        schema = self.ballot_schema()
         ranks = models.Rank.objects.filter(
-            finalist__in=finalists, membership=self.profile()
-        )
+            finalist__in=schema.finalists, membership=self.profile()
+        ).select_related("finalist")
 
         report_date = datetime.utcnow()
         site_url = Site.objects.get_current().domain
@@ -150,7 +209,7 @@ class EmailVotes(NominatorView):
         )
         ballot_url = f"https://{site_url}{ballot_path}"
 
-        form = RankForm(finalists=finalists, ranks=ranks)
+        form = RankForm(finalists=schema.finalists, ranks=ranks, schema=schema)
         # run "clean" to populate the form with the existing data and
         # group the finalists by category into display-oriented structures.
         # We're doing a bit of a hack here, because full_clean requires posted
@@ -208,7 +267,9 @@ class ElectionResultsPrettyView(ElectionView):
 
         context["category_results_slant_tables"] = {
             c: result_to_slant_table(res.rounds)
-            for c, res in get_results_for_election(awards, self.election()).items()
+            for c, res in get_results_for_election(
+                awards, self.election(), live=self.election().is_voting
+            ).items()
         }
 
         return context
@@ -2,7 +2,7 @@
 # implementations, but convention-specific implementations can override it by setting the
 # `NOMNOM_CONVENTION_*` settings via the environment.
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from dataclasses import dataclass, field
 from datetime import date, datetime
 from pathlib import Path
@@ -53,6 +53,8 @@ class SystemConfiguration:
         host_user = var(default=None)
         host_password = var(default=None)
         use_tls = bool_var(default=True)
+        # how many messages a task sends over its connection at a time
+        batch_size = var(50, converter=int)
 
     @config
     class SENTRY_SDK:
@@ -75,6 +77,15 @@ class SystemConfiguration:
     class LOGGING:
         oauth_debug = bool_var(False)
 
+    @config
+    class REPORTS:
+        # generate the report downloads in a Celery worker, rather than in the web request
+        background = bool_var(False)
+        # where those reports are kept: in this S3 bucket, through the packet's S3 client, or
+        # if there isn't one, in this directory
+        s3_bucket = var(default=None)
+        file_root = var(BASE_DIR / "reports")
+
     oauth = group(OAUTH)
 
     secret_key = var()
@@ -85,7 +96,11 @@ class SystemConfiguration:
 
     allow_username_login: bool = bool_var(False)
 
+    # how many processes to count Hugo categories in; 1 counts them in turn.
+    counting_workers: int = var(1, converter=int)
+
     logging = group(LOGGING)
+    reports = group(REPORTS)
 
 
 system_configuration = to_config(SystemConfiguration)
@@ -184,15 +199,34 @@ class ConventionConfiguration:
 
 
 class HugoCounter(Protocol):
+    """Count a category's ballots, one per member."""
+
+    def __call__(
+        self,
+        candidates: list[Candidate],
+        ballots: Sequence[Ballot],
+        runoff_candidate: Candidate | None = None,
+    ) -> ElectionResults: ...
+
+
+class WeightedHugoCounter(Protocol):
+    """Count a category's ballots, with identical ballots collapsed into one.
+
+    `ballot_weights` runs parallel to `ballots`, and each ballot counts as that many identical
+    ballots. Only counters that name the parameter are handed weighted ballots; any other
+    counter is given one ballot per member.
+    """
+
     def __call__(
         self,
         candidates: list[Candidate],
-        ballots: list[Ballot],
+        ballots: Sequence[Ballot],
         runoff_candidate: Candidate | None = None,
+        ballot_weights: Sequence[int] | None = None,
     ) -> ElectionResults: ...
 
 
 @dataclass
 class HugoAwards:
     results_class: type[ElectionResults]
-    counter: HugoCounter
+    counter: HugoCounter | WeightedHugoCounter
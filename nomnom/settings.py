@@ -128,6 +128,14 @@ NOMNOM_ALLOW_USERNAME_LOGIN_FOR_MEMBERS = cfg.allow_username_login
 # part of Six and Five
 NOMNOM_HUGO_NOMINATION_COUNT = 5
 
+# The number of processes used to count the categories of an election in parallel
+NOMNOM_COUNTING_WORKERS = cfg.counting_workers
+
+# Whether the report downloads are generated in the background, and where they're kept
+NOMNOM_REPORTS_IN_BACKGROUND = cfg.reports.background
+NOMNOM_REPORT_S3_BUCKET = cfg.reports.s3_bucket
+NOMNOM_REPORT_FILE_ROOT = cfg.reports.file_root
+
 AUTHENTICATION_BACKENDS = [
     # NOTE: the nominate.apps.AppConfig.ready() hook will install handlers in this, as the first
     # set. Any handler in here will be superseded by those.
@@ -341,6 +349,7 @@ EMAIL_PORT = cfg.email.port
 EMAIL_HOST_USER = cfg.email.host_user
 EMAIL_HOST_PASSWORD = cfg.email.host_password
 EMAIL_USE_TLS = cfg.email.use_tls
+NOMNOM_EMAIL_BATCH_SIZE = cfg.email.batch_size
 
 LOGGING = {
     "version": 1,
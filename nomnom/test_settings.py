@@ -9,3 +9,10 @@ NPLUSONE_RAISE = True
 CELERY_TASK_ALWAYS_EAGER = True
 # Optional: Propagate exceptions raised in tasks to the caller
 CELERY_TASK_EAGER_PROPAGATES = True
+
+# Tests don't have a Redis server to talk to
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+}
@@ -1,11 +1,11 @@
 import math
-from dataclasses import dataclass
+from collections import Counter
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, replace
 from itertools import groupby
-from operator import attrgetter
+from operator import itemgetter
 
-from markdown import markdown
 from nominate import models
-from nominate.templatetags.nomnom_filters import html_text
 from nomnom.convention import HugoAwards
 from pyrankvote import Ballot, Candidate
 from pyrankvote.helpers import (
@@ -14,44 +14,187 @@ from pyrankvote.helpers import (
     ElectionResults,
 )
 
+from wsfs.rules.instant_runoff import ArrayElectionManager, BallotArrays
+
+
+# How many rank rows to pull from the server-side cursor at a time when loading ballots.
+BALLOT_CHUNK_SIZE = 10_000
+
 
 @dataclass
 class ElectionBallots:
     candidates: list[Candidate]
-    ballots: list[Ballot]
+    ballots: Sequence[Ballot]
+    # how many members cast each ballot; one apiece if there are no weights
+    weights: list[int] | None = None
+
+    def one_per_member(self) -> Sequence[Ballot]:
+        """The ballots, with each weighted one repeated for every member who cast it."""
+        if isinstance(self.ballots, BallotArrays):
+            return self.ballots.expanded()
+
+        if self.weights is None:
+            return self.ballots
+
+        return [
+            ballot
+            for ballot, weight in zip(self.ballots, self.weights)
+            for _ in range(weight)
+        ]
 
 
 def ballots_from_category(
     category: models.Category, excluded_finalists: list[str] | None = None
 ) -> ElectionBallots:
-    exclude = excluded_finalists if excluded_finalists is not None else []
-    candidates_by_finalist = {
-        finalist: Candidate(html_text(markdown(str(finalist))))
-        for finalist in category.finalist_set.exclude(name__in=exclude)
-    }
-    ballots = []
-    # group our ranks by nominating member, and then make a ballot for each one.
+    candidates, candidate_index_by_finalist_id = category_candidates(
+        category, excluded_finalists
+    )
+
+    # The database does the ordering, and we stream plain tuples out of it; one ranking per
+    # member, in the order they ranked the finalists. Members who ranked the finalists
+    # identically share a single weighted ballot.
     category_ranks = (
-        models.Rank.objects.select_related(
-            "membership", "finalist", "finalist__category"
+        models.Rank.objects.filter(
+            finalist_id__in=candidate_index_by_finalist_id.keys(),
+            position__isnull=False,
+        )
+        .order_by("membership_id", "position")
+        .values_list("membership_id", "finalist_id")
+        .iterator(chunk_size=BALLOT_CHUNK_SIZE)
+    )
+    weights = Counter(
+        bytes(candidate_index_by_finalist_id[finalist_id] for _, finalist_id in ranks)
+        for _, ranks in groupby(category_ranks, key=itemgetter(0))
+    )
+    ballots = BallotArrays(
+        candidates=candidates,
+        rankings=list(weights.keys()),
+        weights=list(weights.values()),
+    )
+
+    return ElectionBallots(
+        candidates=candidates, ballots=ballots, weights=ballots.weights
+    )
+
+
+def ballots_from_tally(
+    category: models.Category, excluded_finalists: list[str] | None = None
+) -> ElectionBallots:
+    """The category's ballots, as the distinct rankings in its live tally and their weights."""
+    candidates, candidate_index_by_finalist_id = category_candidates(
+        category, excluded_finalists
+    )
+
+    rankings = []
+    weights = []
+    for signature, weight in models.BallotSignature.objects.filter(
+        category=category, weight__gt=0
+    ).values_list("signature", "weight"):
+        ranking = bytes(
+            candidate_index_by_finalist_id[finalist_id]
+            for finalist_id in map(int, signature.split(","))
+            if finalist_id in candidate_index_by_finalist_id
         )
-        .filter(finalist__category=category)
-        .exclude(finalist__name__in=exclude)
+        # as with the ranks, a ballot of only excluded finalists isn't a ballot at all
+        if ranking:
+            rankings.append(ranking)
+            weights.append(weight)
+
+    return ElectionBallots(
+        candidates=candidates,
+        ballots=BallotArrays(candidates=candidates, rankings=rankings, weights=weights),
+        weights=weights,
     )
-    for member, ranks in groupby(
-        sorted(category_ranks, key=lambda r: r.membership.id),
-        key=attrgetter("membership"),
-    ):
-        ranks = sorted(ranks, key=attrgetter("position"))
-        ballot = Ballot([candidates_by_finalist[rank.finalist] for rank in ranks])
-        ballots.append(ballot)
 
-    return ElectionBallots(candidates=candidates_by_finalist.values(), ballots=ballots)
+
+def category_candidates(
+    category: models.Category, excluded_finalists: list[str] | None = None
+) -> tuple[list[Candidate], dict[int, int]]:
+    exclude = excluded_finalists if excluded_finalists is not None else []
+    finalists = list(
+        category.finalist_set.exclude(name__in=exclude).values_list(
+            "id", "display_name"
+        )
+    )
+    candidates = [Candidate(display_name) for _, display_name in finalists]
+    return candidates, {finalist_id: i for i, (finalist_id, _) in enumerate(finalists)}
 
 
 def hugo_voting(
     candidates: list[Candidate],
-    ballots: list[Ballot],
+    ballots: Sequence[Ballot],
+    runoff_candidate: Candidate | None = None,
+    ballot_weights: Sequence[int] | None = None,
+) -> ElectionResults:
+    if not isinstance(ballots, BallotArrays):
+        ballot_arrays = BallotArrays.from_ballots(candidates, ballots, ballot_weights)
+    elif ballot_weights is not None:
+        ballot_arrays = replace(ballots, weights=list(ballot_weights))
+    else:
+        ballot_arrays = ballots
+
+    # identical ballots are counted once, with their weight
+    if ballot_arrays.weights is None:
+        ballot_arrays = ballot_arrays.deduplicated()
+
+    def runoff_manager(runoff_candidates: list[Candidate]) -> ArrayElectionManager:
+        return ArrayElectionManager(ballot_arrays.restricted_to(runoff_candidates))
+
+    return count_hugo_election(
+        ArrayElectionManager(
+            ballot_arrays,
+            compare_method_if_equal=CompareMethodIfEqual.MostSecondChoiceVotes,
+        ),
+        runoff_manager,
+        candidates,
+        runoff_candidate,
+    )
+
+
+def pyrankvote_hugo_voting(
+    candidates: list[Candidate],
+    ballots: Sequence[Ballot],
+    runoff_candidate: Candidate | None = None,
+    ballot_weights: Sequence[int] | None = None,
+) -> ElectionResults:
+    """The Hugo count, run on pyrankvote's own ElectionManager.
+
+    This is much slower than `hugo_voting`, and is kept as the reference implementation that
+    the array-backed counter is checked against. Weighted ballots are repeated for their
+    weight.
+    """
+    if ballot_weights is not None:
+        ballots = [
+            ballot
+            for ballot, weight in zip(ballots, ballot_weights)
+            for _ in range(weight)
+        ]
+
+    def runoff_manager(runoff_candidates: list[Candidate]) -> ElectionManager:
+        truncated_ballots = [
+            Ballot([b for b in ballot.ranked_candidates if b in runoff_candidates])
+            for ballot in ballots
+        ]
+        return ElectionManager(runoff_candidates, truncated_ballots)
+
+    return count_hugo_election(
+        ElectionManager(
+            candidates,
+            ballots,
+            number_of_votes_pr_voter=1,
+            compare_method_if_equal=CompareMethodIfEqual.MostSecondChoiceVotes,
+            pick_random_if_blank=False,
+        ),
+        runoff_manager,
+        candidates,
+        runoff_candidate,
+    )
+
+
+def count_hugo_election(
+    manager: ElectionManager | ArrayElectionManager,
+    runoff_manager: Callable[[list[Candidate]], ElectionManager | ArrayElectionManager],
+    candidates: list[Candidate],
     runoff_candidate: Candidate | None = None,
 ) -> ElectionResults:
     # Because we're working with floating point, we need to account for rounding errors.
@@ -62,13 +205,6 @@ def hugo_voting(
         if maybe_no_award:
             runoff_candidate = maybe_no_award[0]
 
-    manager = ElectionManager(
-        candidates,
-        ballots,
-        number_of_votes_pr_voter=1,
-        compare_method_if_equal=CompareMethodIfEqual.MostSecondChoiceVotes,
-        pick_random_if_blank=False,
-    )
     results = ElectionResults()
 
     winners_allowed = 1
@@ -166,28 +302,23 @@ def hugo_voting(
         runoff_candidates = winners[:]
         runoff_candidates.append(runoff_candidate)
 
-        truncated_ballots = [
-            Ballot([b for b in ballot.ranked_candidates if b in runoff_candidates])
-            for ballot in ballots
-        ]
-
-        runoff_manager = ElectionManager(runoff_candidates, truncated_ballots)
+        runoff = runoff_manager(runoff_candidates)
         # by definition, all of our winners must have the same number of votes, so this is a simple
         # check:
-        if runoff_manager.get_number_of_votes(
-            runoff_candidate
-        ) > runoff_manager.get_number_of_votes(winners[0]):
-            runoff_manager.elect_candidate(runoff_candidate)
+        if runoff.get_number_of_votes(runoff_candidate) > runoff.get_number_of_votes(
+            winners[0]
+        ):
+            runoff.elect_candidate(runoff_candidate)
             for w in winners:
-                if w in runoff_manager.get_candidates_in_race():
-                    runoff_manager.reject_candidate(w)
+                if w in runoff.get_candidates_in_race():
+                    runoff.reject_candidate(w)
         else:
             for w in winners:
-                runoff_manager.elect_candidate(w)
-            if runoff_candidate in runoff_manager.get_candidates_in_race():
-                runoff_manager.reject_candidate(runoff_candidate)
+                runoff.elect_candidate(w)
+            if runoff_candidate in runoff.get_candidates_in_race():
+                runoff.reject_candidate(runoff_candidate)
 
-        results.register_round_results(runoff_manager.get_results())
+        results.register_round_results(runoff.get_results())
 
     return results
 
@@ -0,0 +1,241 @@
+"""E Pluribus Hugo: Single Divisible Vote with Least Popular Elimination.
+
+This is the nomination count from section 3.A of the 2023 WSFS constitution. Each round:
+
+* Calculation: every nominating ballot has a single point, divided equally among the
+  nominees on it that are still in the count, and each nominee has the number of ballots
+  that nominate it.
+* Selection: the nominees with the two lowest point totals are selected; ties are not
+  broken, so every nominee tied for the lowest, or (if only one has the lowest) tied for the
+  second lowest, is selected.
+* Elimination: of the selected nominees, the one with the fewest nominations is eliminated,
+  with ties going to the lowest point total. Nominees tied on both are all eliminated.
+
+Rounds repeat until only the finalists remain. If an elimination would leave fewer than the
+number of finalists, every nominee tied in it becomes a finalist instead.
+
+The points are kept as integers, scaled so that every share of a ballot divides evenly;
+ties between point totals have to be exact, which floats can't promise. Ballots are encoded
+once as tuples of nominee indices, and identical ballots are collapsed into one with a
+weight. Eliminating a nominee only touches the ballots that nominate it, adjusting the share
+of every other nominee on them.
+"""
+
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from itertools import groupby
+from operator import itemgetter
+
+from nominate import models
+from nominate.canonicalize import CanonicalWorks, canonical_works, valid_nominations
+
+
+# How many finalists a category has (3.8.1)
+FINALIST_COUNT = 6
+
+# How many nomination rows to pull from the server-side cursor at a time when loading ballots.
+NOMINATION_CHUNK_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class Nominee:
+    # the canonical work's normalized key
+    key: str
+    # the work's most common spelling
+    name: str
+
+    def __str__(self):
+        return self.name
+
+
+@dataclass
+class NominationBallots:
+    nominees: list[Nominee]
+    # each ballot is the indices of the nominees on it, into `nominees`
+    ballots: list[tuple[int, ...]]
+    # how many members cast each ballot
+    weights: list[int]
+
+
+@dataclass
+class NomineeTally:
+    nominee: Nominee
+    points: float
+    nominations: int
+
+
+@dataclass
+class NominationRound:
+    # the number of nominees still in the count at the start of the round
+    remaining: int
+    selected: list[NomineeTally]
+    eliminated: list[Nominee]
+
+
+@dataclass
+class NominationResults:
+    rounds: list[NominationRound] = field(default_factory=list)
+    # the finalists, with their final tallies, most points first
+    finalists: list[NomineeTally] = field(default_factory=list)
+
+
+def nomination_ballots_from_category(
+    category: models.Category, works: CanonicalWorks | None = None
+) -> NominationBallots:
+    """Each member's valid nominations in the category, as one ballot apiece.
+
+    Nominations are counted as the canonical works they belong to; see
+    `nominate.canonicalize`. Nominations that an admin has marked invalid are left out, as
+    are blank ones, and a work on a ballot more than once only counts once.
+    """
+    if works is None:
+        works = canonical_works(category)
+
+    category_nominations = (
+        valid_nominations(category)
+        .exclude(normalized_key="")
+        .order_by("nominator_id")
+        .values_list("nominator_id", "normalized_key")
+        .iterator(chunk_size=NOMINATION_CHUNK_SIZE)
+    )
+
+    weights: dict[tuple[int, ...], int] = {}
+    for _, nominations in groupby(category_nominations, key=itemgetter(0)):
+        ballot = tuple(sorted({works.work_for_key[key] for _, key in nominations}))
+        weights[ballot] = weights.get(ballot, 0) + 1
+
+    return NominationBallots(
+        nominees=[Nominee(key=work.key, name=work.name) for work in works.works],
+        ballots=list(weights.keys()),
+        weights=list(weights.values()),
+    )
+
+
+def count_nominations(
+    category: models.Category, finalist_count: int = FINALIST_COUNT
+) -> NominationResults:
+    ballots = nomination_ballots_from_category(category)
+    return e_pluribus_hugo(
+        ballots.nominees, ballots.ballots, ballots.weights, finalist_count
+    )
+
+
+def e_pluribus_hugo(
+    nominees: Sequence[Nominee],
+    ballots: Sequence[tuple[int, ...]],
+    weights: Sequence[int] | None = None,
+    finalist_count: int = FINALIST_COUNT,
+) -> NominationResults:
+    if weights is None:
+        weights = [1] * len(ballots)
+
+    # A ballot with n nominees left gives each of them scale // n points, which is exact for
+    # every n up to the longest ballot.
+    scale = math.lcm(*range(1, max(map(len, ballots), default=1) + 1))
+
+    points = [0] * len(nominees)
+    nominations = [0] * len(nominees)
+    ballots_for_nominee: list[list[int]] = [[] for _ in nominees]
+    remaining_on_ballot = [len(ballot) for ballot in ballots]
+
+    for b, (ballot, weight) in enumerate(zip(ballots, weights)):
+        share = weight * (scale // len(ballot)) if ballot else 0
+        for n in ballot:
+            points[n] += share
+            nominations[n] += weight
+            ballots_for_nominee[n].append(b)
+
+    remaining = {n for n in range(len(nominees)) if nominations[n] > 0}
+    eliminated_nominees: set[int] = set()
+    results = NominationResults()
+
+    def tally(n: int) -> NomineeTally:
+        return NomineeTally(
+            nominee=nominees[n], points=points[n] / scale, nominations=nominations[n]
+        )
+
+    while len(remaining) > finalist_count:
+        selected = select(remaining, points)
+        eliminated = eliminate(selected, points, nominations)
+        # if too few would be left, everyone tied for elimination is a finalist instead
+        too_few_left = len(remaining) - len(eliminated) < finalist_count
+
+        results.rounds.append(
+            NominationRound(
+                remaining=len(remaining),
+                selected=[tally(n) for n in sorted(selected)],
+                eliminated=[]
+                if too_few_left
+                else [nominees[n] for n in sorted(eliminated)],
+            )
+        )
+
+        if too_few_left:
+            break
+
+        remaining -= eliminated
+        eliminated_nominees |= eliminated
+        redistribute(
+            eliminated,
+            eliminated_nominees,
+            ballots,
+            weights,
+            ballots_for_nominee,
+            remaining_on_ballot,
+            points,
+            scale,
+        )
+
+    results.finalists = [
+        tally(n)
+        for n in sorted(remaining, key=lambda n: (-points[n], -nominations[n], n))
+    ]
+    return results
+
+
+def select(remaining: set[int], points: list[int]) -> set[int]:
+    lowest = min(points[n] for n in remaining)
+    selected = {n for n in remaining if points[n] == lowest}
+    if len(selected) == 1 and len(remaining) > 1:
+        second_lowest = min(points[n] for n in remaining - selected)
+        selected |= {n for n in remaining if points[n] == second_lowest}
+    return selected
+
+
+def eliminate(
+    selected: set[int], points: list[int], nominations: list[int]
+) -> set[int]:
+    fewest = min((nominations[n], points[n]) for n in selected)
+    return {n for n in selected if (nominations[n], points[n]) == fewest}
+
+
+def redistribute(
+    eliminated: set[int],
+    eliminated_nominees: set[int],
+    ballots: Sequence[tuple[int, ...]],
+    weights: Sequence[int],
+    ballots_for_nominee: list[list[int]],
+    remaining_on_ballot: list[int],
+    points: list[int],
+    scale: int,
+) -> None:
+    """Take the eliminated nominees off their ballots, and share those ballots' points among
+    the nominees left on them."""
+    affected: dict[int, int] = {}
+    for n in eliminated:
+        points[n] = 0
+        for b in ballots_for_nominee[n]:
+            affected[b] = affected.get(b, 0) + 1
+
+    for b, struck in affected.items():
+        before = remaining_on_ballot[b]
+        after = before - struck
+        remaining_on_ballot[b] = after
+        if after == 0:
+            continue
+
+        gain = weights[b] * (scale // after - scale // before)
+        for n in ballots[b]:
+            if n not in eliminated_nominees:
+                points[n] += gain
@@ -0,0 +1,378 @@
+"""An array-backed instant runoff tally.
+
+pyrankvote's `ElectionManager` keeps every ballot as a tuple of `Candidate` objects, and each
+transfer or tie-break walks those tuples, hashing candidate names as it goes. That's fine for a
+handful of ballots, but a Hugo category has tens of thousands of them.
+
+Here, the ballots are encoded once as compact arrays of candidate indices, and each
+ballot carries a cursor to the candidate currently holding its vote. Eliminating a candidate
+only touches the ballots in that candidate's pile, and only moves their cursors forward.
+
+`ArrayElectionManager` implements the part of the `ElectionManager` API that the Hugo counter
+uses, with the same ordering and tie-breaking rules, so that the two produce identical
+`ElectionResults`.
+"""
+
+import functools
+import random
+from array import array
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import overload
+
+from pyrankvote import Ballot, Candidate
+from pyrankvote.helpers import (
+    CandidateResult,
+    CandidateStatus,
+    CompareMethodIfEqual,
+    NoCandidatesLeftInRaceError,
+    RoundResult,
+    almost_equal,
+)
+
+
+MAX_CANDIDATES = 256
+
+
+@dataclass
+class BallotArrays(Sequence[Ballot]):
+    """A set of ranked ballots, encoded as integer arrays.
+
+    Each ballot's ranking is a `bytes` string of indices into `candidates`, most preferred
+    first. That caps an election at 256 candidates, which is plenty for a Hugo category, and
+    lets striking candidates off every ballot run as a single `bytes.translate` per ballot.
+
+    Identical rankings can be collapsed into one, with a weight for the number of ballots
+    that share it; `weights`, if given, runs parallel to `rankings`.
+
+    As a sequence, this yields a pyrankvote `Ballot` for each ranking, built on demand, so it
+    can stand in anywhere a list of ballots is expected.
+    """
+
+    candidates: list[Candidate]
+    rankings: list[bytes]
+    weights: list[int] | None = None
+
+    def __post_init__(self):
+        if len(self.candidates) > MAX_CANDIDATES:
+            raise ValueError(
+                f"Ballot arrays are limited to {MAX_CANDIDATES} candidates; got {len(self.candidates)}"
+            )
+
+        if self.weights is not None and len(self.weights) != len(self.rankings):
+            raise ValueError("Ballot weights must match the rankings one for one")
+
+    @classmethod
+    def from_ballots(
+        cls,
+        candidates: Iterable[Candidate],
+        ballots: Iterable[Ballot],
+        weights: Iterable[int] | None = None,
+    ) -> "BallotArrays":
+        candidates = list(candidates)
+        # Candidate hashes its name in Python on every lookup; keying on the name is the same
+        # thing, and much faster.
+        candidate_index = {
+            candidate.name: i for candidate, i in candidate_indices(candidates).items()
+        }
+        rankings = [
+            bytes(
+                [
+                    candidate_index[candidate.name]
+                    for candidate in ballot.ranked_candidates
+                ]
+            )
+            for ballot in ballots
+        ]
+
+        return cls(
+            candidates=candidates,
+            rankings=rankings,
+            weights=list(weights) if weights is not None else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self.rankings)
+
+    @overload
+    def __getitem__(self, index: int) -> Ballot: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Ballot]: ...
+
+    def __getitem__(self, index: int | slice) -> Ballot | list[Ballot]:
+        if isinstance(index, slice):
+            return [self._ballot(ranking) for ranking in self.rankings[index]]
+        return self._ballot(self.rankings[index])
+
+    def ranking_weights(self) -> list[int]:
+        """The number of ballots each ranking stands for."""
+        if self.weights is None:
+            return [1] * len(self.rankings)
+        return self.weights
+
+    def expanded(self) -> "BallotArrays":
+        """These ballots, with each weighted ranking repeated once for every ballot it stands
+        for."""
+        return BallotArrays(
+            candidates=self.candidates,
+            rankings=[
+                ranking
+                for ranking, weight in zip(self.rankings, self.ranking_weights())
+                for _ in range(weight)
+            ],
+        )
+
+    def _ballot(self, ranking: bytes) -> Ballot:
+        return Ballot([self.candidates[i] for i in ranking])
+
+    def deduplicated(self) -> "BallotArrays":
+        """These ballots, with identical rankings collapsed into one weighted ranking."""
+        weights: dict[bytes, int] = {}
+        for ranking, weight in zip(self.rankings, self.ranking_weights()):
+            weights[ranking] = weights.get(ranking, 0) + weight
+
+        return BallotArrays(
+            candidates=self.candidates,
+            rankings=list(weights.keys()),
+            weights=list(weights.values()),
+        )
+
+    def restricted_to(self, candidates: Sequence[Candidate]) -> "BallotArrays":
+        """These ballots, with every candidate not in `candidates` struck off."""
+        candidates = list(candidates)
+        new_index = candidate_indices(candidates)
+        remap = [new_index.get(candidate, -1) for candidate in self.candidates]
+
+        table = bytes(max(i, 0) for i in remap) + bytes(MAX_CANDIDATES - len(remap))
+        struck = bytes(old for old, new in enumerate(remap) if new < 0)
+
+        return BallotArrays(
+            candidates=candidates,
+            rankings=[ranking.translate(table, struck) for ranking in self.rankings],
+            weights=self.weights,
+        )
+
+
+def candidate_indices(candidates: Iterable[Candidate]) -> dict[Candidate, int]:
+    # Candidates compare by name; as with pyrankvote, the first of a repeated name wins.
+    indices: dict[Candidate, int] = {}
+    for i, candidate in enumerate(candidates):
+        indices.setdefault(candidate, i)
+    return indices
+
+
+class ArrayElectionManager:
+    """Tally state for an instant runoff election over `BallotArrays`.
+
+    This mirrors pyrankvote's `ElectionManager` with one vote per voter and no random
+    assignment of blank ballots, which is how the Hugo counter configures it. Votes are only
+    ever transferred in whole, so the counts are kept as integers and reported as floats.
+    A weighted ranking counts exactly as that many copies of it would.
+    """
+
+    def __init__(
+        self,
+        ballots: BallotArrays,
+        compare_method_if_equal: str = CompareMethodIfEqual.MostSecondChoiceVotes,
+    ):
+        self._ballots = ballots
+        self._compare_method_if_equal = compare_method_if_equal
+        self._number_of_candidates = len(ballots.candidates)
+        self._weights = ballots.ranking_weights()
+        self._number_of_ballots = sum(self._weights)
+
+        self._index = candidate_indices(ballots.candidates)
+        # Repeated candidates collapse to their first entry, as they do in pyrankvote's dict.
+        unique = sorted(self._index.values())
+
+        self._status = [CandidateStatus.Hopeful] * self._number_of_candidates
+        self._votes = [0] * self._number_of_candidates
+        self._piles: list[list[int]] = [[] for _ in ballots.candidates]
+        self._candidates_in_race: list[int] = unique
+        self._elected_candidates: list[int] = []
+        self._rejected_candidates: list[int] = []
+
+        self._number_of_exhausted_ballots = 0
+        self._number_of_blank_votes = 0
+
+        # each ballot's cursor points at the preference currently holding its vote
+        self._cursor = array("B", bytes(len(ballots.rankings)))
+        for i, (ranking, weight) in enumerate(zip(ballots.rankings, self._weights)):
+            if not ranking:
+                self._number_of_exhausted_ballots += weight
+                self._number_of_blank_votes += weight
+                continue
+
+            first_choice = ranking[0]
+            self._votes[first_choice] += weight
+            self._piles[first_choice].append(i)
+
+        self._sort_candidates_in_race()
+
+    def _candidate(self, candidate: Candidate) -> int:
+        try:
+            return self._index[candidate]
+        except KeyError:
+            raise RuntimeError("Candidate not found in electionManager")
+
+    # METHODS WITH SIDE-EFFECTS
+
+    def elect_candidate(self, candidate: Candidate) -> None:
+        i = self._candidate(candidate)
+        self._status[i] = CandidateStatus.Elected
+        self._elected_candidates.append(i)
+        self._candidates_in_race.remove(i)
+
+    def reject_candidate(self, candidate: Candidate) -> None:
+        i = self._candidate(candidate)
+        self._status[i] = CandidateStatus.Rejected
+        self._rejected_candidates.append(i)
+        self._candidates_in_race.remove(i)
+
+    def transfer_votes(
+        self, candidate: Candidate, number_of_trans_votes: float
+    ) -> None:
+        """Move every ballot held by `candidate` to its next hopeful preference.
+
+        Unlike pyrankvote, partial transfers aren't supported; the Hugo count only ever
+        transfers all of an eliminated finalist's votes.
+        """
+        i = self._candidate(candidate)
+        if round(number_of_trans_votes, 4) == 0.000:
+            return
+
+        if self._status[i] == CandidateStatus.Hopeful:
+            raise RuntimeError(
+                "ElectionManager can not transfer votes from a candidate "
+                "that is still in the race (candidateStatus == Hopeful)"
+            )
+
+        rankings = self._ballots.rankings
+        weights = self._weights
+        cursor = self._cursor
+        status = self._status
+        votes = self._votes
+        piles = self._piles
+        hopeful = CandidateStatus.Hopeful
+
+        for ballot in piles[i]:
+            # every preference before the cursor is already out of the race.
+            ranking = rankings[ballot]
+            position = cursor[ballot] + 1
+            end = len(ranking)
+            while position < end and status[ranking[position]] != hopeful:
+                position += 1
+
+            if position < end:
+                cursor[ballot] = position
+                next_choice = ranking[position]
+                votes[next_choice] += weights[ballot]
+                piles[next_choice].append(ballot)
+            else:
+                self._number_of_exhausted_ballots += weights[ballot]
+                self._number_of_blank_votes += weights[ballot]
+
+        votes[i] = 0
+        piles[i] = []
+
+        self._sort_candidates_in_race()
+
+    # METHODS WITHOUT SIDE-EFFECTS
+
+    def get_number_of_non_exhausted_ballots(self) -> int:
+        return self._number_of_ballots - self._number_of_exhausted_ballots
+
+    def get_number_of_candidates_in_race(self) -> int:
+        return len(self._candidates_in_race)
+
+    def get_number_of_elected_candidates(self) -> int:
+        return len(self._elected_candidates)
+
+    def get_number_of_votes(self, candidate: Candidate) -> float:
+        return float(self._votes[self._candidate(candidate)])
+
+    def get_candidates_in_race(self) -> list[Candidate]:
+        return [self._ballots.candidates[i] for i in self._candidates_in_race]
+
+    def get_candidate_with_least_votes_in_race(self) -> Candidate:
+        if not self._candidates_in_race:
+            raise NoCandidatesLeftInRaceError("No candidates left in race")
+
+        return self._ballots.candidates[self._candidates_in_race[-1]]
+
+    def get_results(self) -> RoundResult:
+        candidates = self._ballots.candidates
+        ordered = (
+            self._elected_candidates
+            + self._candidates_in_race
+            + self._rejected_candidates[::-1]
+        )
+        return RoundResult(
+            [
+                CandidateResult(candidates[i], float(self._votes[i]), self._status[i])
+                for i in ordered
+            ],
+            float(self._number_of_blank_votes),
+        )
+
+    # INTERNAL METHODS
+
+    def _sort_candidates_in_race(self) -> None:
+        # nth-choice tallies are only valid while the statuses are fixed, which they are
+        # for the duration of a sort.
+        self._nth_choice_cache: dict[int, list[int]] = {}
+        self._candidates_in_race = sorted(
+            self._candidates_in_race,
+            key=functools.cmp_to_key(self._cmp_candidate_vote_counts),
+        )
+
+    def _cmp_candidate_vote_counts(self, candidate1: int, candidate2: int) -> int:
+        c1_votes = self._votes[candidate1]
+        c2_votes = self._votes[candidate2]
+
+        if not almost_equal(c1_votes, c2_votes):
+            return -1 if c1_votes > c2_votes else 1
+
+        if self._compare_method_if_equal == CompareMethodIfEqual.MostSecondChoiceVotes:
+            if self._candidate1_has_most_second_choices(candidate1, candidate2, x=1):
+                return -1
+            return 1
+
+        if self._compare_method_if_equal == CompareMethodIfEqual.Random:
+            return random.choice([1, -1])
+
+        raise SystemError("Compare method unknown/not implemented.")
+
+    def _candidate1_has_most_second_choices(
+        self, candidate1: int, candidate2: int, x: int
+    ) -> bool:
+        while x < self._number_of_candidates:
+            tally = self._nth_choice_tally(x)
+            if tally[candidate1] != tally[candidate2]:
+                return tally[candidate1] > tally[candidate2]
+            x += 1
+
+        return random.choice([True, False])
+
+    def _nth_choice_tally(self, x: int) -> list[int]:
+        """How many ballots have each candidate as their x-th (0-based) hopeful preference."""
+        if (tally := self._nth_choice_cache.get(x)) is not None:
+            return tally
+
+        tally = [0] * self._number_of_candidates
+        cursor = self._cursor
+        weights = self._weights
+        status = self._status
+        hopeful = CandidateStatus.Hopeful
+        for ballot, ranking in enumerate(self._ballots.rankings):
+            remaining = x
+            for choice in ranking[cursor[ballot] :]:
+                if status[choice] == hopeful:
+                    if remaining == 0:
+                        tally[choice] += weights[ballot]
+                        break
+                    remaining -= 1
+
+        self._nth_choice_cache[x] = tally
+        return tally
@@ -0,0 +1,165 @@
+import pytest
+from nominate import factories, models
+from nominate.hugo_awards import rebuild_ballot_tally
+from pyrankvote import Candidate
+
+from wsfs.rules.constitution_2023 import (
+    ballots_from_category,
+    ballots_from_tally,
+    hugo_voting,
+    pyrankvote_hugo_voting,
+)
+
+from .test_instant_runoff import round_summaries
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(name="category")
+def make_category():
+    return factories.CategoryFactory.create()
+
+
+@pytest.fixture(name="finalists")
+def make_finalists(category):
+    return [
+        factories.FinalistFactory.create(
+            category=category, name=name, ballot_position=i
+        )
+        for i, name in enumerate(["No Award", "*Emphasis*", "Plain"])
+    ]
+
+
+def rank(member, *finalists):
+    # created out of order, to make sure the loader does the ordering.
+    for position, finalist in reversed(list(enumerate(finalists, start=1))):
+        factories.RankFactory.create(
+            membership=member, finalist=finalist, position=position
+        )
+
+
+def ballot_names(election_ballots) -> list[list[str]]:
+    return [
+        [c.name for c in ballot.ranked_candidates]
+        for ballot in election_ballots.ballots
+    ]
+
+
+def test_candidates_are_in_ballot_order_with_plain_text_names(category, finalists):
+    election_ballots = ballots_from_category(category)
+
+    assert [c.name for c in election_ballots.candidates] == [
+        "No Award",
+        "Emphasis",
+        "Plain",
+    ]
+
+
+def test_one_ballot_per_member_in_rank_order(category, finalists):
+    no_award, emphasis, plain = finalists
+    members = factories.NominatingMemberProfileFactory.create_batch(3)
+    rank(members[0], plain, no_award)
+    rank(members[1], emphasis)
+    rank(members[2], no_award, emphasis, plain)
+
+    assert ballot_names(ballots_from_category(category)) == [
+        ["Plain", "No Award"],
+        ["Emphasis"],
+        ["No Award", "Emphasis", "Plain"],
+    ]
+
+
+def test_other_categories_are_ignored(category, finalists):
+    member = factories.NominatingMemberProfileFactory.create()
+    rank(member, factories.FinalistFactory.create())
+
+    assert ballot_names(ballots_from_category(category)) == []
+
+
+def test_excluded_finalists_are_struck_from_ballots(category, finalists):
+    no_award, emphasis, plain = finalists
+    members = factories.NominatingMemberProfileFactory.create_batch(2)
+    rank(members[0], plain, emphasis, no_award)
+    rank(members[1], plain)
+
+    election_ballots = ballots_from_category(category, excluded_finalists=["Plain"])
+
+    assert [c.name for c in election_ballots.candidates] == ["No Award", "Emphasis"]
+    assert ballot_names(election_ballots) == [["Emphasis", "No Award"]]
+
+
+def test_loading_is_a_fixed_number_of_queries(
+    category, finalists, django_assert_num_queries
+):
+    for member in factories.NominatingMemberProfileFactory.create_batch(20):
+        rank(member, *finalists)
+
+    # one for the finalists, and one for all of the ranks
+    with django_assert_num_queries(2):
+        ballots_from_category(category)
+
+
+def test_counting_loaded_ballots_matches_pyrankvote(category, finalists):
+    no_award, emphasis, plain = finalists
+    for member in factories.NominatingMemberProfileFactory.create_batch(4):
+        rank(member, plain, emphasis)
+    for member in factories.NominatingMemberProfileFactory.create_batch(3):
+        rank(member, emphasis, no_award)
+    for member in factories.NominatingMemberProfileFactory.create_batch(2):
+        rank(member, no_award)
+
+    election_ballots = ballots_from_category(category)
+    candidates = election_ballots.candidates
+
+    results = hugo_voting(
+        candidates, election_ballots.ballots, ballot_weights=election_ballots.weights
+    )
+    expected = pyrankvote_hugo_voting(
+        candidates,
+        list(election_ballots.ballots),
+        ballot_weights=election_ballots.weights,
+    )
+
+    assert round_summaries(results) == round_summaries(expected)
+    # Plain wins the count, but five ballots prefer No Award to it in the runoff.
+    assert results.get_winners() == [Candidate("No Award")]
+
+
+def test_ranks_without_a_position_are_not_preferences(category, finalists):
+    no_award, emphasis, plain = finalists
+    member = factories.NominatingMemberProfileFactory.create()
+    rank(member, plain)
+    models.Rank.objects.create(membership=member, finalist=emphasis, position=None)
+
+    assert ballot_names(ballots_from_category(category)) == [["Plain"]]
+
+
+def test_tally_ballots_are_distinct_rankings_with_weights(category, finalists):
+    no_award, emphasis, plain = finalists
+    for member in factories.NominatingMemberProfileFactory.create_batch(3):
+        rank(member, plain, no_award)
+    rank(factories.NominatingMemberProfileFactory.create(), emphasis)
+    rebuild_ballot_tally([category.id])
+
+    election_ballots = ballots_from_tally(category)
+    arrays = election_ballots.ballots
+
+    assert sorted(
+        ([arrays.candidates[i].name for i in ranking], weight)
+        for ranking, weight in zip(arrays.rankings, arrays.weights)
+    ) == [(["Emphasis"], 1), (["Plain", "No Award"], 3)]
+    assert sorted(ballot_names(election_ballots)) == sorted(
+        ballot_names(ballots_from_category(category))
+    )
+
+
+def test_tally_ballots_of_only_excluded_finalists_are_dropped(category, finalists):
+    no_award, emphasis, plain = finalists
+    members = factories.NominatingMemberProfileFactory.create_batch(2)
+    rank(members[0], plain)
+    rank(members[1], emphasis, plain)
+    rebuild_ballot_tally([category.id])
+
+    election_ballots = ballots_from_tally(category, excluded_finalists=["Plain"])
+
+    assert ballot_names(election_ballots) == [["Emphasis"]]
@@ -0,0 +1,199 @@
+import random
+from fractions import Fraction
+
+import pytest
+from nominate import factories, models
+
+from wsfs.rules.e_pluribus_hugo import (
+    Nominee,
+    count_nominations,
+    e_pluribus_hugo,
+    nomination_ballots_from_category,
+)
+
+
+def make_nominees(*names: str) -> list[Nominee]:
+    return [Nominee(key=name.casefold(), name=name) for name in names]
+
+
+def finalist_names(results) -> list[str]:
+    return [tally.nominee.name for tally in results.finalists]
+
+
+def reference_eph(
+    nominee_count: int, ballots: list[tuple[int, ...]], finalist_count: int
+) -> tuple[set[int], list[set[int]]]:
+    """The count straight from the constitution, recalculating every round with fractions."""
+    remaining = {n for ballot in ballots for n in ballot}
+    eliminations = []
+
+    while len(remaining) > finalist_count:
+        points = {n: Fraction(0) for n in remaining}
+        nominations = {n: 0 for n in remaining}
+        for ballot in ballots:
+            left = [n for n in ballot if n in remaining]
+            for n in left:
+                points[n] += Fraction(1, len(left))
+                nominations[n] += 1
+
+        totals = sorted(set(points.values()))
+        selected = {n for n in remaining if points[n] == totals[0]}
+        if len(selected) == 1:
+            selected |= {n for n in remaining if points[n] == totals[1]}
+
+        fewest = min((nominations[n], points[n]) for n in selected)
+        eliminated = {n for n in selected if (nominations[n], points[n]) == fewest}
+        if len(remaining) - len(eliminated) < finalist_count:
+            break
+
+        remaining -= eliminated
+        eliminations.append(eliminated)
+
+    return remaining, eliminations
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_matches_the_reference_count(seed):
+    rng = random.Random(seed)
+    nominee_count = rng.randint(1, 30)
+    popularity = [rng.random() ** 3 for _ in range(nominee_count)]
+    ballots = [
+        tuple(
+            sorted(
+                set(
+                    rng.choices(
+                        range(nominee_count), weights=popularity, k=rng.randint(1, 5)
+                    )
+                )
+            )
+        )
+        for _ in range(rng.choice([1, 5, 20, 100, 300]))
+    ]
+    finalist_count = rng.choice([1, 5, 6])
+
+    results = e_pluribus_hugo(
+        make_nominees(*(str(n) for n in range(nominee_count))),
+        ballots,
+        finalist_count=finalist_count,
+    )
+    finalists, eliminations = reference_eph(nominee_count, ballots, finalist_count)
+
+    assert {int(name) for name in finalist_names(results)} == finalists
+    assert [
+        {int(nominee.name) for nominee in r.eliminated}
+        for r in results.rounds
+        if r.eliminated
+    ] == eliminations
+
+
+def test_weighted_ballots_count_as_their_copies():
+    nominees = make_nominees(*"ABCDEFGH")
+    ballots = [(0, 1), (2,), (3, 4, 5), (6, 7), (0, 7)]
+    weights = [3, 2, 1, 1, 2]
+
+    copies = [ballot for ballot, weight in zip(ballots, weights) for _ in range(weight)]
+
+    assert finalist_names(e_pluribus_hugo(nominees, ballots, weights)) == (
+        finalist_names(e_pluribus_hugo(nominees, copies))
+    )
+
+
+def test_the_fewest_nominations_are_eliminated_not_the_fewest_points():
+    a, b, c = make_nominees("A", "B", "C")
+    # A has the fewest points, but more nominations than B
+    ballots = [(0, 2)] * 4 + [(1,)] * 3 + [(2,)] * 5
+
+    results = e_pluribus_hugo([a, b, c], ballots, finalist_count=2)
+
+    assert [tally.nominee for tally in results.rounds[0].selected] == [a, b]
+    assert results.rounds[0].eliminated == [b]
+    assert finalist_names(results) == ["C", "A"]
+
+
+def test_ties_in_points_are_exact():
+    nominees = make_nominees(*"ABCDEFGH")
+    # B and C both have 1/2 + 1/5 + 1/5 points, added up in a different order
+    ballots = [
+        (1, 7),
+        (2, 3, 4, 5, 6),
+        (1, 2, 3, 4, 5),
+        (1, 3, 4, 5, 6),
+        (2, 7),
+        (0,),
+        (0,),
+        # and everyone else has at least a point
+        (3,),
+        (4,),
+        (5,),
+        (6,),
+        (7,),
+    ]
+
+    results = e_pluribus_hugo(nominees, ballots, finalist_count=1)
+
+    b, c = results.rounds[0].selected
+    assert (b.nominee.name, c.nominee.name) == ("B", "C")
+    assert b.points == c.points == 0.9
+
+
+def test_nominees_tied_for_elimination_all_become_finalists_if_too_few_would_be_left():
+    nominees = make_nominees(*"ABCD")
+    ballots = [(0,)] * 3 + [(1,), (2,), (3,)]
+
+    results = e_pluribus_hugo(nominees, ballots, finalist_count=2)
+
+    assert results.rounds[-1].eliminated == []
+    assert finalist_names(results) == ["A", "B", "C", "D"]
+
+
+def test_no_ballots_have_no_finalists():
+    assert e_pluribus_hugo([], []).finalists == []
+
+
+@pytest.mark.django_db
+def test_ballots_from_category_skip_invalid_nominations_and_merge_spellings():
+    category = factories.CategoryFactory.create(fields=2)
+    first, second, third = factories.NominatingMemberProfileFactory.create_batch(3)
+
+    def nominate(member, *fields):
+        return factories.NominationFactory.create(
+            category=category,
+            nominator=member,
+            field_1=fields[0],
+            field_2=fields[1],
+        )
+
+    nominate(first, "The Book", "An Author")
+    nominate(first, "the  book ", "an author")
+    nominate(first, "", "")
+    nominate(second, "The Book", "An Author")
+    invalid = nominate(second, "Another Book", "Someone")
+    models.NominationAdminData.objects.create(
+        nomination=invalid, valid_nomination=False
+    )
+    nominate(third, "Another Book", "Someone Else")
+
+    ballots = nomination_ballots_from_category(category)
+
+    assert [n.name for n in ballots.nominees] == [
+        "The Book, An Author",
+        "Another Book, Someone Else",
+    ]
+    assert list(zip(ballots.ballots, ballots.weights)) == [((0,), 2), ((1,), 1)]
+
+
+@pytest.mark.django_db
+def test_count_nominations_for_a_category():
+    category = factories.CategoryFactory.create(fields=1)
+    for i, member in enumerate(
+        factories.NominatingMemberProfileFactory.create_batch(8)
+    ):
+        for work in ["Popular", f"Obscure {i}"]:
+            factories.NominationFactory.create(
+                category=category, nominator=member, field_1=work
+            )
+
+    results = count_nominations(category, finalist_count=1)
+
+    assert finalist_names(results) == ["Popular"]
+    assert results.finalists[0].nominations == 8
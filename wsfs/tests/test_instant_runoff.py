@@ -0,0 +1,176 @@
+import random
+from collections import Counter
+
+import pytest
+from pyrankvote import Ballot, Candidate
+from pyrankvote.helpers import ElectionResults
+
+from wsfs.rules.constitution_2023 import hugo_voting, pyrankvote_hugo_voting
+from wsfs.rules.instant_runoff import BallotArrays
+
+from .test_constitution_2023 import ELECTION_DATA
+
+
+def round_summaries(results: ElectionResults) -> list:
+    return [
+        (
+            [
+                (r.candidate.name, r.number_of_votes, r.status)
+                for r in round_.candidate_results
+            ],
+            round_.number_of_blank_votes,
+        )
+        for round_ in results.rounds
+    ]
+
+
+def assert_same_results(candidates, ballots, seed: int = 0, **kwargs):
+    # both counters fall back to random choices for ties they can't otherwise break, so
+    # they must see the same random state.
+    random.seed(seed)
+    expected = pyrankvote_hugo_voting(candidates, ballots, **kwargs)
+    random.seed(seed)
+    actual = hugo_voting(candidates, ballots, **kwargs)
+
+    assert round_summaries(actual) == round_summaries(expected)
+    assert actual.get_winners() == expected.get_winners()
+
+
+def random_election(
+    rng: random.Random, candidate_count: int, ballot_count: int, no_award: bool
+) -> tuple[list[Candidate], list[Ballot]]:
+    names = [f"Finalist {i}" for i in range(candidate_count)]
+    if no_award:
+        names[rng.randrange(candidate_count)] = "No Award"
+    candidates = [Candidate(name) for name in names]
+
+    # skew the first preferences, so that some finalists are much more popular than others
+    popularity = [rng.random() ** 2 for _ in candidates]
+    ballots = []
+    for _ in range(ballot_count):
+        ranked = rng.sample(candidates, k=candidate_count)
+        ranked.sort(key=lambda c: -popularity[candidates.index(c)] * rng.random())
+        ballots.append(Ballot(ranked[: rng.randint(0, candidate_count)]))
+
+    return candidates, ballots
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_pyrankvote_on_random_elections(seed):
+    rng = random.Random(seed)
+    candidates, ballots = random_election(
+        rng,
+        candidate_count=rng.randint(1, 8),
+        ballot_count=rng.choice([0, 1, 2, 3, 5, 10, 25, 100, 400]),
+        no_award=rng.random() < 0.7,
+    )
+
+    assert_same_results(candidates, ballots, seed=seed)
+
+
+def test_matches_pyrankvote_on_sample_election():
+    candidates = [Candidate(c) for c in ELECTION_DATA["candidates"]]
+    ballots = [
+        Ballot([Candidate(c) for c in ballot]) for ballot in ELECTION_DATA["ballots"]
+    ]
+
+    assert_same_results(candidates, ballots)
+
+
+def test_matches_pyrankvote_with_explicit_runoff_candidate():
+    candidates = [Candidate(c) for c in ELECTION_DATA["candidates"]]
+    ballots = [
+        Ballot([Candidate(c) for c in ballot]) for ballot in ELECTION_DATA["ballots"]
+    ]
+
+    assert_same_results(
+        candidates, ballots, runoff_candidate=Candidate("Jean-Luc Picard")
+    )
+
+
+def test_matches_pyrankvote_when_no_award_wins():
+    candidates = [Candidate("No Award"), Candidate("A"), Candidate("B")]
+    no_award, a, b = candidates
+    ballots = [Ballot([no_award, a, b])] * 5 + [Ballot([a])] * 2 + [Ballot([b, a])]
+
+    assert_same_results(candidates, ballots)
+    assert hugo_voting(candidates, ballots).get_winners() == [no_award]
+
+
+def test_matches_pyrankvote_when_first_place_is_tied():
+    candidates = [Candidate("No Award"), Candidate("A"), Candidate("B")]
+    no_award, a, b = candidates
+    ballots = [Ballot([a, b])] * 3 + [Ballot([b, a])] * 3
+
+    assert_same_results(candidates, ballots)
+
+
+def test_ballot_arrays_restriction_strikes_other_candidates():
+    a, b, c = Candidate("A"), Candidate("B"), Candidate("C")
+    arrays = BallotArrays.from_ballots([a, b, c], [Ballot([c, b, a]), Ballot([b])])
+
+    restricted = arrays.restricted_to([a, c])
+
+    assert restricted.candidates == [a, c]
+    assert restricted.rankings == [bytes([1, 0]), b""]
+
+
+def test_ballot_arrays_are_limited_in_size():
+    with pytest.raises(ValueError):
+        BallotArrays(candidates=[Candidate(str(i)) for i in range(257)], rankings=[])
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_weighted_rankings_count_as_their_copies(seed):
+    rng = random.Random(seed)
+    candidates, ballots = random_election(
+        rng, candidate_count=rng.randint(1, 6), ballot_count=200, no_award=True
+    )
+    arrays = BallotArrays.from_ballots(candidates, ballots)
+    weights = Counter(arrays.rankings)
+    weighted = BallotArrays(
+        candidates=candidates,
+        rankings=list(weights.keys()),
+        weights=list(weights.values()),
+    )
+
+    random.seed(seed)
+    expected = pyrankvote_hugo_voting(candidates, ballots)
+    random.seed(seed)
+    actual = hugo_voting(candidates, weighted)
+
+    assert round_summaries(actual) == round_summaries(expected)
+
+
+def test_ballot_arrays_deduplicate_identical_rankings():
+    a, b = Candidate("A"), Candidate("B")
+    arrays = BallotArrays.from_ballots(
+        [a, b], [Ballot([a, b]), Ballot([b]), Ballot([a, b])]
+    )
+
+    deduplicated = arrays.deduplicated()
+
+    assert [ballot.ranked_candidates for ballot in deduplicated] == [(a, b), (b,)]
+    assert deduplicated.weights == [2, 1]
+    assert deduplicated.restricted_to([b]).weights == [2, 1]
+    assert deduplicated.deduplicated().restricted_to([b]).deduplicated().weights == [3]
+
+
+def test_weighted_ballots_match_pyrankvote_through_the_counter():
+    candidates = [Candidate("No Award"), Candidate("A"), Candidate("B")]
+    no_award, a, b = candidates
+    ballots = [Ballot([a, b]), Ballot([b, no_award]), Ballot([no_award])]
+
+    assert_same_results(candidates, ballots, ballot_weights=[3, 3, 2])
+
+
+def test_ballot_arrays_expand_into_one_ranking_per_ballot():
+    a, b = Candidate("A"), Candidate("B")
+    arrays = BallotArrays.from_ballots(
+        [a, b], [Ballot([a, b]), Ballot([b]), Ballot([a, b])]
+    ).deduplicated()
+
+    expanded = arrays.expanded()
+
+    assert [ballot.ranked_candidates for ballot in expanded] == [(a, b), (a, b), (b,)]
+    assert expanded.weights is None